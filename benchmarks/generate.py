@@ -0,0 +1,193 @@
+"""
+Generates synthetic CloudFormation templates for the benchmarks.
+
+    python -m benchmarks.generate --resources 5000 --lambdas 200 -o template.yaml
+"""
+import argparse
+import json
+import random
+
+OTHER_RESOURCES = [
+    ("AWS::S3::Bucket", lambda i: {
+        "BucketName": {"Fn::Sub": "${AWS::StackName}-bucket-%d" % i},
+        "VersioningConfiguration": {"Status": "Enabled"},
+        "Tags": [{"Key": "Name", "Value": {"Ref": "AWS::StackName"}}],
+    }),
+    ("AWS::SNS::Topic", lambda i: {"TopicName": {"Fn::Sub": "${AWS::StackName}-topic-%d" % i}}),
+    ("AWS::SQS::Queue", lambda i: {"QueueName": "queue-%d" % i, "VisibilityTimeout": 60}),
+    ("AWS::DynamoDB::Table", lambda i: {
+        "BillingMode": "PAY_PER_REQUEST",
+        "AttributeDefinitions": [{"AttributeName": "pk", "AttributeType": "S"}],
+        "KeySchema": [{"AttributeName": "pk", "KeyType": "HASH"}],
+    }),
+    ("AWS::IAM::Role", lambda i: {
+        "AssumeRolePolicyDocument": {
+            "Version": "2012-10-17",
+            "Statement": [{"Effect": "Allow", "Principal": {"Service": "lambda.amazonaws.com"}, "Action": "sts:AssumeRole"}],
+        },
+        "ManagedPolicyArns": [{"Fn::Sub": "arn:${AWS::Partition}:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"}],
+    }),
+]
+
+
+def _pythonCode(index, lines, rng):
+    body = [
+        "import json",
+        "import os",
+        "",
+        "",
+        "def handler(event, context):",
+        f"    name = os.environ.get('NAME', 'function-{index}')",
+    ]
+    while len(body) < lines - 1:
+        number = len(body)
+        body.append(f"    value_{number} = {{'index': {number}, 'name': name, 'size': len(event)}}")
+        body.append(f"    print(json.dumps(value_{number}))")
+    if rng.random() < 0.2:
+        # Some functions carry a lint error so reporting has something to print
+        body.insert(0, "import sys")
+    body.append("    return {'statusCode': 200, 'body': json.dumps(event)}")
+    return "\n".join(body) + "\n"
+
+
+def _nodeCode(index):
+    return f"exports.handler = async (event) => ({{ statusCode: 200, body: 'function-{index}' }});\n"
+
+
+def generateTemplate(resources=1000, lambdas=50, zipfile_lines=20, parameter_runtime_share=0.3,
+                     non_python_share=0.1, seed=0):
+    """
+    Builds a synthetic CloudFormation template.
+
+    Args:
+        resources (int): Number of resources that are not Lambda functions.
+        lambdas (int): Number of Lambda functions with inline code.
+        zipfile_lines (int): Approximate number of lines of every inline function.
+        parameter_runtime_share (float): Share of functions whose Runtime is a `Ref` to a parameter.
+        non_python_share (float): Share of functions using a Node.js runtime.
+        seed (int): Seed of the random choices, the same arguments give the same template.
+
+    Returns:
+        dict: The template.
+    """
+    rng = random.Random(seed)
+    template = {
+        "AWSTemplateFormatVersion": "2010-09-09",
+        "Parameters": {
+            "PythonRuntime": {"Type": "String", "Default": "python3.12"},
+            "NodeRuntime": {"Type": "String", "Default": "nodejs20.x"},
+        },
+        "Resources": {},
+    }
+
+    kinds = ["lambda"] * lambdas + ["other"] * resources
+    rng.shuffle(kinds)
+    for index, kind in enumerate(kinds):
+        if kind == "other":
+            resource_type, properties = rng.choice(OTHER_RESOURCES)
+            template["Resources"][f"Resource{index}"] = {"Type": resource_type, "Properties": properties(index)}
+            continue
+
+        python = rng.random() >= non_python_share
+        by_parameter = rng.random() < parameter_runtime_share
+        if by_parameter:
+            runtime = {"Ref": "PythonRuntime" if python else "NodeRuntime"}
+        else:
+            runtime = "python3.12" if python else "nodejs20.x"
+        template["Resources"][f"Function{index}"] = {
+            "Type": "AWS::Lambda::Function",
+            "Properties": {
+                "Runtime": runtime,
+                "Handler": "index.handler",
+                "Role": {"Fn::GetAtt": ["Role", "Arn"]},
+                "Code": {"ZipFile": _pythonCode(index, zipfile_lines, rng) if python else _nodeCode(index)},
+            },
+        }
+    return template
+
+
+def _yamlScalar(value):
+    if isinstance(value, str):
+        return json.dumps(value)
+    return str(value)
+
+
+def _yamlLines(value, indent):
+    pad = "  " * indent
+    if isinstance(value, dict) and len(value) == 1:
+        key, inner = next(iter(value.items()))
+        if key == "Ref":
+            return [f"!Ref {inner}"]
+        if key == "Fn::Sub" and isinstance(inner, str):
+            return [f"!Sub {_yamlScalar(inner)}"]
+        if key == "Fn::GetAtt":
+            return [f"!GetAtt {'.'.join(inner)}"]
+    if isinstance(value, dict):
+        lines = []
+        for key, inner in value.items():
+            if isinstance(inner, str) and "\n" in inner:
+                lines.append(f"{pad}{key}: |")
+                lines.extend(f"{pad}  {line}" if line else "" for line in inner.rstrip("\n").split("\n"))
+                continue
+            rendered = _yamlLines(inner, indent + 1)
+            if isinstance(inner, (dict, list)) and not rendered[0].startswith("!"):
+                lines.append(f"{pad}{key}:")
+                lines.extend(rendered)
+            else:
+                lines.append(f"{pad}{key}: {rendered[0]}")
+        return lines
+    if isinstance(value, list):
+        lines = []
+        for inner in value:
+            rendered = _yamlLines(inner, indent + 1)
+            if isinstance(inner, dict) and not rendered[0].startswith("!"):
+                lines.append(f"{pad}- {rendered[0].lstrip()}")
+                lines.extend(rendered[1:])
+            else:
+                lines.append(f"{pad}- {rendered[0]}")
+        return lines
+    return [_yamlScalar(value)]
+
+
+def renderTemplate(template, format="yaml"):
+    """
+    Renders a template as YAML, using short-form intrinsics, or as JSON like `cdk synth`.
+
+    Args:
+        template (dict): The template built by `generateTemplate`.
+        format (str): "yaml" or "json".
+
+    Returns:
+        str: The template text.
+    """
+    if format == "json":
+        return json.dumps(template, indent=1) + "\n"
+    return "\n".join(_yamlLines(template, 0)) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CloudFormation template.")
+    parser.add_argument("--resources", type=int, default=1000)
+    parser.add_argument("--lambdas", type=int, default=50)
+    parser.add_argument("--zipfile-lines", type=int, default=20)
+    parser.add_argument("--parameter-runtime-share", type=float, default=0.3)
+    parser.add_argument("--non-python-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["yaml", "json"], default="yaml")
+    parser.add_argument("-o", "--output", required=True)
+    options = parser.parse_args()
+
+    template = generateTemplate(
+        resources=options.resources,
+        lambdas=options.lambdas,
+        zipfile_lines=options.zipfile_lines,
+        parameter_runtime_share=options.parameter_runtime_share,
+        non_python_share=options.non_python_share,
+        seed=options.seed,
+    )
+    with open(options.output, "w") as file:
+        file.write(renderTemplate(template, options.format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Times the linter phases on synthetic templates and compares them with a baseline.
+
+    python -m benchmarks.run --update-baseline    # store this run as the baseline of this machine
+    python -m benchmarks.run                      # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run --output results.json
+
+Each scenario is timed per phase: parse (`readFile`), scan
+(`findLambdaResources`), lint (`extractLambdaCode`), report
+(`outputPrinting`) and a full `cill lint` run in a fresh interpreter. The
+best of `--repeat` runs is kept. A phase slower than the baseline by more
+than `--threshold` fails the run.
+
+Timings only compare on the machine and Python version they were taken
+with, so the baseline is not committed: every machine records its own,
+and runs on another machine or Python version are not compared with it.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from cfn_inline_lambda_linter.linter import extractLambdaCode, findLambdaResources, outputPrinting, readFile
+
+from .generate import generateTemplate, renderTemplate
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+SCENARIOS = {
+    "small": dict(resources=50, lambdas=5, zipfile_lines=20),
+    "medium": dict(resources=1000, lambdas=50, zipfile_lines=40, parameter_runtime_share=0.5),
+    "large": dict(resources=5000, lambdas=200, zipfile_lines=60, non_python_share=0.3),
+    "big-functions": dict(resources=100, lambdas=20, zipfile_lines=400),
+    "cdk-json": dict(resources=8000, lambdas=100, zipfile_lines=30, format="json"),
+}
+
+
+def _best(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def runScenario(name, repeat=3):
+    """
+    Times every phase of the linter on the template of a scenario.
+
+    Args:
+        name (str): The scenario from `SCENARIOS`.
+        repeat (int): How many times each phase runs, the fastest run is kept.
+
+    Returns:
+        dict: Seconds spent in each phase.
+    """
+    settings = dict(SCENARIOS[name])
+    format = settings.pop("format", "yaml")
+    with tempfile.TemporaryDirectory(prefix="cill-bench-") as directory:
+        path = os.path.join(directory, f"{name}.{format}")
+        with open(path, "w") as file:
+            file.write(renderTemplate(generateTemplate(**settings), format))
+
+        parse, template = _best(lambda: readFile(path), repeat)
+        resources = template["Resources"]
+        parameters = template.get("Parameters", {})
+        scan, dict_to_check = _best(lambda: findLambdaResources(resources), repeat)
+        lint, error_dict = _best(lambda: extractLambdaCode(resources, parameters, dict(dict_to_check)), repeat)
+        report, _ = _best(lambda: outputPrinting(error_dict), repeat)
+        full, _ = _best(lambda: subprocess.run(
+            [sys.executable, "-c", "from cfn_inline_lambda_linter.main import app; app()",
+             "lint", "--no-cache", "--jobs", "1", path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ), repeat)
+
+    return {"parse": parse, "scan": scan, "lint": lint, "report": report, "full": full}
+
+
+def environment():
+    """
+    Describes what the timings of a run depend on besides the code: the Python version and the machine.
+    """
+    return {"python": platform.python_version(), "machine": platform.machine(), "host": platform.node()}
+
+
+def environmentDifferences(document):
+    """
+    Lists how the environment of a baseline differs from the one of this run.
+
+    Args:
+        document (dict): The baseline, as written by `--update-baseline`.
+
+    Returns:
+        list: A message for every difference, empty when the timings compare.
+    """
+    current = environment()
+    return [
+        f"{key} {document.get(key)} instead of {value}" for key, value in current.items() if document.get(key) != value
+    ]
+
+
+def compareWithBaseline(results, baseline, threshold):
+    """
+    Lists the phases that got slower than the baseline allows.
+
+    Timings below 5 ms are compared against 5 ms so that noise on tiny
+    phases does not fail the run.
+
+    Args:
+        results (dict): Phase timings per scenario of this run.
+        baseline (dict): Phase timings per scenario of the baseline.
+        threshold (float): Allowed slowdown, 0.25 allows 25% slower.
+
+    Returns:
+        list: A message for every regression.
+    """
+    regressions = []
+    for scenario, phases in results.items():
+        for phase, seconds in phases.items():
+            expected = baseline.get(scenario, {}).get(phase)
+            if expected is None:
+                continue
+            if max(seconds, 0.005) > max(expected, 0.005) * (1 + threshold):
+                regressions.append(
+                    f"{scenario}/{phase}: {seconds * 1000:.1f} ms, baseline {expected * 1000:.1f} ms "
+                    f"({(seconds / expected - 1) * 100:+.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cfn-inline-lambda-linter.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run, all by default.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    options = parser.parse_args()
+
+    results = {}
+    for name in options.scenario or SCENARIOS:
+        results[name] = runScenario(name, options.repeat)
+        print(f"{name:<14}" + "  ".join(f"{phase} {seconds * 1000:9.1f} ms" for phase, seconds in results[name].items()))
+
+    document = dict(environment(), results=results)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(document, file, indent=2)
+
+    if options.update_baseline:
+        with open(options.baseline, "w") as file:
+            json.dump(document, file, indent=2)
+        print(f"Baseline written to {options.baseline}")
+        return
+
+    if not os.path.exists(options.baseline):
+        print(f"No baseline at {options.baseline}, run with --update-baseline to create one.")
+        return
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    differences = environmentDifferences(baseline)
+    if differences:
+        print(f"⚠️ The baseline was recorded with {', '.join(differences)}, its timings do not compare.")
+        print("Run with --update-baseline to record one for this machine.")
+        return
+    regressions = compareWithBaseline(results, baseline["results"], options.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} phase(s) slower than the baseline by more than {options.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\n✅ No phase slower than the baseline by more than {options.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
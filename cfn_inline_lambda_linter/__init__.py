@@ -0,0 +1,16 @@
+"""
+CILL: CFN Inline Lambda Linter.
+
+The library interface lives in `api` and is imported on first use, so the
+`cill` entry point can start without loading the linter.
+"""
+
+__all__ = ["LintOutcome", "lint_many", "lint_template"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
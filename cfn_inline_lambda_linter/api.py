@@ -0,0 +1,77 @@
+"""
+Library interface of the linter.
+
+Nothing here prints or exits: every template is linted into a `LintOutcome`
+holding whether it passed, its structured results and the counters of the
+run. The `cill` command line is a thin layer over `lint_many` that renders
+outcomes with the reporters of `reporters`.
+
+Example:
+    from cfn_inline_lambda_linter import lint_many, lint_template
+
+    outcome = lint_template("template.yaml")
+    print(outcome.success, outcome.results["resources"])
+
+    with ThreadPoolExecutor(8) as pool:
+        for outcome in lint_many(paths, executor=pool):
+            store(outcome.fileName, outcome.results)
+"""
+import os
+
+from .runner import LintOutcome, lintFile, lintFiles
+
+__all__ = ["LintOutcome", "lint_many", "lint_template"]
+
+
+def lint_template(template, file_name=None, progress=False, **options):
+    """
+    Lints the Lambda functions of a single template.
+
+    Nested stacks are not followed, see `lint_many`.
+
+    Args:
+        template (str | os.PathLike | dict): The path of the template, or the template already parsed.
+        file_name (str): The name a parsed template is reported under, `<template>` by default.
+            Relative nested stack paths are resolved against its directory.
+        progress (bool): Build the human readable progress text into `LintOutcome.output`.
+        **options: Keyword arguments of `linter.lintTemplate`, like `args`, `mode`, `cache_dir`
+            or `backend_settings`, and `timings` to record timings.
+
+    Returns:
+        LintOutcome: Whether the template passed linting, the `results.ResourceResult` of every
+        function in `results["resources"]`, the `problems` that stopped it from being linted
+        or why it was `skipped`, and the counters of the lint in `stats`.
+    """
+    if isinstance(template, dict):
+        return lintFile(file_name or "<template>", quiet=not progress, template=template, **options)
+    return lintFile(os.fspath(template), quiet=not progress, **options)
+
+
+def lint_many(templates, executor=None, jobs=None, ordered=True, nested_stacks=True, progress=False, **options):
+    """
+    Lints templates, yielding the outcome of every template as soon as it is available.
+
+    Templates are taken from `templates` as the pool can work on them, so
+    it may be a generator that is still producing them. The local child
+    templates of nested stacks are linted too, once per call.
+
+    Args:
+        templates (iterable): Paths of templates, or templates already parsed as dicts,
+            which are named `<template N>` after their position.
+        executor (concurrent.futures.Executor): The process or thread pool to lint in. It is
+            not shut down. By default templates are linted in a process pool started for the
+            call, or in the calling thread when there is only one.
+        jobs (int): Number of templates linted at the same time, defaults to the number of CPUs.
+        ordered (bool): Yield outcomes in the order of `templates` instead of as soon as each is done.
+        nested_stacks (bool): Also lint the local child templates of nested stacks.
+        progress (bool): Build the human readable progress text into `LintOutcome.output`.
+        **options: Keyword arguments of `linter.lintTemplate`, like `args`, `mode` or `cache_dir`,
+            and `timings` to record timings.
+
+    Yields:
+        LintOutcome: The outcome of every template, see `lint_template`.
+    """
+    yield from lintFiles(
+        (template if isinstance(template, dict) else os.fspath(template) for template in templates),
+        jobs=jobs, ordered=ordered, nested_stacks=nested_stacks, executor=executor, quiet=not progress, **options
+    )
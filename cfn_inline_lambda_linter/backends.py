@@ -0,0 +1,392 @@
+import abc
+import atexit
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from contextlib import ExitStack
+
+from .cache import flake8Config
+from .fastcheck import checkPython, formatFindings
+from .timings import currentTimings, recordTimings, timed
+
+#: Every backend lints in a single worker unless configured otherwise,
+#: templates are already linted in parallel by the runner
+DEFAULT_JOBS = 1
+
+_FAMILY = re.compile(r"[a-z]+")
+
+# Runs in `node`, checks inline code the way Lambda loads it: as the CommonJS module index.js
+NODE_WORKER = r"""
+const readline = require("readline");
+const vm = require("vm");
+const WRAPPER = ["exports", "require", "module", "__filename", "__dirname"];
+
+function report(error) {
+  if (!(error instanceof SyntaxError)) throw error;
+  const [location, , caret = ""] = error.stack.split("\n");
+  const line = Number(location.split(":").pop()) || 1;
+  const column = caret.indexOf("^") + 1 || 1;
+  return `stdin:${line}:${column}: E999 SyntaxError: ${error.message}\n`;
+}
+
+readline.createInterface({ input: process.stdin }).on("line", (request) => {
+  const { source } = JSON.parse(request);
+  let answer;
+  try {
+    vm.compileFunction(source, WRAPPER, { filename: "stdin" });
+    answer = { report: "" };
+  } catch (error) {
+    try {
+      answer = { report: report(error) };
+    } catch (unexpected) {
+      answer = { error: String(unexpected) };
+    }
+  }
+  process.stdout.write(JSON.stringify(answer) + "\n");
+});
+"""
+
+
+def runtimeFamily(runtime):
+    """
+    Returns the family of a Lambda runtime, like `python` for `python3.12` or `nodejs` for `nodejs20.x`.
+    """
+    match = _FAMILY.match(runtime) if isinstance(runtime, str) else None
+    return match.group(0) if match else None
+
+
+class WorkerPool:
+    """
+    Long-lived worker processes linting one source per request.
+
+    Workers read a JSON object with the `source` per line on stdin and answer
+    with a JSON object holding the `report`, or an `error`, per line on
+    stdout. They are started on first use and kept until the pool is closed,
+    so a run pays their start-up once however many functions it lints. A
+    worker that does not answer within the timeout is stopped and replaced
+    on the next request. A worker handles one request at a time, whatever
+    thread sends it. Answers are read by a thread per worker, pipes cannot
+    be waited on with a timeout on every platform.
+
+    Args:
+        command (list): The command starting a worker.
+        name (str): The name of the workers in error messages.
+        jobs (int): Maximum number of workers linting at the same time.
+        timeout (float): Seconds a worker may take for a source, None to wait forever.
+    """
+
+    def __init__(self, command, name, jobs=DEFAULT_JOBS, timeout=None):
+        self.command = command
+        self.name = name
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        self._workers = [None] * self.jobs
+        self._locks = [threading.Lock() for _ in range(self.jobs)]
+        atexit.register(self.close)
+
+    def _start(self, slot):
+        worker = self._workers[slot]
+        if worker is None or worker.poll() is not None:
+            worker = self._workers[slot] = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+            worker.answers = queue.Queue()
+            threading.Thread(target=self._read, args=(worker,), daemon=True).start()
+        return worker
+
+    @staticmethod
+    def _read(worker):
+        for answer in worker.stdout:
+            worker.answers.put(answer)
+        # The worker exited
+        worker.answers.put(b"")
+
+    def _stop(self, slot):
+        worker, self._workers[slot] = self._workers[slot], None
+        if worker is not None:
+            worker.kill()
+            worker.wait()
+        return worker
+
+    def lint(self, source, slot=0):
+        """
+        Lints a single source with one of the workers.
+
+        Args:
+            source (str): The code to lint.
+            slot (int): The worker to use.
+
+        Returns:
+            str: The report, empty when no errors were found.
+        """
+        with self._locks[slot]:
+            worker = self._start(slot)
+            try:
+                worker.stdin.write(json.dumps({"source": source}).encode() + b"\n")
+                worker.stdin.flush()
+                answer = worker.answers.get(timeout=self.timeout)
+            except OSError:
+                answer = b""
+            except queue.Empty:
+                answer = None
+            if answer is None:
+                self._stop(slot)
+                raise RuntimeError(f"❌ {self.name} worker did not answer within {self.timeout} seconds")
+            if not answer:
+                raise RuntimeError(f"❌ {self.name} worker exited with return code {self._stop(slot).returncode}")
+
+        answer = json.loads(answer)
+        if "error" in answer:
+            raise RuntimeError(f"❌ {self.name} worker failed: {answer['error']}")
+        return answer["report"]
+
+    def lintMany(self, sources):
+        """
+        Lints several sources, spread over the workers.
+
+        Args:
+            sources (dict): Code keyed by resource name.
+
+        Returns:
+            dict: The report of every source keyed by resource name.
+        """
+        names = list(sources)
+        reports = {}
+        timings = currentTimings()
+
+        def lintSlot(slot):
+            with ExitStack() as stack:
+                if timings is not None:
+                    # Timings are recorded per thread, the slots record into the ones of the caller
+                    stack.enter_context(recordTimings(timings))
+                for name in names[slot::self.jobs]:
+                    with timed("resource", name):
+                        reports[name] = self.lint(sources[name], slot)
+
+        if self.jobs == 1 or len(names) < 2:
+            lintSlot(0)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(self.jobs, len(names))) as executor:
+                for finished in [executor.submit(lintSlot, slot) for slot in range(min(self.jobs, len(names)))]:
+                    finished.result()
+        return {name: reports[name] for name in names}
+
+    def close(self):
+        """
+        Stops every worker of the pool.
+        """
+        for slot in range(self.jobs):
+            self._stop(slot)
+
+
+class LintBackend(abc.ABC):
+    """
+    Base class of the backends linting the inline code of a runtime family.
+
+    Args:
+        args (str): Args you want to pass to the lint.
+        use_subprocess (bool): Start a process per source instead of linting in a worker.
+        batch (bool): Lint a batch of sources with a single process.
+        jobs (int): Maximum number of sources linted at the same time.
+        timeout (float): Seconds a source may take to lint, None to wait forever.
+    """
+
+    #: The runtime family the backend lints, like `python` or `nodejs`
+    family = None
+    #: The tier of `--mode` the backend implements
+    mode = "full"
+    #: Whether results are kept in the lint result cache
+    cacheable = True
+
+    def __init__(self, args=None, use_subprocess=False, batch=False, jobs=DEFAULT_JOBS, timeout=None):
+        self.args = args
+        self.jobs = jobs
+        self.timeout = timeout
+
+    @classmethod
+    def available(cls):
+        """
+        Tells whether the tools the backend needs are installed.
+        """
+        return True
+
+    @classmethod
+    def configuration(cls, args=None):
+        """
+        Returns what configures the tools of the backend besides `args`, like the content of their config files.
+
+        Backends are built again once it changes, so long-lived processes pick up edits.
+        """
+        return None
+
+    @property
+    @abc.abstractmethod
+    def cache_args(self):
+        """
+        What besides the source and runtime decides the lint result, part of the cache key.
+        """
+
+    @abc.abstractmethod
+    def lintMany(self, sources, context=None):
+        """
+        Lints several sources.
+
+        Args:
+            sources (dict): Code keyed by resource name.
+            context (dict): What the template tells about every function keyed by resource name:
+                its `handler`, whether it is a `custom_resource` provider and its `code` as read
+                from the template.
+
+        Returns:
+            dict: The report of every source keyed by resource name, in flake8's format.
+        """
+
+
+BACKENDS = {}
+
+
+def registerBackend(backend):
+    """
+    Registers a backend class for the runtime family and mode it lints.
+    """
+    BACKENDS[(backend.family, backend.mode)] = backend
+    return backend
+
+
+@registerBackend
+class PythonBackend(LintBackend):
+    """
+    Lints Python with flake8.
+
+    Sources are linted in-process by the memoized flake8 engine. With more
+    than one job or a timeout they are linted by a pool of worker processes
+    that each keep a flake8 engine set up, `--subprocess` and `--batch` keep
+    their flake8 process per source or per batch, stopped once it takes
+    longer than the timeout.
+    """
+
+    family = "python"
+
+    def __init__(self, args=None, use_subprocess=False, batch=False, jobs=DEFAULT_JOBS, timeout=None):
+        super().__init__(args, use_subprocess, batch, jobs, timeout)
+        # flake8 is the slowest import of the linter, it is only loaded once there is Python to lint
+        from .engine import getEngine
+
+        self.engine = getEngine(args, use_subprocess, batch, timeout if use_subprocess or batch else None)
+        self.config = self.configuration(args)
+        self.pool = None
+        if not (use_subprocess or batch) and (jobs > 1 or timeout is not None):
+            command = [sys.executable, "-m", "cfn_inline_lambda_linter.worker"] + self.engine.flake8_args
+            self.pool = WorkerPool(command, "flake8", jobs, timeout)
+
+    @classmethod
+    def configuration(cls, args=None):
+        return flake8Config(os.getcwd(), tuple(args.split()) if args else ())
+
+    @property
+    def cache_args(self):
+        return self.engine.flake8_args + [self.config]
+
+    def lintMany(self, sources, context=None):
+        if self.pool is not None:
+            return self.pool.lintMany(sources)
+        return self.engine.lintMany(sources)
+
+
+@registerBackend
+class FastPythonBackend(LintBackend):
+    """
+    The fast tier of Python, see `fastcheck`.
+
+    Sources are parsed and checked in-process without loading flake8. The
+    checks take microseconds, so results are not cached.
+    """
+
+    family = "python"
+    mode = "fast"
+    cacheable = False
+    #: Never part of a cache key, as results are not cached
+    cache_args = None
+
+    def lintMany(self, sources, context=None):
+        context = context or {}
+        reports = {}
+        for name, source in sources.items():
+            function = context.get(name, {})
+            with timed("resource", name):
+                findings = checkPython(source, function.get("handler"), function.get("custom_resource", False))
+                reports[name] = formatFindings(findings, function.get("code"))
+        return reports
+
+
+@registerBackend
+class NodeBackend(LintBackend):
+    """
+    Reports the syntax errors of Node.js code, using the `node` on the PATH.
+
+    The code is compiled the way Lambda loads an inline `index.js`, as a
+    CommonJS module, in a pool of `node` workers. Errors are reported as
+    flake8's E999 so they read like every other report.
+    """
+
+    family = "nodejs"
+
+    def __init__(self, args=None, use_subprocess=False, batch=False, jobs=DEFAULT_JOBS, timeout=None):
+        super().__init__(args, use_subprocess, batch, jobs, timeout)
+        node = shutil.which("node")
+        self.version = subprocess.run([node, "--version"], capture_output=True, text=True).stdout.strip()
+        self.pool = WorkerPool([node, "-e", NODE_WORKER], "node", jobs, timeout)
+
+    @classmethod
+    def available(cls):
+        return shutil.which("node") is not None
+
+    @property
+    def cache_args(self):
+        return ["node", self.version]
+
+    def lintMany(self, sources, context=None):
+        return self.pool.lintMany(sources)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def getBackend(family, args=None, use_subprocess=False, batch=False, backend_settings=None, mode="full"):
+    """
+    Returns the backend of a runtime family, building it on first use.
+
+    Families without a backend for the mode are linted by their full backend.
+    Backends and their worker pools are kept for the lifetime of the process,
+    one per `LintBackend.configuration` they were built with.
+
+    Args:
+        family (str): The runtime family, see `runtimeFamily`.
+        args (str): Args you want to pass to the lint.
+        use_subprocess (bool): Start a process per source instead of linting in a worker.
+        batch (bool): Lint a batch of sources with a single process.
+        backend_settings (dict): The `jobs` and `timeout` of backends keyed by family.
+        mode (str): The tier to lint with, `full` or `fast`.
+
+    Returns:
+        LintBackend: The backend, None if no backend lints the family or its tools are missing.
+    """
+    backend = BACKENDS.get((family, mode)) or BACKENDS.get((family, "full"))
+    if backend is None:
+        return None
+    settings = (backend_settings or {}).get(family, {})
+    jobs = settings.get("jobs", DEFAULT_JOBS)
+    timeout = settings.get("timeout")
+    key = (backend, args, use_subprocess, batch, jobs, timeout, backend.configuration(args))
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = backend(args, use_subprocess, batch, jobs, timeout) if backend.available() else None
+        return _backends[key]
@@ -0,0 +1,592 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from .results import ResourceResult
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+#: Bumped whenever the parsed form of templates changes, entries of other versions are parsed again
+TEMPLATE_CACHE_VERSION = b"4"
+# Keys the stored form of templates marks inline code and escaped mappings with, YAML cannot hold a NUL
+_INLINE_CODE = "\0InlineCode"
+_MAPPING = "\0Mapping"
+#: Results the in-memory table of a process keeps, a daemon worker lives through many runs
+RESULT_TABLE_ENTRIES = 4096
+FLAKE8_CONFIG_FILES = ("setup.cfg", "tox.ini", ".flake8")
+
+
+def defaultCacheDir():
+    """
+    Returns the default cache directory, `$XDG_CACHE_HOME/cill` or `~/.cache/cill`.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "cill")
+
+
+@lru_cache(maxsize=None)
+def flake8Versions():
+    """
+    Returns the versions of flake8 and every installed flake8 plugin.
+
+    Returns:
+        str: `name==version` pairs separated by commas, sorted by name.
+    """
+    from importlib import metadata  # Slow to import, only needed once there is code to lint
+
+    versions = {}
+    for distribution in metadata.distributions():
+        name = distribution.metadata["Name"]
+        if name in ("flake8", "pyflakes", "pycodestyle") or any(
+            entry_point.group in ("flake8.extension", "flake8.report")
+            for entry_point in distribution.entry_points
+        ):
+            versions[name.lower()] = distribution.version
+    return ",".join(f"{name}=={version}" for name, version in sorted(versions.items()))
+
+
+def _readConfig(path):
+    """Returns the text of a configuration file, empty when it cannot be read."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+    except (OSError, UnicodeDecodeError):
+        return ""
+
+
+def _statKey(path):
+    """Identifies a directory the way flake8 does when it compares the one it reached with the home directory."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_dev
+
+
+def _findFlake8Config(directory):
+    """
+    Returns the content of the configuration file flake8 discovers from a directory.
+
+    Like flake8, the directory and its parents are searched for the first
+    setup.cfg, tox.ini or .flake8 file that has a flake8 section, stopping
+    before the home directory and at the root.
+    """
+    home = os.path.expanduser("~")
+    home_key = _statKey(home) if home != "~" else None
+    directory = os.path.abspath(directory)
+    directory_key = _statKey(directory)
+    while True:
+        for name in FLAKE8_CONFIG_FILES:
+            content = _readConfig(os.path.join(directory, name))
+            if "[flake8" in content:
+                return content
+        parent = os.path.dirname(directory)
+        parent_key = _statKey(parent)
+        if parent == directory or parent_key == directory_key or parent_key == home_key:
+            return ""
+        directory, directory_key = parent, parent_key
+
+
+def _configFiles(flake8_args):
+    """
+    Returns the files given to `--config` and `--append-config`, and whether `--isolated` was given.
+    """
+    config = None
+    extra = []
+    isolated = False
+    tokens = iter(flake8_args)
+    for token in tokens:
+        option, separator, value = token.partition("=")
+        if option not in ("--config", "--append-config"):
+            isolated = isolated or token == "--isolated"
+            continue
+        if not separator:
+            value = next(tokens, "")
+        if option == "--config":
+            config = value
+        else:
+            extra.append(value)
+    return config, extra, isolated
+
+
+@lru_cache(maxsize=None)
+def flake8Config(directory, flake8_args=()):
+    """
+    Returns the content of the flake8 configuration used from a directory.
+
+    That is the file given to `--config`, or the one flake8 discovers from
+    the directory, followed by the files given to `--append-config`. Nothing
+    is read with `--isolated`.
+
+    Args:
+        directory (str): The directory flake8 is run from.
+        flake8_args (tuple): The flake8 arguments.
+
+    Returns:
+        str: The configuration file contents, empty when there is none.
+    """
+    config, extra, isolated = _configFiles(flake8_args)
+    if isolated:
+        return ""
+    contents = [_findFlake8Config(directory) if config is None else _readConfig(os.path.join(directory, config))]
+    contents.extend(_readConfig(os.path.join(directory, path)) for path in extra)
+    return "\0".join(contents)
+
+
+def _createUsage(connection, total):
+    """
+    Creates the one-row table holding the bytes a cache stores, so writes do not sum every entry.
+
+    Args:
+        connection (sqlite3.Connection): The cache database.
+        total (str): Query summing the bytes of the entries, run once for caches written without the table.
+    """
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute("CREATE TABLE IF NOT EXISTS usage (total INTEGER NOT NULL)")
+        if connection.execute("SELECT 1 FROM usage").fetchone() is None:
+            connection.execute(f"INSERT INTO usage (total) {total}")
+
+
+def _addUsage(connection, added, max_bytes, oldest, delete):
+    """
+    Counts the bytes a write added and evicts the least recently used entries over the size limit.
+
+    Runs in the transaction of the write, so processes sharing the cache keep the total right.
+
+    Args:
+        connection (sqlite3.Connection): The cache database, in a transaction.
+        added (int): The bytes written, less the bytes of the entries they replaced.
+        max_bytes (int): The size limit of the cache.
+        oldest (str): Query of the key and size of every entry, least recently used first.
+        delete (str): Statement deleting the entry of a key.
+    """
+    total = connection.execute("SELECT total FROM usage").fetchone()[0] + added
+    if total > max_bytes:
+        evicted = []
+        for key, size in connection.execute(oldest):
+            if total <= max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany(delete, evicted)
+    connection.execute("UPDATE usage SET total = ?", (total,))
+
+
+class LintCache:
+    """
+    On-disk cache of lint results keyed by the content of the inline code.
+
+    Entries are stored in a SQLite database so several pre-commit processes
+    can read and write the cache at the same time. The least recently used
+    entries are evicted once the stored results grow beyond `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        import sqlite3  # Not needed by runs that find nothing to lint
+
+        self.connection = sqlite3.connect(os.path.join(directory, "results.sqlite3"), timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, status TEXT NOT NULL, errors TEXT NOT NULL, "
+            "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        _createUsage(self.connection, "SELECT COALESCE(SUM(size), 0) FROM results")
+
+    @staticmethod
+    def key(source, runtime, flake8_args):
+        """
+        Builds the cache key of a lint result.
+
+        Args:
+            source (str): The inline code.
+            runtime (str): The resolved Lambda runtime.
+            flake8_args (list): The effective lint args and the configuration they read, see `LintBackend.cache_args`.
+
+        Returns:
+            str: The hex digest identifying the result.
+        """
+        material = json.dumps([source, runtime, flake8_args, flake8Versions()])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def getMany(self, keys):
+        """
+        Looks up lint results and marks them as recently used.
+
+        Args:
+            keys (list): The cache keys to look up.
+
+        Returns:
+            dict: The `ResourceResult` found, keyed by cache key.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT key, status, errors FROM results WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for key, status, errors in rows:
+                found[key] = ResourceResult.fromDict({"status": status, "errors": errors})
+        if found:
+            now = time.time()
+            self.connection.executemany("UPDATE results SET accessed = ? WHERE key = ?", [(now, key) for key in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def putMany(self, records):
+        """
+        Stores lint results and evicts the least recently used ones over the size limit.
+
+        Args:
+            records (dict): The `ResourceResult`, or the `status`/`errors` dicts they replace, keyed by cache key.
+        """
+        if not records:
+            return
+        now = time.time()
+        rows = []
+        for key, record in records.items():
+            # The report text is only rebuilt from the violations to be stored
+            record = ResourceResult.fromDict(record)
+            errors = record.errors or ""
+            rows.append((key, record.status, errors, len(key) + len(errors), now))
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            replaced = 0
+            for start in range(0, len(rows), 500):
+                chunk = [row[0] for row in rows[start:start + 500]]
+                replaced += self.connection.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM results WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchone()[0]
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results (key, status, errors, size, accessed) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            _addUsage(
+                self.connection, sum(row[3] for row in rows) - replaced, self.max_bytes,
+                "SELECT key, size FROM results ORDER BY accessed", "DELETE FROM results WHERE key = ?",
+            )
+
+
+class TemplateCache:
+    """
+    On-disk cache of the Lambda relevant parts of parsed templates.
+
+    Entries are keyed by the absolute path of the template and only used while
+    its modification time, size and content hash are the ones it was parsed
+    with, so unchanged templates are linted without any YAML work. They hold
+    what `loader.lambdaSubset` keeps, stored as JSON with the position every
+    `InlineCode` was read from. The least recently used entries are evicted
+    once they grow beyond `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        import sqlite3
+
+        self.connection = sqlite3.connect(os.path.join(directory, "templates.sqlite3"), timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS templates ("
+            "path TEXT PRIMARY KEY, file_name TEXT NOT NULL, mtime INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "digest BLOB NOT NULL, data BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS templates_accessed ON templates (accessed)")
+        _createUsage(self.connection, "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM templates")
+
+    @staticmethod
+    def digest(content):
+        """
+        Hashes the bytes of a template together with `TEMPLATE_CACHE_VERSION`.
+        """
+        return hashlib.sha256(TEMPLATE_CACHE_VERSION + b"\0" + content).digest()
+
+    def get(self, fileName, content):
+        """
+        Looks up the parsed template of a file.
+
+        Args:
+            fileName (str): The name of the template file.
+            content (bytes): The bytes of the file, as read for this lint.
+
+        Returns:
+            The parsed template, None when the file was not cached with this modification time, size and content.
+        """
+        path = os.path.abspath(fileName)
+        try:
+            stat = os.stat(fileName)
+        except OSError:
+            stat = None
+        row = self.connection.execute(
+            "SELECT file_name, mtime, size, digest, data FROM templates WHERE path = ?", (path,)
+        ).fetchone()
+        template = None
+        if stat is not None and row is not None and row[:3] == (fileName, stat.st_mtime_ns, stat.st_size) \
+                and len(content) == stat.st_size and row[3] == self.digest(content):
+            try:
+                template = _decodeTemplate(row[4])
+            except ValueError:
+                # Not written by this version, parsed and stored again
+                template = None
+        if template is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.connection.execute("UPDATE templates SET accessed = ? WHERE path = ?", (time.time(), path))
+        return template
+
+    def put(self, fileName, content, template):
+        """
+        Stores the parsed template of a file and evicts the least recently used ones over the size limit.
+
+        Args:
+            fileName (str): The name of the template file.
+            content (bytes): The bytes the template was parsed from.
+            template: The Lambda relevant parts of the template, see `loader.lambdaSubset`.
+        """
+        try:
+            stat = os.stat(fileName)
+        except OSError:
+            return
+        data = _encodeTemplate(template)
+        path = os.path.abspath(fileName)
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            replaced = self.connection.execute(
+                "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM templates WHERE path = ?", (path,)
+            ).fetchone()[0]
+            self.connection.execute(
+                "INSERT OR REPLACE INTO templates (path, file_name, mtime, size, digest, data, accessed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, fileName, stat.st_mtime_ns, stat.st_size, self.digest(content), data, time.time()),
+            )
+            _addUsage(
+                self.connection, len(data) - replaced, self.max_bytes,
+                "SELECT path, LENGTH(data) FROM templates ORDER BY accessed", "DELETE FROM templates WHERE path = ?",
+            )
+
+
+def _plainTemplate(value):
+    """Turns `InlineCode` into mappings holding its text and position, escaping mappings that look like one."""
+    from .loader import InlineCode
+
+    if isinstance(value, InlineCode):
+        return {_INLINE_CODE: [str(value), vars(value)]}
+    if isinstance(value, dict):
+        mapping = {key: _plainTemplate(item) for key, item in value.items()}
+        return {_MAPPING: mapping} if any(isinstance(key, str) and key.startswith("\0") for key in mapping) else mapping
+    if isinstance(value, list):
+        return [_plainTemplate(item) for item in value]
+    return value
+
+
+def _templateObject(value):
+    """Rebuilds the `InlineCode` and escaped mappings `_plainTemplate` turned into plain mappings."""
+    from .loader import InlineCode
+
+    if isinstance(value, dict):
+        if len(value) == 1 and _INLINE_CODE in value:
+            text, attributes = value[_INLINE_CODE]
+            code = InlineCode(text)
+            code.__dict__.update(attributes)
+            return code
+        if len(value) == 1 and _MAPPING in value:
+            value = value[_MAPPING]
+        return {key: _templateObject(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_templateObject(item) for item in value]
+    return value
+
+
+def _encodeTemplate(template):
+    """
+    Serializes a parsed template as JSON, data only so a cache directory someone else wrote cannot run code.
+    """
+    return json.dumps(_plainTemplate(template), separators=(",", ":")).encode("utf-8")
+
+
+def _decodeTemplate(data):
+    """
+    Rebuilds a template serialized by `_encodeTemplate`.
+
+    Raises:
+        ValueError: If the data is not a serialized template.
+    """
+    try:
+        return _templateObject(json.loads(data))
+    except (TypeError, AttributeError) as e:
+        raise ValueError(f"not a serialized template: {e}") from e
+
+
+class _State(threading.local):
+    """The open caches and the shared result table, per thread since SQLite connections stay in their thread."""
+
+    def __init__(self):
+        self.caches = {}
+        self.template_caches = {}
+        self.result_table = None
+
+
+_state = _State()
+
+
+def getCache(directory):
+    """
+    Returns the lint cache stored in a directory, opening it on first use in the current thread.
+
+    Args:
+        directory (str): The cache directory.
+
+    Returns:
+        LintCache: The cache for the directory.
+    """
+    if directory not in _state.caches:
+        _state.caches[directory] = LintCache(directory)
+    return _state.caches[directory]
+
+
+def getTemplateCache(directory):
+    """
+    Returns the parsed template cache stored in a directory, opening it on first use in the current thread.
+
+    Args:
+        directory (str): The cache directory.
+
+    Returns:
+        TemplateCache: The cache for the directory.
+    """
+    if directory not in _state.template_caches:
+        _state.template_caches[directory] = TemplateCache(directory)
+    return _state.template_caches[directory]
+
+
+class ResultTable:
+    """
+    In-memory lint results of the inline code linted by a process or thread.
+
+    Templates often carry copies of the same function, like custom resources
+    emptying buckets. Results are keyed by the hash of the code, its runtime
+    and the effective lint args, so every copy after the first one is
+    answered from memory instead of being linted again. Unlike the lint
+    result cache it also works with `--no-cache`, and it keeps the most
+    recently stored `max_entries` results.
+    """
+
+    def __init__(self, max_entries=RESULT_TABLE_ENTRIES):
+        self.max_entries = max_entries
+        self.records = {}
+        #: Lint executions answered from the table
+        self.saved = 0
+
+    @staticmethod
+    def key(source, runtime, args):
+        """
+        Builds the key of a lint result.
+
+        Args:
+            source (str): The inline code.
+            runtime (str): The resolved Lambda runtime.
+            args (list): The effective lint args, see `LintBackend.cache_args`.
+
+        Returns:
+            tuple: The hash of the code, the runtime and the args.
+        """
+        return hashlib.sha256(source.encode()).digest(), runtime, json.dumps(args)
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def get(self, key):
+        """
+        Returns a stored result, records are never changed so it is shared rather than copied.
+        """
+        return self.records[key]
+
+    def put(self, key, record):
+        """
+        Stores a result, forgetting the oldest one when the table is full.
+
+        Args:
+            key (tuple): The key of the result, see `key`.
+            record (ResourceResult): The result, or the `{"status": ..., "errors": ...}` dict it replaces.
+        """
+        self.records.pop(key, None)
+        self.records[key] = ResourceResult.fromDict(record)
+        if len(self.records) > self.max_entries:
+            del self.records[next(iter(self.records))]
+
+
+def getResultTable():
+    """
+    Returns the in-memory lint results shared by the templates the current thread lints, None outside of a run.
+    """
+    return _state.result_table
+
+
+def shareResultTable(table=None):
+    """
+    Shares a result table with every template the current thread lints from now on.
+
+    Used by the processes and threads linting the templates of a run.
+
+    Args:
+        table (ResultTable): The table to share, a new one by default.
+
+    Returns:
+        ResultTable: The shared table.
+    """
+    _state.result_table = table or ResultTable()
+    return _state.result_table
+
+
+@contextmanager
+def sharedResultTable(table=None):
+    """
+    Shares a result table with the templates linted inside the block.
+
+    Args:
+        table (ResultTable): The table to share, a new one by default.
+
+    Yields:
+        ResultTable: The shared table.
+    """
+    previous, _state.result_table = _state.result_table, table or ResultTable()
+    try:
+        yield _state.result_table
+    finally:
+        _state.result_table = previous
+
+
+def cacheCounters(directory):
+    """
+    Returns the hits and misses of the lint cache in a directory, without opening it.
+
+    Returns:
+        tuple: Hits and misses so far, (0, 0) if the cache was not used yet.
+    """
+    cache = _state.caches.get(directory)
+    return (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+
+def templateCacheCounters(directory):
+    """
+    Returns the hits and misses of the parsed template cache in a directory, without opening it.
+
+    Returns:
+        tuple: Hits and misses so far, (0, 0) if the cache was not used yet.
+    """
+    cache = _state.template_caches.get(directory)
+    return (cache.hits, cache.misses) if cache is not None else (0, 0)
@@ -0,0 +1,29 @@
+"""
+Entry point of the `cill` and `cfn_lambda_lint` commands.
+
+Pre-commit hands the hook every YAML file of a commit, and most of them are
+Kubernetes manifests, workflows or compose files. When `cill lint` is only
+given files and none of them names a Lambda function or a nested stack (see
+`prefilter`), the result is printed without importing typer, PyYAML or
+flake8. Every other command line goes to the typer app in `main`.
+"""
+import sys
+
+from .prefilter import mayHoldLambdas
+from .summary import ALL_PASSED, summaryLines
+
+
+def main():
+    arguments = sys.argv[1:]
+    files = arguments[1:]
+    if arguments[:1] == ["lint"] and files and not any(argument.startswith("-") for argument in files) \
+            and not any(mayHoldLambdas(fileName) for fileName in files):
+        # Same report as `main.lint` for files that are all prefiltered, which uses the default cache
+        print(ALL_PASSED)
+        for line in summaryLines({"prefiltered": len(set(files))}, cache=True):
+            print(line)
+        sys.exit(0)
+
+    from .main import app
+
+    app()
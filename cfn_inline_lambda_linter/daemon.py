@@ -0,0 +1,278 @@
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import flake8Config
+from .reporters import recordResults, reportProblem
+from .results import ResourceResult
+from .runner import LintOutcome, lintFile
+from .stacks import StackTree
+
+DEFAULT_IDLE_TIMEOUT = 600
+#: Outcomes the daemon remembers, the least recently used ones are forgotten first
+DEFAULT_MAX_RESULTS = 4096
+
+
+def defaultSocketPath():
+    """
+    Returns the default daemon socket, in `$XDG_RUNTIME_DIR` or the temporary directory.
+    """
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, f"cill-{os.getuid()}.sock")
+
+
+class LintDaemon:
+    """
+    Lints templates for clients connecting to a Unix domain socket.
+
+    Templates are linted by a pool of worker processes that stay alive, so
+    the imports, the YAML loader and the flake8 engines are set up once. The
+    result of every file is kept in memory with the file's modification time
+    and size, and unchanged files are answered without linting them again.
+    Only the `max_results` most recently used outcomes are kept, and the ones
+    of files that were deleted are dropped. Answers from memory carry no
+    counters or timings, nothing was done to lint them.
+    Templates are linted in the working directory of the client, so flake8
+    reads the configuration the client would, and results are remembered per
+    client working directory and flake8 configuration.
+    The daemon shuts down once no request came in for `idle_timeout` seconds.
+    """
+
+    def __init__(self, socket_path, jobs=None, idle_timeout=DEFAULT_IDLE_TIMEOUT, max_results=DEFAULT_MAX_RESULTS):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.max_results = max_results
+        # Workers started by forking a threaded server would inherit the client sockets
+        self.executor = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("forkserver"))
+        self.results = {}
+        self.lock = threading.Lock()
+        self.active_requests = 0
+        self.last_activity = time.monotonic()
+        self.server = None
+
+    def lint(self, files, options, cwd=None):
+        """
+        Lints templates, answering unchanged ones from memory.
+
+        Args:
+            files (list): Absolute paths of the templates.
+            options (dict): Keyword arguments passed on to `linter`, and `nested_stacks`
+                to also lint the child templates of nested stacks.
+            cwd (str): The working directory of the client, the one of the daemon by default.
+
+        Yields:
+            LintOutcome: The outcome of every file, in the order of `files`, followed by their child templates.
+        """
+        options = dict(options)
+        nested_stacks = options.pop("nested_stacks", True)
+        tree = StackTree(files) if nested_stacks else None
+        # Results of git based runs depend on the repository, not only on the file
+        remember = options.get("since") is None and not options.get("staged")
+        cwd = cwd or os.getcwd()
+        # Read on every request, the memoized configuration of a run would miss edits
+        config = flake8Config.__wrapped__(cwd, tuple((options.get("args") or "").split()))
+        options_key = json.dumps([options, cwd, config], sort_keys=True)
+
+        def submit(fileName, stack):
+            try:
+                stat = os.stat(fileName)
+                state = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                state = None
+            key = (fileName, options_key, stack)
+            with self.lock:
+                if state is None:
+                    self._forget(fileName)
+                known = self.results.get(key)
+                if remember and state is not None and known is not None and known[0] == state:
+                    self._remember(key, state, known[1])
+                else:
+                    known = None
+            if known is not None:
+                # The counters and timings were those of the run that linted the file
+                outcome = known[1]._replace(stats={}, timings=None if known[1].timings is None else [])
+                return key, state, None, outcome
+            future = self.executor.submit(_lintInDirectory, cwd, fileName, stack=stack, nested_stacks=nested_stacks, **options)
+            return key, state, future, None
+
+        pending = deque(submit(fileName, None) for fileName in files)
+        while pending:
+            key, state, future, outcome = pending.popleft()
+            if future is not None:
+                outcome = future.result()
+                if remember and state is not None:
+                    with self.lock:
+                        self._remember(key, state, outcome)
+            if tree is not None:
+                outcome, children = tree.follow(outcome)
+                pending.extend(submit(fileName, stack) for fileName, stack in children)
+            yield outcome
+
+    def _remember(self, key, state, outcome):
+        self.results.pop(key, None)
+        self.results[key] = (state, outcome)
+        if len(self.results) > self.max_results:
+            del self.results[next(iter(self.results))]
+
+    def _forget(self, fileName):
+        for key in [key for key in self.results if key[0] == fileName]:
+            del self.results[key]
+
+    def _handle(self, connection):
+        with self.lock:
+            self.active_requests += 1
+        try:
+            with connection.makefile("r", encoding="utf-8") as reader, connection.makefile("w", encoding="utf-8") as writer:
+                self._respond(reader, writer)
+        finally:
+            with self.lock:
+                self.active_requests -= 1
+                self.last_activity = time.monotonic()
+
+    def _respond(self, reader, writer):
+        for line in reader:
+            try:
+                request = json.loads(line)
+                for outcome in self.lint(request["files"], request.get("options", {}), request.get("cwd")):
+                    writer.write(json.dumps({"result": _encodeOutcome(outcome)}) + "\n")
+                    writer.flush()
+                writer.write(json.dumps({"done": True}) + "\n")
+            except Exception as e:
+                writer.write(json.dumps({"error": str(e)}) + "\n")
+            writer.flush()
+
+    def _watchIdle(self):
+        while True:
+            time.sleep(min(1.0, self.idle_timeout))
+            with self.lock:
+                idle = self.active_requests == 0 and time.monotonic() - self.last_activity > self.idle_timeout
+            if idle:
+                self.server.shutdown()
+                return
+
+    def serve(self):
+        """
+        Serves clients until the daemon has been idle for `idle_timeout` seconds.
+        """
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                daemon._handle(self.request)
+
+        if os.path.exists(self.socket_path):
+            if _listening(self.socket_path):
+                raise RuntimeError(f"❌ A cill daemon is already listening on {self.socket_path}")
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(self.socket_path)
+        with socketserver.ThreadingUnixStreamServer(self.socket_path, Handler) as server:
+            server.daemon_threads = True
+            self.server = server
+            watcher = threading.Thread(target=self._watchIdle, daemon=True)
+            watcher.start()
+            try:
+                server.serve_forever()
+            finally:
+                self.executor.shutdown(cancel_futures=True)
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)
+
+
+def _lintInDirectory(cwd, fileName, **options):
+    """Lints a template in a worker from the working directory of the client, see `runner.lintFile`."""
+    os.chdir(cwd)
+    # The worker outlives the request, the configuration is read again in case it was edited
+    flake8Config.cache_clear()
+    return lintFile(fileName, **options)
+
+
+def _listening(socket_path):
+    """Tells whether something accepts connections on a Unix domain socket."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def _encodeOutcome(outcome):
+    """Turns an outcome into JSON-serializable values, resource results as `status`/`errors` dicts."""
+    encoded = outcome._asdict()
+    if outcome.results:
+        resources = {name: ResourceResult.fromDict(record).asDict() for name, record in outcome.results["resources"].items()}
+        encoded["results"] = dict(outcome.results, resources=resources)
+    return encoded
+
+
+def _decodeOutcome(encoded):
+    """Rebuilds an outcome sent by `_encodeOutcome`."""
+    outcome = LintOutcome(**encoded)
+    if outcome.results:
+        resources = {name: ResourceResult.fromDict(record) for name, record in outcome.results["resources"].items()}
+        outcome = outcome._replace(results=dict(outcome.results, resources=resources))
+    return outcome
+
+
+def lintWithDaemon(files, socket_path, **options):
+    """
+    Lints templates through a running `cill serve` daemon.
+
+    Args:
+        files (list): The names of the files to lint.
+        socket_path (str): The socket the daemon listens on.
+        **options: Keyword arguments passed on to `linter`, like `args` or `cache_dir`.
+
+    Returns:
+        iterator: The LintOutcome of every file, in the order of `files`, followed by
+        the child templates of their nested stacks. Files the daemon did not answer,
+        because it failed or stopped, are reported as failed with the reason.
+
+    Raises:
+        OSError: If no daemon listens on the socket.
+    """
+    files = list(files)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+        request = {"files": [os.path.abspath(fileName) for fileName in files], "options": options, "cwd": os.getcwd()}
+        client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+    except OSError:
+        client.close()
+        raise
+    return _readOutcomes(client, files)
+
+
+def _readOutcomes(client, files):
+    names = {os.path.abspath(fileName): fileName for fileName in files}
+    unanswered = dict.fromkeys(names)
+    try:
+        with client, client.makefile("r", encoding="utf-8") as reader:
+            while True:
+                response = json.loads(reader.readline() or '{"error": "the daemon closed the connection"}')
+                if "error" in response:
+                    error = response["error"]
+                    break
+                if response.get("done"):
+                    return
+                outcome = _decodeOutcome(response["result"])
+                unanswered.pop(outcome.fileName, None)
+                # Report the files as they were passed, child templates keep the daemon's absolute path
+                yield outcome._replace(fileName=names.get(outcome.fileName, outcome.fileName))
+    except (OSError, ValueError) as e:
+        error = str(e)
+    # Raising here would stop the caller halfway through its report, the files left are failed instead
+    message = f"❌ The cill daemon failed: {error}"
+    for path in unanswered:
+        with recordResults() as results:
+            reportProblem(message)
+        yield LintOutcome(names[path], False, message + "\n", {}, None, results)
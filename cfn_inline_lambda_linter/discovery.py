@@ -0,0 +1,193 @@
+import fnmatch
+import os
+import re
+from collections import deque
+
+#: Files a directory walk picks up as templates
+TEMPLATE_SUFFIXES = (".yaml", ".yml", ".json", ".template")
+
+
+def _translate(pattern):
+    """Turns a .gitignore glob into a regular expression matching paths relative to its directory."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+        elif pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+        elif pattern[index] == "*":
+            regex += "[^/]*"
+            index += 1
+        elif pattern[index] == "?":
+            regex += "[^/]"
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 1:]:
+            end = pattern.index("]", index + 1)
+            regex += "[" + pattern[index + 1:end].replace("!", "^", 1) + "]"
+            index = end + 1
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+    # Patterns without a slash match at any depth below their directory
+    return re.compile(("" if anchored else "(?:.*/)?") + regex + "$")
+
+
+class IgnoreRules:
+    """
+    The .gitignore rules that apply to a directory.
+
+    Rules come from the `.gitignore` of every directory from the root of the
+    repository down to the directory, and from `.git/info/exclude`. Like git,
+    the last matching rule wins and `!` re-includes a path.
+
+    Args:
+        rules (list): The `(directory, regex, negated, directory_only)` of every rule.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+
+    def extend(self, directory, path=None):
+        """
+        Returns the rules with those of an ignore file of a directory added, itself when it has none.
+
+        Args:
+            directory (str): The directory the patterns of the file are relative to.
+            path (str): The ignore file, the `.gitignore` of the directory by default.
+        """
+        try:
+            with open(path or os.path.join(directory, ".gitignore"), encoding="utf-8") as file:
+                lines = file.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return self
+        base = os.path.abspath(directory)
+        rules = list(self.rules)
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            line = line[1:] if negated else line
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            if line:
+                rules.append((base, _translate(line), negated, directory_only))
+        return IgnoreRules(rules)
+
+    def ignored(self, path, is_directory=False):
+        """
+        Tells whether a path is ignored.
+
+        Args:
+            path (str): The path of a file or directory.
+            is_directory (bool): Whether the path is a directory.
+
+        Returns:
+            bool: True if the last rule matching the path ignores it.
+        """
+        path = os.path.abspath(path)
+        ignored = False
+        for base, regex, negated, directory_only in self.rules:
+            if directory_only and not is_directory or not path.startswith(base + os.sep):
+                continue
+            if regex.match(path[len(base) + 1:].replace(os.sep, "/")):
+                ignored = not negated
+        return ignored
+
+
+def repositoryRules(directory):
+    """
+    Collects the ignore rules that apply to a directory from the repository it is in.
+
+    Args:
+        directory (str): The directory a walk starts in.
+
+    Returns:
+        IgnoreRules: The rules of `.git/info/exclude` and of the `.gitignore` files
+        of the directories above, the ones of `directory` itself excluded.
+    """
+    directory = os.path.abspath(directory)
+    ancestors = []
+    current = directory
+    while not os.path.exists(os.path.join(current, ".git")):
+        parent = os.path.dirname(current)
+        if parent == current:
+            # Not in a repository, only the .gitignore files of the walk apply
+            return IgnoreRules()
+        current = parent
+        ancestors.append(current)
+    rules = IgnoreRules().extend(current, os.path.join(current, ".git", "info", "exclude"))
+    for ancestor in reversed(ancestors):
+        rules = rules.extend(ancestor)
+    return rules
+
+
+def _excluded(path, patterns):
+    name = os.path.basename(path.rstrip(os.sep))
+    return any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _scanDirectory(directory, rules, exclude):
+    """Lists the templates and the directories to walk next of a single directory."""
+    rules = rules.extend(directory)
+    files = []
+    directories = []
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return files, directories, rules
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name != ".git" and not rules.ignored(entry.path, True) and not _excluded(entry.path, exclude):
+                directories.append(entry.path)
+        elif entry.name.endswith(TEMPLATE_SUFFIXES) and entry.is_file() \
+                and not rules.ignored(entry.path) and not _excluded(entry.path, exclude):
+            files.append(entry.path)
+    return sorted(files), sorted(directories), rules
+
+
+def discoverTemplates(paths, exclude=(), jobs=None):
+    """
+    Expands directories into the templates below them, streaming files as they are found.
+
+    Files are passed on as they are, unless they match `exclude`. Directories
+    are walked breadth first with `os.scandir` in a pool of threads, skipping
+    what .gitignore rules and `exclude` match, and every `*.yaml`, `*.yml`,
+    `*.json` and `*.template` file is yielded as soon as its directory has
+    been listed. The order is the same on every run.
+
+    Args:
+        paths (list): Files and directories to lint.
+        exclude (list): Globs matched against the path and the name of files and
+            directories, each may hold several separated by commas.
+        jobs (int): Number of directories listed at the same time.
+
+    Yields:
+        str: The path of every template.
+    """
+    exclude = [pattern for value in exclude or () for pattern in value.split(",") if pattern]
+    executor = None
+    try:
+        for path in paths:
+            if not os.path.isdir(path):
+                if not _excluded(path, exclude):
+                    yield path
+                continue
+
+            if executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                executor = ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) + 4))
+            pending = deque([executor.submit(_scanDirectory, path, repositoryRules(path), exclude)])
+            while pending:
+                files, directories, rules = pending.popleft().result()
+                pending.extend(executor.submit(_scanDirectory, directory, rules, exclude) for directory in directories)
+                yield from files
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,313 @@
+import abc
+import io
+import os
+import subprocess
+import tempfile
+import threading
+
+from flake8 import checker, processor
+from flake8.main.application import Application
+
+from .cache import flake8Config
+from .timings import timed, timedChildProcess
+
+
+def buildFlake8Args(args=None):
+    """
+    Turns the user supplied `--args` string into a flake8 argument list.
+
+    F821 (undefined name) is always ignored because inline code commonly
+    references CloudFormation substitutions like ${BucketName}.
+
+    Args:
+        args (str): Arguments separated by a single space, or None.
+
+    Returns:
+        list: The flake8 command line arguments.
+    """
+    if args is None:
+        return ["--ignore=F821"]
+
+    tokens = args.split()
+    if "F821" in args:
+        return tokens
+
+    if "--ignore" not in args:
+        return ["--ignore=F821"] + tokens
+
+    flake8_args = []
+    extend_next = False
+    for token in tokens:
+        if extend_next:
+            token = token + ",F821"
+            extend_next = False
+        elif token.startswith("--ignore="):
+            token = token + ",F821"
+        elif token == "--ignore":
+            extend_next = True
+        flake8_args.append(token)
+    return flake8_args
+
+
+class LintEngine(abc.ABC):
+    """Base class of the lint engines, linting a batch one source at a time."""
+
+    display_name = "stdin"
+
+    @abc.abstractmethod
+    def lint(self, source):
+        """
+        Lints a single Python source.
+
+        Args:
+            source (str): The Python code.
+
+        Returns:
+            str: The flake8 report of the source.
+        """
+
+    def lintMany(self, sources):
+        """
+        Lints several Python sources.
+
+        Args:
+            sources (dict): Python code keyed by resource name.
+
+        Returns:
+            dict: The flake8 report of every source keyed by resource name.
+        """
+        reports = {}
+        for name, source in sources.items():
+            with timed("resource", name):
+                reports[name] = self.lint(source)
+        return reports
+
+
+class _SourceChecker(checker.FileChecker):
+    """A flake8 file checker that is fed source lines instead of a path."""
+
+    def __init__(self, *, lines, **kwargs):
+        self._lines = lines
+        super().__init__(**kwargs)
+
+    def _make_processor(self):
+        return processor.FileProcessor(self.filename, self.options, lines=self._lines)
+
+
+class Flake8Engine(LintEngine):
+    """
+    Lints Python sources in-process using a single flake8 application.
+
+    The option parsing, plugin loading and style guide setup happen once when
+    the engine is created, every call to `lint` only runs the checks. Reports
+    go through the single formatter of the application, so threads take
+    turns formatting them.
+    """
+
+    def __init__(self, args=None):
+        self.flake8_args = buildFlake8Args(args)
+        self.lock = threading.Lock()
+        self.application = Application()
+        try:
+            self.application.initialize(["-"] + self.flake8_args)
+        except SystemExit as e:
+            raise RuntimeError(f"❌ flake8 could not parse the arguments {self.flake8_args} (exit code {e.code})")
+
+    def lint(self, source):
+        """
+        Lints a single Python source.
+
+        Args:
+            source (str): The Python code to lint.
+
+        Returns:
+            str: The flake8 report, empty when no errors were found.
+        """
+        file_checker = _SourceChecker(
+            lines=io.StringIO(source).readlines(),
+            filename=self.display_name,
+            plugins=self.application.plugins.checkers,
+            options=self.application.options,
+        )
+        _, results, _ = file_checker.run_checks()
+        results.sort(key=lambda result: (result[1], result[2]))
+
+        formatter = self.application.formatter
+        output = io.StringIO()
+        with self.lock:
+            formatter.output_fd = output
+            try:
+                self._report(results)
+            finally:
+                formatter.output_fd = None
+        return output.getvalue()
+
+    def _report(self, results):
+        with self.application.guide.processing_file(self.display_name):
+            for code, line_number, column, text, physical_line in results:
+                self.application.guide.handle_error(
+                    code=code,
+                    filename=self.display_name,
+                    line_number=line_number,
+                    column_number=column,
+                    text=text,
+                    physical_line=physical_line,
+                )
+
+
+class SubprocessEngine(LintEngine):
+    """
+    Lints Python sources by starting `python -m flake8 -` for every source.
+
+    Args:
+        args (str): Args you want to pass to the lint.
+        timeout (float): Seconds a source may take to lint, None to wait forever.
+    """
+
+    def __init__(self, args=None, timeout=None):
+        self.flake8_args = buildFlake8Args(args)
+        self.timeout = timeout
+
+    def lint(self, source):
+        """
+        Lints a single Python source in a fresh flake8 process.
+
+        Args:
+            source (str): The Python code to lint.
+
+        Returns:
+            str: The flake8 report, empty when no errors were found.
+        """
+        with timedChildProcess("flake8"):
+            process = subprocess.Popen(
+                ['python', '-m', 'flake8', "-"] + self.flake8_args,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            stdout, stderr = self._communicate(process, source.encode(), self.timeout)
+
+        if process.returncode not in [0, 1]:  # 0: No issues, 1: Linting errors
+            raise RuntimeError(f"❌ flake8 process failed with return code {process.returncode}: {stderr.decode()}")
+
+        return stdout.decode()
+
+    @staticmethod
+    def _communicate(process, input, timeout):
+        try:
+            return process.communicate(input=input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RuntimeError(f"❌ flake8 process did not finish within {timeout} seconds")
+
+
+class BatchEngine(SubprocessEngine):
+    """
+    Lints a batch of Python sources with a single flake8 process.
+
+    Every source is written to its own file in a temporary directory and
+    flake8 runs once on that directory, using its own `--jobs` parallelism.
+    The report is then split back per source. The timeout of a source is
+    given to the process once for every source of the batch.
+    """
+
+    def lintMany(self, sources):
+        """
+        Lints several Python sources with one flake8 process.
+
+        Args:
+            sources (dict): Python code keyed by resource name.
+
+        Returns:
+            dict: The flake8 report of every source keyed by resource name.
+        """
+        if not sources:
+            return {}
+
+        with tempfile.TemporaryDirectory(prefix="cill-") as tree:
+            paths = {}
+            for index, (name, source) in enumerate(sources.items()):
+                # Logical IDs are alphanumeric, the index keeps names from different
+                # templates unique when a caller batches a whole run
+                path = os.path.join(tree, f"{index}_{name}.py")
+                with open(path, "w", encoding="utf-8", newline="") as file:
+                    file.write(source)
+                paths[path] = name
+
+            with timedChildProcess("flake8-batch"):
+                process = subprocess.Popen(
+                    ['python', '-m', 'flake8', tree] + self.flake8_args,
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+                timeout = self.timeout * len(sources) if self.timeout is not None else None
+                stdout, stderr = self._communicate(process, None, timeout)
+
+        if process.returncode not in [0, 1]:  # 0: No issues, 1: Linting errors
+            raise RuntimeError(f"❌ flake8 process failed with return code {process.returncode}: {stderr.decode()}")
+
+        return splitBatchReport(stdout.decode(), paths, self.display_name)
+
+    def lint(self, source):
+        return self.lintMany({"source": source})["source"]
+
+
+def splitBatchReport(report, paths, display_name="stdin"):
+    """
+    Splits the report of a flake8 run over several files back per file.
+
+    Lines that do not start with a known path (like `--show-source` output)
+    belong to the file of the line before them. Paths are replaced by the
+    display name so the report reads the same as a report for stdin.
+
+    Args:
+        report (str): The flake8 output.
+        paths (dict): Resource names keyed by the path flake8 reported on.
+        display_name (str): The name to report instead of the path.
+
+    Returns:
+        dict: The report of every resource keyed by resource name.
+    """
+    reports = {name: [] for name in paths.values()}
+    current = None
+    for line in report.splitlines(keepends=True):
+        path = line[:line.find(".py:") + 3]
+        if path in paths:
+            current = paths[path]
+            line = display_name + line[len(path):]
+        if current is not None:
+            reports[current].append(line)
+    return {name: "".join(lines) for name, lines in reports.items()}
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def getEngine(args=None, use_subprocess=False, batch=False, timeout=None):
+    """
+    Returns the lint engine for the given arguments, building it on first use.
+
+    Engines are kept for the lifetime of the process so the flake8 setup is
+    paid once per run and not once per Lambda function. flake8 reads its
+    configuration when the engine is set up, so an engine is built for every
+    configuration found from the working directory.
+
+    Args:
+        args (str): Args you want to pass to the lint.
+        use_subprocess (bool): Use a flake8 process per source instead of the in-process engine.
+        batch (bool): Use a single flake8 process per batch of sources.
+        timeout (float): Seconds the flake8 process of a source may take, None to wait forever.
+            The in-process engine cannot be stopped and ignores it.
+
+    Returns:
+        LintEngine: The engine to lint sources with.
+    """
+    key = (args, use_subprocess, batch, timeout, flake8Config(os.getcwd(), tuple(buildFlake8Args(args))))
+    with _engines_lock:
+        if key not in _engines:
+            if batch:
+                _engines[key] = BatchEngine(args, timeout)
+            elif use_subprocess:
+                _engines[key] = SubprocessEngine(args, timeout)
+            else:
+                _engines[key] = Flake8Engine(args)
+        return _engines[key]
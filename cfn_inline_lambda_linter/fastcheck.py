@@ -0,0 +1,126 @@
+"""
+Checks of the fast tier (`--mode fast`), linting Python inline code without flake8.
+
+The code is parsed once with `ast` and compiled in-process, and the Lambda
+checks below run on the same tree. Findings use flake8's report format, with
+E999 for syntax errors like flake8 and CILL codes for the Lambda checks.
+"""
+import ast
+
+from .loader import InlineCode
+
+#: CloudFormation rejects `ZipFile` code larger than this many bytes
+INLINE_CODE_LIMIT = 4096
+#: Inline code is deployed as index.py, the module every handler must name
+INLINE_MODULE = "index"
+
+SYNTAX_ERROR = "E999"
+CODE_TOO_LARGE = "CILL001"
+HANDLER_NOT_FOUND = "CILL002"
+NO_RESPONSE = "CILL003"
+
+
+def _definedNames(statements, names):
+    """Collects the names bound at the top level of a module, looking into if/try/with blocks."""
+    for statement in statements:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names[statement.name] = statement
+        elif isinstance(statement, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+            for target in targets:
+                for node in ast.walk(target):
+                    if isinstance(node, ast.Name):
+                        names[node.id] = statement
+        elif isinstance(statement, (ast.Import, ast.ImportFrom)):
+            for alias in statement.names:
+                names[alias.asname or alias.name.split(".")[0]] = statement
+        if not isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for block in ("body", "orelse", "finalbody"):
+                _definedNames(getattr(statement, block, []), names)
+            for handler in getattr(statement, "handlers", []):
+                _definedNames(handler.body, names)
+    return names
+
+
+def _responds(tree):
+    """Tells whether code answers CloudFormation, through cfnresponse or the ResponseURL of the event."""
+    senders = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "cfnresponse":
+            senders.update(alias.asname or alias.name for alias in node.names if alias.name == "send")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and node.value == "ResponseURL":
+            return True
+        if isinstance(node, ast.Call):
+            function = node.func
+            if isinstance(function, ast.Attribute) and function.attr == "send" \
+                    and isinstance(function.value, ast.Name) and function.value.id == "cfnresponse":
+                return True
+            if isinstance(function, ast.Name) and function.id in senders:
+                return True
+    return False
+
+
+def checkPython(source, handler=None, custom_resource=False):
+    """
+    Parses Python inline code once and runs the Lambda checks on its tree.
+
+    Args:
+        source (str): The inline code.
+        handler (str): The `Handler` of the function, None to skip the handler check.
+        custom_resource (bool): Whether custom resources send their requests to the function.
+
+    Returns:
+        list: The `(line, column, code, message)` of every finding, positions in the code.
+    """
+    findings = []
+    size = len(source.encode("utf-8"))
+    if size > INLINE_CODE_LIMIT:
+        findings.append((1, 1, CODE_TOO_LARGE, f"inline code is {size} bytes, CloudFormation accepts at most {INLINE_CODE_LIMIT}"))
+
+    try:
+        tree = ast.parse(source, "index.py")
+        # Errors like 'return' outside of a function are only raised when compiling the tree
+        compile(tree, "index.py", "exec", dont_inherit=True)
+    except SyntaxError as e:
+        findings.append((e.lineno or 1, e.offset or 1, SYNTAX_ERROR, f"{type(e).__name__}: {e.msg}"))
+        return sorted(findings)
+    except ValueError as e:
+        findings.append((1, 1, SYNTAX_ERROR, f"ValueError: {e}"))
+        return sorted(findings)
+
+    names = _definedNames(tree.body, {})
+    function = None
+    if handler is not None:
+        module, _, function = handler.rpartition(".")
+        if module != INLINE_MODULE:
+            findings.append((1, 1, HANDLER_NOT_FOUND, f"Handler '{handler}' must name the module '{INLINE_MODULE}', inline code is deployed as index.py"))
+        elif function not in names:
+            findings.append((1, 1, HANDLER_NOT_FOUND, f"handler '{function}' of Handler '{handler}' is not defined"))
+
+    if custom_resource and not _responds(tree):
+        line = names[function].lineno if function in names else 1
+        findings.append((line, 1, NO_RESPONSE, "custom resource handler never calls cfnresponse.send, the stack waits for its response until it times out"))
+    return sorted(findings)
+
+
+def formatFindings(findings, code=None):
+    """
+    Formats findings the way flake8 reports them.
+
+    Args:
+        findings (list): The findings of `checkPython`.
+        code (InlineCode): The code as read from the template, to report template positions.
+            Findings are reported relative to the inline code, on `stdin`, without it.
+
+    Returns:
+        str: The report, empty without findings.
+    """
+    lines = []
+    for line, column, rule, message in findings:
+        path = "stdin"
+        if isinstance(code, InlineCode) and code.fileName is not None:
+            path = code.fileName
+            line, column = code.templatePosition(line, column)
+        lines.append(f"{path}:{line}:{column}: {rule} {message}\n")
+    return "".join(lines)
@@ -0,0 +1,129 @@
+import hashlib
+import io
+import json
+import os
+import subprocess
+from functools import lru_cache
+
+from .intrinsics import IntrinsicResolver, Unresolvable
+from .loader import loadTemplate
+from .resources import ResourceIndex, customResourceProviders, lambdaFunctions
+
+#: The revision `git show` reads the staged version of a file from
+STAGED = ":0"
+
+
+@lru_cache(maxsize=None)
+def _checkRevision(directory, revision):
+    result = subprocess.run(
+        ["git", "-C", directory, "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"❌ '{revision}' is not a git revision of the repository in '{directory}'")
+
+
+def gitShow(fileName, revision):
+    """
+    Returns the content of a file at a git revision.
+
+    Args:
+        fileName (str): The path of the file in the working tree.
+        revision (str): The git revision, or ":0" (`STAGED`) for the staged version.
+
+    Returns:
+        str: The content of the file, None if the file does not exist at that revision.
+
+    Raises:
+        RuntimeError: If the revision does not exist or git cannot be run.
+    """
+    directory, name = os.path.split(os.path.abspath(fileName))
+    if revision != STAGED:
+        _checkRevision(directory, revision)
+    result = subprocess.run(
+        ["git", "-C", directory, "show", f"{revision}:./{name}"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode(errors="replace")
+        if "does not exist" in stderr or "exists on disk, but not in" in stderr:
+            return None
+        raise RuntimeError(f"❌ git show failed with return code {result.returncode}: {stderr}")
+    return result.stdout.decode("utf-8")
+
+
+def readBaseTemplate(fileName, revision):
+    """
+    Parses a template as it is at a git revision.
+
+    Args:
+        fileName (str): The path of the template in the working tree.
+        revision (str): The git revision to compare against.
+
+    Returns:
+        dict: The parsed template, None if it did not exist at that revision.
+    """
+    content = gitShow(fileName, revision)
+    if content is None:
+        return None
+    return loadTemplate(fileName, io.StringIO(content), streaming=True)
+
+
+def lambdaFingerprints(template):
+    """
+    Hashes what decides the lint result of every inline Lambda of a template.
+
+    The fingerprint covers the `Code`, `Runtime` and `Handler` properties as
+    they resolve over the Parameters, Mappings and Conditions of the template,
+    so changing a mapping a runtime is looked up in counts as a change, and
+    whether custom resources send their requests to the function, which the
+    checks of the fast tier read. Values that cannot be resolved are
+    fingerprinted as written. SAM functions are fingerprinted with the
+    properties they inherit from `Globals`.
+
+    Args:
+        template (dict): The parsed template.
+
+    Returns:
+        dict: The fingerprint of every Lambda function keyed by logical ID.
+    """
+    if not isinstance(template, dict) or not isinstance(template.get("Resources"), dict):
+        return {}
+    parameters = template.get("Parameters") or {}
+    resolver = IntrinsicResolver(parameters, template.get("Mappings"), template.get("Conditions"))
+
+    def resolved(value, placeholders=False):
+        try:
+            return resolver.resolve(value, placeholders)
+        except Unresolvable:
+            return value
+
+    index = ResourceIndex(template["Resources"])
+    providers = customResourceProviders(index)
+    fingerprints = {}
+    for name, resource in lambdaFunctions(index, template.get("Globals")).items():
+        properties = resource.get("Properties") or {}
+        runtime = resolved(properties.get("Runtime"))
+        # A runtime naming a parameter uses its default, see extractLambdaCode
+        parameter = parameters.get(runtime) if isinstance(runtime, str) else None
+        material = json.dumps(
+            [resolved(properties.get("Code"), True), runtime, parameter, resolved(properties.get("Handler")), name in providers],
+            sort_keys=True, default=str,
+        )
+        fingerprints[name] = hashlib.sha256(material.encode()).hexdigest()
+    return fingerprints
+
+
+def unchangedLambdas(template, base_template):
+    """
+    Finds the Lambda functions whose inline code and runtime did not change.
+
+    Args:
+        template (dict): The template as it is now.
+        base_template (dict): The template at the base revision, None if it is new.
+
+    Returns:
+        set: Logical IDs of the Lambda functions that are the same in both templates.
+    """
+    base = lambdaFingerprints(base_template)
+    return {name for name, fingerprint in lambdaFingerprints(template).items() if base.get(name) == fingerprint}
@@ -0,0 +1,218 @@
+import re
+
+# Values only known once a stack is deployed
+PSEUDO_PARAMETERS = (
+    "AWS::AccountId", "AWS::NotificationARNs", "AWS::NoValue", "AWS::Partition",
+    "AWS::Region", "AWS::StackId", "AWS::StackName", "AWS::URLSuffix",
+)
+
+_SUB_VARIABLE = re.compile(r"\$\{([^}]*)\}")
+
+
+class Unresolvable(Exception):
+    """
+    Raised when a value depends on something that is only known at deploy time.
+    """
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return ("{", tuple((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return ("[", tuple(_freeze(item) for item in value))
+    return value
+
+
+class IntrinsicResolver:
+    """
+    Evaluates the intrinsic functions of a template over its Parameters, Mappings and Conditions.
+
+    Supported are `Ref`, `Fn::FindInMap`, `Fn::If`, `Fn::Sub`, `Fn::Join`,
+    `Fn::Select` and `Fn::Split`, and the condition functions `Fn::Equals`,
+    `Fn::Not`, `Fn::And`, `Fn::Or` and `Condition`. Parameters resolve to
+    their `Default`. Results are memoized per expression, so functions
+    sharing a runtime mapping resolve it once per template.
+
+    Args:
+        parameters (dict): The Parameters section of the template.
+        mappings (dict): The Mappings section of the template.
+        conditions (dict): The Conditions section of the template.
+    """
+
+    def __init__(self, parameters=None, mappings=None, conditions=None):
+        self.parameters = parameters or {}
+        self.mappings = mappings or {}
+        self.conditions = conditions or {}
+        self._resolved = {}
+        self._conditions = {}
+
+    def resolve(self, value, placeholders=False):
+        """
+        Resolves a value of the template.
+
+        Args:
+            value: A scalar, list or intrinsic function.
+            placeholders (bool): Render references that cannot be resolved as `${Name}`,
+                the way `Fn::Sub` templates spell them, instead of raising.
+
+        Returns:
+            The resolved value.
+
+        Raises:
+            Unresolvable: If the value depends on resources, pseudo parameters or
+            parameters without a default, and `placeholders` is off or the value is not text.
+        """
+        if not isinstance(value, (dict, list)):
+            return value
+        key = (_freeze(value), placeholders)
+        if key not in self._resolved:
+            try:
+                self._resolved[key] = (True, self._evaluate(value, placeholders))
+            except Unresolvable as e:
+                self._resolved[key] = (False, e)
+        resolved, result = self._resolved[key]
+        if not resolved:
+            raise result
+        return result
+
+    def _evaluate(self, value, placeholders):
+        if isinstance(value, list):
+            return [self.resolve(item, placeholders) for item in value]
+        if len(value) != 1:
+            return {key: self.resolve(item, placeholders) for key, item in value.items()}
+
+        function, argument = next(iter(value.items()))
+        if function == "Ref":
+            return self._reference(argument, placeholders)
+        if function == "Fn::FindInMap":
+            return self._findInMap(argument)
+        if function == "Fn::If":
+            if not isinstance(argument, list) or len(argument) != 3:
+                raise Unresolvable("Fn::If expects a condition and two values")
+            return self.resolve(argument[1] if self.condition(argument[0]) else argument[2], placeholders)
+        if function == "Fn::Sub":
+            return self._substitute(argument, placeholders)
+        if function == "Fn::Join":
+            if not isinstance(argument, list) or len(argument) != 2:
+                raise Unresolvable("Fn::Join expects a delimiter and a list of values")
+            delimiter, items = self.resolve(argument[0]), self.resolve(argument[1], placeholders)
+            if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+                raise Unresolvable("Fn::Join can only join text")
+            return delimiter.join(items)
+        if function == "Fn::Select":
+            if not isinstance(argument, list) or len(argument) != 2:
+                raise Unresolvable("Fn::Select expects an index and a list of values")
+            index, items = self.resolve(argument[0]), self.resolve(argument[1], placeholders)
+            try:
+                return items[int(index)]
+            except (IndexError, TypeError, ValueError):
+                raise Unresolvable(f"Fn::Select index {index} is not in the list") from None
+        if function == "Fn::Split":
+            if not isinstance(argument, list) or len(argument) != 2:
+                raise Unresolvable("Fn::Split expects a delimiter and a text")
+            delimiter, text = self.resolve(argument[0]), self.resolve(argument[1], placeholders)
+            if not isinstance(delimiter, str) or not isinstance(text, str):
+                raise Unresolvable("Fn::Split can only split text")
+            return text.split(delimiter)
+        if function.startswith("Fn::") or function == "Condition":
+            raise Unresolvable(f"{function} cannot be resolved before deployment")
+        return {function: self.resolve(argument, placeholders)}
+
+    def _reference(self, name, placeholders):
+        parameter = self.parameters.get(name) if isinstance(name, str) else None
+        if isinstance(parameter, dict) and "Default" in parameter:
+            default = parameter["Default"]
+            # List parameters default to comma separated text
+            if isinstance(default, str) and parameter.get("Type", "").startswith(("CommaDelimitedList", "List<")):
+                return default.split(",")
+            return default
+        if placeholders and isinstance(name, str):
+            return f"${{{name}}}"
+        if parameter is not None:
+            raise Unresolvable(f"parameter '{name}' has no Default")
+        if name in PSEUDO_PARAMETERS:
+            raise Unresolvable(f"pseudo parameter '{name}' is only known at deploy time")
+        raise Unresolvable(f"'{name}' refers to a resource")
+
+    def _findInMap(self, argument):
+        if not isinstance(argument, list) or len(argument) < 3:
+            raise Unresolvable("Fn::FindInMap expects a map name and two keys")
+        path = [self.resolve(item) for item in argument[:3]]
+        value = self.mappings
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                raise Unresolvable(f"Fn::FindInMap found no {'/'.join(map(str, path))} in Mappings")
+            value = value[key]
+        return self.resolve(value)
+
+    def _substitute(self, argument, placeholders):
+        variables = {}
+        if isinstance(argument, list):
+            if not argument or not isinstance(argument[0], str):
+                raise Unresolvable("Fn::Sub expects a text")
+            variables = argument[1] if len(argument) > 1 and isinstance(argument[1], dict) else {}
+            argument = argument[0]
+        if not isinstance(argument, str):
+            raise Unresolvable("Fn::Sub expects a text")
+
+        def replace(match):
+            name = match.group(1)
+            if name.startswith("!"):
+                return "${" + name[1:] + "}"
+            if name in variables:
+                value = self.resolve(variables[name], placeholders)
+            elif "." in name:
+                # ${Resource.Attribute} is a Fn::GetAtt
+                if placeholders:
+                    return match.group(0)
+                raise Unresolvable(f"'{name}' is an attribute of a resource")
+            else:
+                value = self._reference(name, placeholders)
+            if not isinstance(value, str):
+                raise Unresolvable(f"'{name}' is not text")
+            return value
+
+        return _SUB_VARIABLE.sub(replace, argument)
+
+    def condition(self, name):
+        """
+        Evaluates a condition of the Conditions section, or an inline condition function.
+
+        Raises:
+            Unresolvable: If the condition does not exist or depends on unknown values.
+        """
+        if isinstance(name, str):
+            if name not in self._conditions:
+                if name not in self.conditions:
+                    raise Unresolvable(f"condition '{name}' is not defined")
+                self._conditions[name] = None  # Guards against conditions referring to themselves
+                try:
+                    self._conditions[name] = (True, self._truth(self.conditions[name]))
+                except Unresolvable as e:
+                    # Later evaluations give the same reason rather than hitting the guard
+                    self._conditions[name] = (False, e)
+            if self._conditions[name] is None:
+                raise Unresolvable(f"condition '{name}' refers to itself")
+            evaluated, result = self._conditions[name]
+            if not evaluated:
+                raise result
+            return result
+        return self._truth(name)
+
+    def _truth(self, expression):
+        if isinstance(expression, dict) and len(expression) == 1:
+            function, argument = next(iter(expression.items()))
+            if function == "Condition":
+                return self.condition(argument)
+            if function == "Fn::Equals" and isinstance(argument, list) and len(argument) == 2:
+                first, second = (self.resolve(item) for item in argument)
+                return str(first) == str(second)
+            if function == "Fn::Not" and isinstance(argument, list) and len(argument) == 1:
+                return not self._truth(argument[0])
+            if function == "Fn::And" and isinstance(argument, list):
+                return all(self._truth(item) for item in argument)
+            if function == "Fn::Or" and isinstance(argument, list):
+                return any(self._truth(item) for item in argument)
+        if isinstance(expression, str) and expression.lower() in ("true", "false"):
+            return expression.lower() == "true"
+        raise Unresolvable(f"condition {expression} cannot be evaluated")
@@ -1,79 +1,128 @@
+import io
+import json
 import yaml
-import subprocess
 import sys
 from colorama import Fore, Style
 from pathlib import Path
+from .backends import getBackend, runtimeFamily
+from .cache import ResultTable, getCache, getResultTable
+from .intrinsics import IntrinsicResolver, Unresolvable
+from .loader import LAMBDA_RESOURCE_TYPES, lambdaSubset, loadTemplate
+from .reporters import progress, reportProblem, reportResources, reportSkipped, reportStacks
+from .resources import ResourceIndex, customResourceProviders, lambdaFunctions
+from .results import ResourceResult
+from .stacks import findNestedStacks
+from .timings import currentTimings, timed
 
 
-def readFile(fileName):
+def readFile(fileName, streaming=False, revision=None, cache_dir=None):
     """
     Reads a CloudFormation template file and parses its content.
 
     Args:
         fileName (str): The name of the file to read and parse.
+        streaming (bool): Only build the Lambda resources and the sections needed to resolve them.
+            JSON templates are always parsed whole with the json module.
+        revision (str): Read the file as it is at this git revision, ":0" for the staged version.
+        cache_dir (str): Directory of the parsed template cache, None to always parse the file.
+            Templates read through the cache only hold their Lambda relevant parts, see `loader.lambdaSubset`.
 
     Returns:
         dict: The parsed CloudFormation template.
     """
-    print(Fore.CYAN + f"📂 Reading and parsing the template file: {fileName}..." + Style.RESET_ALL)
+    progress(Fore.CYAN, "📂 Reading and parsing the template file: {}...", fileName)
     
     try:
-        with open(fileName, 'r') as file:
-            template = yaml.load(file, Loader=yaml.BaseLoader)
-        print(Fore.GREEN + f"✅ Successfully read and parsed the template file: {fileName}" + Style.RESET_ALL)
+        if revision is None and cache_dir is not None:
+            from .cache import getTemplateCache
+
+            cache = getTemplateCache(cache_dir)
+            with open(fileName, 'rb') as file:
+                content = file.read()
+            template = cache.get(fileName, content)
+            if template is not None:
+                progress(Fore.GREEN, "✅ Successfully read the template file: {} (cached)", fileName)
+                return template
+            # Decoded like open() in text mode would
+            template = lambdaSubset(loadTemplate(fileName, io.TextIOWrapper(io.BytesIO(content)), streaming))
+            cache.put(fileName, content, template)
+        elif revision is None:
+            with open(fileName, 'r') as file:
+                template = loadTemplate(fileName, file, streaming)
+        else:
+            from .incremental import gitShow
+
+            content = gitShow(fileName, revision)
+            if content is None:
+                raise FileNotFoundError(f"'{fileName}' does not exist at git revision '{revision}'")
+            template = loadTemplate(fileName, io.StringIO(content), streaming)
+        progress(Fore.GREEN, "✅ Successfully read and parsed the template file: {}", fileName)
         return template
     except FileNotFoundError:
-        print(Fore.RED + f"❌ Error: File '{fileName}' not found." + Style.RESET_ALL)
+        progress(Fore.RED, "❌ Error: File '{}' not found.", fileName)
         raise
     except yaml.YAMLError as e:
-        print(Fore.RED + f"❌ Error parsing YAML in file '{fileName}': {e}" + Style.RESET_ALL)
+        progress(Fore.RED, "❌ Error parsing YAML in file '{}': {}", fileName, e)
+        raise
+    except json.JSONDecodeError as e:
+        progress(Fore.RED, "❌ Error parsing JSON in file '{}': {}", fileName, e)
         raise
     except Exception as e:
-        print(Fore.RED + f"❌ Unexpected error while reading the file '{fileName}': {e}" + Style.RESET_ALL)
+        progress(Fore.RED, "❌ Unexpected error while reading the file '{}': {}", fileName, e)
         raise
 
-def findLambdaResources(resources):
+def findLambdaResources(resources, index=None):
     """
-    Scans the CloudFormation resources for AWS Lambda functions.
+    Scans the CloudFormation resources for AWS Lambda and SAM functions.
 
     Args:
         resources (dict): The CloudFormation resources.
+        index (ResourceIndex): The resources grouped by type, built from `resources` when not given.
 
     Returns:
         dict: A dictionary with Lambda functions' resource names and their initial statuses.
     """
-    print(Fore.CYAN + "🔍 Scanning resources for AWS Lambda functions..." + Style.RESET_ALL)
+    progress(Fore.CYAN, "🔍 Scanning resources for AWS Lambda functions...")
     
     dict_to_check = {}
     try:
-        for i in resources:
-            if resources[i].get("Type") == "AWS::Lambda::Function":
-                dict_to_check[i] = {"status": "CodeNotFormatted"}
+        if index is None:
+            index = ResourceIndex(resources)
+        for i in index.ofType(*LAMBDA_RESOURCE_TYPES):
+            dict_to_check[i] = ResourceResult("CodeNotFormatted")
         
         if dict_to_check:
-            print(Fore.GREEN + f"✅ Found {len(dict_to_check)} Lambda function(s) to check." + Style.RESET_ALL)
+            progress(Fore.GREEN, "✅ Found {} Lambda function(s) to check.", len(dict_to_check))
         else:
-            print(Fore.YELLOW + "⚠️ No AWS Lambda functions found in the resources." + Style.RESET_ALL)
+            progress(Fore.YELLOW, "⚠️ No AWS Lambda functions found in the resources.")
         
         return dict_to_check
     except KeyError as e:
-        print(Fore.RED + f"❌ Error: Missing expected key in resources: {e}" + Style.RESET_ALL)
+        progress(Fore.RED, "❌ Error: Missing expected key in resources: {}", e)
         raise
     except Exception as e:
-        print(Fore.RED + f"❌ Unexpected error while scanning resources: {e}" + Style.RESET_ALL)
+        progress(Fore.RED, "❌ Unexpected error while scanning resources: {}", e)
         raise
 
 
 
-def extractLambdaCode(resources, parameters, dict_to_check, args=None):
+def extractLambdaCode(resources, parameters, dict_to_check, args=None, use_subprocess=False, batch=False, cache_dir=None, resolver=None, backend_settings=None, mode="full", custom_resources=()):
     """
-    Processes Lambda resources and checks their inline code for syntax errors using flake8.
+    Processes Lambda resources and lints their inline code with the backend of their runtime family.
 
     Args:
         resources (dict): Dictionary containing resource definitions.
         parameters (dict): Dictionary containing parameter definitions.
         dict_to_check (dict): Dictionary of resources to check.
-        args (str): Template dictionary (not used directly in this function).
+        args (str): Args you want to pass to the lint.
+        use_subprocess (bool): Start a flake8 process per Lambda instead of linting in-process.
+        batch (bool): Lint all inline functions of the template with a single flake8 process.
+        cache_dir (str): Directory of the lint result cache, None to lint without a cache.
+        resolver (IntrinsicResolver): Resolves intrinsic functions in `Code` and `Runtime`,
+            one over `parameters` by default.
+        backend_settings (dict): The `jobs` and `timeout` of backends keyed by runtime family.
+        mode (str): Lint with flake8 (`full`) or only parse and run the Lambda checks (`fast`).
+        custom_resources (set): Logical IDs of the functions custom resources send requests to.
 
     Returns:
         dict: Updated dict_to_check with linting results.
@@ -83,196 +132,302 @@ def extractLambdaCode(resources, parameters, dict_to_check, args=None):
     if not isinstance(dict_to_check, dict):
         raise ValueError("Expected 'dict_to_check' to be a dictionary.")
     
+    if resolver is None:
+        resolver = IntrinsicResolver(parameters)
+
+    # Inline code grouped by the backend linting it
+    sources_to_lint = {}
+    runtimes = {}
+    context = {}
     for i in dict_to_check:
         try:
             if "ZipFile" in resources[i]["Properties"]["Code"]:
-                lambda_code = resources[i]["Properties"]["Code"]["ZipFile"]
-                programming_lang = resources[i]["Properties"]["Runtime"]
+                try:
+                    # References only known at deploy time stay ${...} placeholders, ignored through F821
+                    lambda_code = resolver.resolve(resources[i]["Properties"]["Code"]["ZipFile"], placeholders=True)
+                    programming_lang = resolver.resolve(resources[i]["Properties"]["Runtime"])
+                    if not isinstance(programming_lang, str):
+                        raise Unresolvable(f"the runtime {programming_lang} is not text")
+                except Unresolvable as e:
+                    progress(Fore.YELLOW, "⚠️ Could not resolve the code or runtime of resource '{}': {}", i, e)
+                    dict_to_check[i] = ResourceResult("SkippedUnresolved", reason=f"Could not resolve the code or runtime: {e}")
+                    continue
                 if not isinstance(lambda_code, str):
                     raise ValueError(f"Expected a string for 'ZipFile' content in resource '{i}', got {type(lambda_code)}.")
 
-                print(Fore.CYAN + f"🔍 Checking resource '{i}' for code linting..." + Style.RESET_ALL)
+                progress(Fore.CYAN, "🔍 Checking resource '{}' for code linting...", i)
 
-                process = None  # Initialize process variable
-                
-                # Check if runtime contains "python" directly
+                # Check if runtime contains "python" directly, otherwise if runtime is a
+                # parameter name (CloudFormation reference resolved) use its default
                 if "python" in programming_lang:
-                    if args is None:
-                        process = subprocess.Popen(
-                            ['python', '-m', 'flake8', "-", "--ignore=F821"],
-                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                        )
-                    else:
-                        if "F821" in args:    
-                            process = subprocess.Popen(
-                                ['python', '-m', 'flake8', "-"] + args.split(),
-                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                            )
-                        else:
-                            if "--ignore" in args:
-                                y=args.split("--ignore=")[1] + ",F821"
-                                z=args.split("--ignore")[:-1] + ["--ignore=" + y]
-                                process = subprocess.Popen(
-                                    ['python', '-m', 'flake8', "-"] + z,
-                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                                )
-                            else:
-                                process = subprocess.Popen(
-                                    ['python', '-m', 'flake8', "-", "--ignore=F821"] + args.split(),
-                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                                )
-                # Check if runtime is a parameter name (CloudFormation reference resolved)
+                    runtime = programming_lang
                 elif programming_lang in parameters:
-                    val = parameters[programming_lang]["Default"]
-                    if "python" in val:
-                        if args is None:
-                            process = subprocess.Popen(
-                                ['python', '-m', 'flake8', "-", "--ignore=F821"],
-                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                            )
-                        else:
-                            if "F821" in args:    
-                                process = subprocess.Popen(
-                                    ['python', '-m', 'flake8', "-"] + args.split(),
-                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                                )
-                            else:
-                                if "--ignore" in args:
-                                    y=args.split("--ignore=")[1] + ",F821"
-                                    z=args.split("--ignore")[:-1] + ["--ignore=" + y]
-                                    process = subprocess.Popen(
-                                        ['python', '-m', 'flake8', "-"] + z,
-                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                                    )
-                                else:
-                                    process = subprocess.Popen(
-                                        ['python', '-m', 'flake8', "-", "--ignore=F821"] + args.split(),
-                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-                                    )
-                    else:
-                        print(f"⚠️ Found a programming language that is not supported at the moment")
-                        dict_to_check[i] = {
-                            "status": "SkippingLambda",
-                            "errors": f"Unsupported programming language: {val}"
-                        }
-                        print(Fore.GREEN + f"✅ Linting check completed for resource '{i}'" + Style.RESET_ALL)
-                        continue
+                    runtime = parameters[programming_lang]["Default"]
                 else:
-                    print(f"⚠️ Found a programming language that is not supported at the moment")
-                    dict_to_check[i] = {
-                        "status": "SkippingLambda",
-                        "errors": f"Unsupported programming language: {programming_lang}"
-                    }
-                    print(Fore.GREEN + f"✅ Linting check completed for resource '{i}'" + Style.RESET_ALL)
-                    continue
-
-                # Only proceed with linting if we have a valid process
-                if process is not None:
-                    stdout, stderr = process.communicate(input=lambda_code.encode())
+                    runtime = programming_lang
 
-                    if process.returncode not in [0, 1]:  # 0: No issues, 1: Linting errors
-                        raise RuntimeError(f"❌ flake8 process failed with return code {process.returncode}: {stderr.decode()}")
+                backend = getBackend(runtimeFamily(runtime), args, use_subprocess, batch, backend_settings, mode)
+                if backend is None:
+                    progress("", "⚠️ Found a programming language that is not supported at the moment")
+                    dict_to_check[i] = ResourceResult("SkippingLambda", reason=f"Unsupported programming language: {runtime}")
+                    progress(Fore.GREEN, "✅ Linting check completed for resource '{}'", i)
+                    continue
 
-                    dict_to_check[i] = {
-                        "status": "FoundNoErrors" if stdout.decode() == "" else "FoundErrors",
-                        "errors": stdout.decode()
-                    }
-                    print(Fore.GREEN + f"✅ Linting check completed for resource '{i}'" + Style.RESET_ALL)
+                sources_to_lint.setdefault(backend, {})[i] = lambda_code
+                runtimes[i] = runtime
+                context[i] = functionContext(resources[i]["Properties"], resolver, i in custom_resources)
             else:
-                dict_to_check[i] = {
-                    "status": "SkippingLambda",
-                    "errors": "Lambda function doesnot have inline code"
-                }
-                print(Fore.GREEN + f"✅ Linting check completed for resource '{i}'" + Style.RESET_ALL)
+                dict_to_check[i] = ResourceResult("SkippingLambda", reason="Lambda function doesnot have inline code")
+                progress(Fore.GREEN, "✅ Linting check completed for resource '{}'", i)
 
         except Exception as e:
-            print(Fore.RED + f"❌ Error processing resource '{i}': {e}" + Style.RESET_ALL)
+            progress(Fore.RED, "❌ Error processing resource '{}': {}", i, e)
             raise e
 
+    for backend, sources in sources_to_lint.items():
+        lintSources(backend, sources, runtimes, dict_to_check, cache_dir, context)
     return dict_to_check
 
 
+def functionContext(properties, resolver, custom_resource=False):
+    """
+    Collects what the template tells a backend about a Lambda function besides its code.
+
+    Args:
+        properties (dict): The properties of the function.
+        resolver (IntrinsicResolver): Resolves the `Handler`.
+        custom_resource (bool): Whether custom resources send their requests to the function.
+
+    Returns:
+        dict: The `handler` (None when it cannot be resolved), `custom_resource`, and the
+        `code` as read from the template, which may remember its position.
+    """
+    try:
+        handler = resolver.resolve(properties.get("Handler"))
+    except Unresolvable:
+        handler = None
+    code = properties["Code"]["ZipFile"]
+    if isinstance(code, dict) and "Fn::Sub" in code:
+        code = code["Fn::Sub"][0] if isinstance(code["Fn::Sub"], list) else code["Fn::Sub"]
+    return {
+        "handler": handler if isinstance(handler, str) else None,
+        "custom_resource": custom_resource,
+        "code": code,
+    }
+
+
+def lintSources(backend, sources, runtimes, dict_to_check, cache_dir=None, context=None):
+    """
+    Lints inline code with a backend, answering what it can from the lint result cache.
+
+    Args:
+        backend (LintBackend): The backend of the runtime family of the sources.
+        sources (dict): The inline code keyed by resource name.
+        runtimes (dict): The resolved runtime keyed by resource name.
+        dict_to_check (dict): Dictionary of resources to check, updated with the results.
+        cache_dir (str): Directory of the lint result cache, None to lint without a cache.
+        context (dict): What the template tells about every function, see `functionContext`.
+    """
+    if not backend.cacheable:
+        cache_dir = None
+
+    # Copies of code already linted by this process, or earlier in this batch, are not linted again
+    remembered = {}
+    copies = {}
+    if backend.cacheable:
+        table = getResultTable() or ResultTable()
+        run_keys = {i: table.key(sources[i], runtimes[i], backend.cache_args) for i in sources}
+        first = set()
+        for i in sources:
+            if run_keys[i] in table:
+                remembered[i] = table.get(run_keys[i])
+            elif run_keys[i] in first:
+                copies[i] = run_keys[i]
+            else:
+                first.add(run_keys[i])
+        table.saved += len(remembered) + len(copies)
+        sources = {i: code for i, code in sources.items() if i not in remembered and i not in copies}
+
+    # Answer what we can from the cache before linting the rest
+    cached = {}
+    if cache_dir is not None:
+        cache = getCache(cache_dir)
+        cache_keys = {i: cache.key(sources[i], runtimes[i], backend.cache_args) for i in sources}
+        records = cache.getMany(cache_keys.values())
+        cached = {i: records[cache_keys[i]] for i in sources if cache_keys[i] in records}
+        progress(Fore.CYAN, "💾 Lint cache: {} hit(s), {} miss(es).", len(cached), len(sources) - len(cached))
+
+    # Lint the collected inline code in one go so batching engines can share a flake8 run
+    sources = {i: code for i, code in sources.items() if i not in cached}
+    try:
+        reports = backend.lintMany(sources, {i: (context or {}).get(i, {}) for i in sources}) if sources else {}
+    except Exception as e:
+        progress(Fore.RED, "❌ Error linting resources {}: {}", ', '.join(sources), e)
+        raise e
+
+    # Reports are parsed once, everything after reads the violations
+    for i, errors in reports.items():
+        dict_to_check[i] = ResourceResult.fromReport(errors)
+        progress(Fore.GREEN, "✅ Linting check completed for resource '{}'", i)
+
+    for i, record in cached.items():
+        dict_to_check[i] = record
+        progress(Fore.GREEN, "✅ Linting check completed for resource '{}' (cached)", i)
+
+    if cache_dir is not None and reports:
+        cache.putMany({cache_keys[i]: dict_to_check[i] for i in reports})
+
+    if backend.cacheable:
+        linted = {run_keys[i]: dict_to_check[i] for i in list(reports) + list(cached)}
+        for key, record in linted.items():
+            table.put(key, record)
+        remembered.update((i, linted[key]) for i, key in copies.items())
+        for i, record in remembered.items():
+            dict_to_check[i] = record
+            # Reported like a lint of its own, which copies are shared depends on how templates spread over processes
+            progress(Fore.GREEN, "✅ Linting check completed for resource '{}'", i)
+
+
 def outputPrinting(error_dict):
     """
-    Prints the results of lambda function error checks with color-coded output.
+    Prints the results of lambda function error checks with color-coded output
+    and reports them as structured results.
     
     Args:
-        error_dict (dict): A dictionary containing resources and their linting statuses.
+        error_dict (dict): A dictionary containing resources and their `ResourceResult`,
+            or the `{"status": ..., "errors": ...}` dicts they replace.
 
     Returns:
         bool: True if no errors were found in any resource, False otherwise.
     """
-    lst = []
-    resource_count = 1
-    for i in error_dict:
-        if error_dict[i]["status"] == "FoundErrors":
-            print(Fore.CYAN + "\n  ❌ " + str(resource_count) + f". Resource {i} has the following errors in the lambda function:\n" + Style.RESET_ALL)
-            error_count = 1
-            for error in error_dict[i]["errors"].split("\n")[:-1]:
-                print(Fore.YELLOW + f"\t{error_count}. " + Fore.RED + error + Style.RESET_ALL)
-                error_count += 1
-            lst.append(False)
-        elif error_dict[i]["status"] == "FoundNoErrors":
-            print(Fore.GREEN + "\n  ✅ " + str(resource_count) + f". Resource {i} has no errors in the lambda function. 🎉" + Style.RESET_ALL)
-            lst.append(True)
-        elif error_dict[i]["status"] == "SkippingLambda":
-            print(Fore.GREEN + "\n  ✅ " + str(resource_count) + f". Resource {i} was skipped because linter was not able to find inline code in the lambda function. 🎉" + Style.RESET_ALL)
-            lst.append(True)
-        resource_count += 1
-
-    if all(lst) == True:
-        return True
-    else:
-        return False
+    error_dict = {i: ResourceResult.fromDict(record) for i, record in error_dict.items()}
+    reportResources(error_dict)
+    success = True
+    for resource_count, (i, record) in enumerate(error_dict.items(), 1):
+        if record.status == "FoundErrors":
+            progress(Fore.CYAN, "\n  ❌ {}. Resource {} has the following errors in the lambda function:\n", resource_count, i)
+            for error_count, violation in enumerate(record.violations, 1):
+                progress(Fore.YELLOW, "\t{}. " + Fore.RED + "{}", error_count, violation)
+            success = False
+        elif record.status == "FoundNoErrors":
+            progress(Fore.GREEN, "\n  ✅ {}. Resource {} has no errors in the lambda function. 🎉", resource_count, i)
+        elif record.status == "SkippingLambda":
+            progress(Fore.GREEN, "\n  ✅ {}. Resource {} was skipped because linter was not able to find inline code in the lambda function. 🎉", resource_count, i)
+        elif record.status == "SkippedUnchanged":
+            progress(Fore.GREEN, "\n  ✅ {}. Resource {} was skipped because its inline code did not change. 🎉", resource_count, i)
+        elif record.status == "SkippedUnresolved":
+            progress(Fore.YELLOW, "\n  ⚠️ {}. Resource {} was skipped. {}.", resource_count, i, record.reason)
+
+    return success
 
 
-def linter(fileName, args=None):
+def lintTemplate(fileName, args=None, use_subprocess=False, batch=False, cache_dir=None, streaming=False, since=None, staged=False, stack=None, backend_settings=None, mode="full", template=None, known=None, template_cache=False):
     """
-    Lint a given CloudFormation template file, checking lambda code for errors.
+    Lints the Lambda functions of a CloudFormation template without exiting.
+
+    Progress goes through `reporters.progress` and results through the
+    `reporters` recording functions, so callers choose whether anything is
+    printed (see `runner.lintFile`).
     
     Args:
         fileName (str): The name of the file to process and lint.
         args(str): Args you want to pass to the lint
+        use_subprocess (bool): Start a flake8 process per Lambda instead of linting in-process.
+        batch (bool): Lint all inline functions of the template with a single flake8 process.
+        cache_dir (str): Directory of the lint result cache, None to lint without a cache.
+        streaming (bool): Only build the Lambda resources of the template while parsing it.
+        since (str): Only lint Lambda functions that changed since this git revision.
+        staged (bool): Lint the staged version of the file and only the Lambda functions changed since HEAD.
+        stack (str): The nested stack path the template was reached through, None for templates given directly.
+        backend_settings (dict): The `jobs` and `timeout` of backends keyed by runtime family.
+        mode (str): Lint with flake8 (`full`) or only parse and run the Lambda checks (`fast`).
+        template (dict): The template already parsed from the file, read from it when None.
+        known (dict): Results of Lambda functions keyed by logical ID, reported as they are instead of linting the functions again.
+        template_cache (bool): Keep the Lambda relevant parts of the parsed template in `cache_dir`, see `cache.TemplateCache`.
+
+    Returns:
+        bool: True if the template passed linting or was skipped, False otherwise.
     """
-    print(Fore.WHITE + Style.BRIGHT + f"\n📝 Processing file: {fileName}" + Style.RESET_ALL)
+    if stack is None:
+        progress(Fore.WHITE + Style.BRIGHT, "\n📝 Processing file: {}", fileName)
+    else:
+        progress(Fore.WHITE + Style.BRIGHT, "\n📝 Processing file: {} (nested stack {})", fileName, stack)
+    if since is not None or staged:
+        from .incremental import STAGED, readBaseTemplate, unchangedLambdas
+    if currentTimings() is not None:
+        currentTimings().file = fileName
     
     # Read the file and parse the template
     try:
-        template = readFile(fileName)
+        with timed("phase", "parse"):
+            if template is None:
+                template = readFile(fileName, streaming, STAGED if staged else None, cache_dir if template_cache else None)
         if "Resources" in template:
             resources = template["Resources"]
-            dict_to_check = findLambdaResources(resources)
-            print(Fore.CYAN + f"📂 Found {len(dict_to_check)} resources to check." + Style.RESET_ALL)
+            with timed("phase", "scan"):
+                # One pass over the resources, every check below reads the index
+                index = ResourceIndex(resources)
+                dict_to_check = findLambdaResources(resources, index)
+                functions = lambdaFunctions(index, template.get("Globals"))
+            progress(Fore.CYAN, "📂 Found {} resources to check.", len(dict_to_check))
+            stacks = findNestedStacks(fileName, index)
+            if stacks:
+                progress(Fore.CYAN, "🧩 Found {} nested stack(s) with a local template to follow.", len(stacks))
+                reportStacks(stacks)
         else:
-            print(Fore.YELLOW + "⚠️ No 'Resources' section found. This doesn't appear to be a CloudFormation template." + Style.RESET_ALL)
-            print(Fore.GREEN + "✅ Skipping file - no Lambda functions to check." + Style.RESET_ALL)
-            sys.exit(0)
+            progress(Fore.YELLOW, "⚠️ No 'Resources' section found. This doesn't appear to be a CloudFormation template.")
+            progress(Fore.GREEN, "✅ Skipping file - no Lambda functions to check.")
+            reportSkipped("No 'Resources' section found")
+            return True
     except Exception as e:
-        print(Fore.RED + f"❌ Error while reading or parsing file: {e}" + Style.RESET_ALL)
-        sys.exit(1)
+        progress(Fore.RED, "❌ Error while reading or parsing file: {}", e)
+        reportProblem(f"Error while reading or parsing file: {e}")
+        return False
 
     # Extract and lint Lambda code
     try:
-        if args is None:
-            if "Parameters" in template:
-                parameters = template["Parameters"]
-                error_dict = extractLambdaCode(resources, parameters, dict_to_check, args=None)
-            else:
-                error_dict = extractLambdaCode(resources, {}, dict_to_check, args=None)
-        else:
-            if "Parameters" in template:
-                parameters = template["Parameters"]
-                error_dict = extractLambdaCode(resources, parameters, dict_to_check, args)
-            else:
-                error_dict = extractLambdaCode(resources, {}, dict_to_check, args)
+        parameters = template["Parameters"] if "Parameters" in template else {}
+        unchanged = {i: ResourceResult.fromDict(known[i]) for i in known or () if i in dict_to_check}
+        if unchanged:
+            progress(Fore.CYAN, "♻️ Reusing the results of {} unchanged Lambda function(s).", len(unchanged))
+        if since is not None or staged:
+            base_revision = "HEAD" if staged else since
+            for i in unchangedLambdas(template, readBaseTemplate(fileName, base_revision)):
+                if i in dict_to_check:
+                    unchanged[i] = ResourceResult("SkippedUnchanged", reason=f"Inline code unchanged since {base_revision}")
+            progress(Fore.CYAN, "🔀 {} Lambda function(s) unchanged since {}, {} to check.", len(unchanged), base_revision, len(dict_to_check) - len(unchanged))
+        with timed("phase", "lint"):
+            error_dict = extractLambdaCode(
+                functions, parameters, {i: dict_to_check[i] for i in dict_to_check if i not in unchanged},
+                args, use_subprocess, batch, cache_dir,
+                IntrinsicResolver(parameters, template.get("Mappings"), template.get("Conditions")),
+                backend_settings, mode, customResourceProviders(index),
+            )
+        error_dict = {i: unchanged[i] if i in unchanged else error_dict[i] for i in dict_to_check}
     except Exception as e:
-        print(Fore.RED + f"❌ Error during Lambda code extraction: {e}" + Style.RESET_ALL)
-        sys.exit(1)
+        progress(Fore.RED, "❌ Error during Lambda code extraction: {}", e)
+        reportProblem(f"Error during Lambda code extraction: {e}")
+        return False
 
     # Print output and provide final status
-    if outputPrinting(error_dict):
-        print(Fore.GREEN + Style.BRIGHT + "✅ No errors found in any Lambda function!" + Style.RESET_ALL)
-        sys.exit(0)
+    with timed("phase", "report"):
+        success = outputPrinting(error_dict)
+    if success:
+        progress(Fore.GREEN + Style.BRIGHT, "✅ No errors found in any Lambda function!")
+        return True
     else:
-        print(Fore.RED + Style.BRIGHT + "❌ Please fix the errors listed above and run the linter again." + Style.RESET_ALL)
-        sys.exit(1)
+        progress(Fore.RED + Style.BRIGHT, "❌ Please fix the errors listed above and run the linter again.")
+        return False
+
+
+def linter(fileName, args=None, **options):
+    """
+    Lint a given CloudFormation template file, checking lambda code for errors,
+    and exits with 0 if it passed and 1 otherwise.
+
+    Args:
+        fileName (str): The name of the file to process and lint.
+        args(str): Args you want to pass to the lint
+        **options: Keyword arguments passed on to `lintTemplate`, like `cache_dir`.
+    """
+    sys.exit(0 if lintTemplate(fileName, args, **options) else 1)
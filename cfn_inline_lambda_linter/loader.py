@@ -0,0 +1,498 @@
+import json
+import os
+
+import yaml
+
+# Short-form intrinsic function tags and the long-form keys they expand to
+INTRINSIC_FUNCTIONS = {
+    "Ref": "Ref",
+    "Condition": "Condition",
+    "Base64": "Fn::Base64",
+    "Cidr": "Fn::Cidr",
+    "FindInMap": "Fn::FindInMap",
+    "ForEach": "Fn::ForEach",
+    "GetAtt": "Fn::GetAtt",
+    "GetAZs": "Fn::GetAZs",
+    "ImportValue": "Fn::ImportValue",
+    "Join": "Fn::Join",
+    "Length": "Fn::Length",
+    "Select": "Fn::Select",
+    "Split": "Fn::Split",
+    "Sub": "Fn::Sub",
+    "ToJsonString": "Fn::ToJsonString",
+    "Transform": "Fn::Transform",
+    "And": "Fn::And",
+    "Equals": "Fn::Equals",
+    "If": "Fn::If",
+    "Not": "Fn::Not",
+    "Or": "Fn::Or",
+}
+
+JSON_EXTENSIONS = (".json",)
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+#: Whether the C implementation of the YAML parser (libyaml) is used
+LIBYAML = hasattr(yaml, "CBaseLoader")
+
+
+#: Properties holding inline code, see `InlineCode`
+INLINE_CODE_KEYS = ("ZipFile", "InlineCode")
+
+
+class InlineCode(str):
+    """
+    Inline code that remembers where it starts in its YAML template.
+
+    Attributes:
+        fileName (str): The template the code was read from.
+        line (int): The template line of the first line of code.
+        column (int): The template column of the first character of code.
+        block (bool): Whether the code is a literal block scalar (`|`), whose
+            lines are the lines of the template.
+        indent (int): How much further right the lines of a literal block are in
+            the template than in the code, None when it is not known.
+    """
+
+    indent = None
+
+    def templatePosition(self, line, column):
+        """
+        Maps a position in the code to its position in the template.
+
+        The lines of a literal block map one to one, columns are shifted by the
+        indentation of the block, recorded by `loadTemplate`. Positions in
+        other scalars map exactly on their first line, later lines map to the
+        start of the scalar.
+
+        Args:
+            line (int): The line in the code, starting at 1.
+            column (int): The column in the code, starting at 1.
+
+        Returns:
+            tuple: The line and column in the template.
+        """
+        if not self.block:
+            return (self.line, self.column + column - 1) if line == 1 else (self.line, self.column)
+        return self.line + line - 1, (self.indent or 0) + column
+
+    def firstLine(self):
+        """
+        Returns the template line of the first line of a literal block that is not blank, and its indentation in the code.
+        """
+        lines = self.split("\n")
+        first = next((index for index, text in enumerate(lines) if text.strip()), 0)
+        return self.line + first, len(lines[first]) - len(lines[first].lstrip(" "))
+
+
+def _inlineBlocks(value):
+    """Yields the literal block `InlineCode` of a parsed template."""
+    if isinstance(value, InlineCode):
+        if value.block:
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _inlineBlocks(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _inlineBlocks(item)
+
+
+def recordIndents(template, file):
+    """
+    Records the indentation of the literal blocks of inline code from the text they were parsed from.
+
+    The scalars of YAML do not keep their indentation, so the lines of the
+    blocks are read again from the same stream, in a single pass keeping
+    only those lines. Templates read from the git index are measured
+    against the index, not against the working tree.
+
+    Args:
+        template: The parsed template.
+        file: The text stream the template was parsed from.
+    """
+    if not isinstance(template, dict):
+        return
+    blocks = {}
+    for section in ("Resources", "Globals"):
+        for code in _inlineBlocks(template.get(section)):
+            line, indent = code.firstLine()
+            blocks.setdefault(line, []).append((code, indent))
+    if not blocks:
+        return
+    try:
+        file.seek(0)
+    except (OSError, ValueError):
+        return
+    last = max(blocks)
+    for number, text in enumerate(file, 1):
+        for code, indent in blocks.get(number, ()):
+            code.indent = (len(text) - len(text.lstrip(" "))) - indent
+        if number >= last:
+            return
+
+
+def _inlineCode(loader, node, value):
+    code = InlineCode(value)
+    code.fileName = getattr(loader, "fileName", None)
+    code.block = node.style == "|"
+    if node.style in ("|", ">"):
+        code.line, code.column = node.start_mark.line + 2, 1
+    else:
+        code.line = node.start_mark.line + 1
+        code.column = node.start_mark.column + (2 if node.style in ('"', "'") else 1)
+    return code
+
+
+def _constructMapping(loader, node, deep=False):
+    mapping = yaml.constructor.BaseConstructor.construct_mapping(loader, node, deep)
+    for key_node, value_node in node.value:
+        key = key_node.value
+        if key in INLINE_CODE_KEYS and isinstance(value_node, yaml.ScalarNode) and isinstance(mapping.get(key), str):
+            mapping[key] = _inlineCode(loader, value_node, mapping[key])
+    return mapping
+
+
+class CfnLoader(yaml.CBaseLoader if LIBYAML else yaml.BaseLoader):
+    """
+    YAML loader for CloudFormation templates.
+
+    It uses libyaml when PyYAML was built with it and falls back to the pure
+    Python parser otherwise. Like `yaml.BaseLoader` every scalar is loaded as
+    a string, and short-form intrinsics such as `!Ref Name` or `!Sub "..."`
+    are turned into their long-form `{"Ref": "Name"}`/`{"Fn::Sub": "..."}` dicts.
+    Inline code is loaded as `InlineCode`.
+    """
+
+    construct_mapping = _constructMapping
+
+
+def _constructIntrinsic(loader, tag_suffix, node):
+    key = INTRINSIC_FUNCTIONS.get(tag_suffix)
+    if key is None:
+        raise yaml.constructor.ConstructorError(
+            None, None, f"unknown CloudFormation tag !{tag_suffix}", node.start_mark
+        )
+
+    if isinstance(node, yaml.ScalarNode):
+        value = loader.construct_scalar(node)
+        # !GetAtt Resource.Attribute is shorthand for [Resource, Attribute]
+        if key == "Fn::GetAtt":
+            value = value.split(".", 1)
+        # !Sub | keeps the position of the code it substitutes into
+        elif key == "Fn::Sub":
+            value = _inlineCode(loader, node, value)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node, deep=True)
+    else:
+        value = loader.construct_mapping(node, deep=True)
+    return {key: value}
+
+
+CfnLoader.add_multi_constructor("!", _constructIntrinsic)
+
+
+LAMBDA_RESOURCE_TYPES = ("AWS::Lambda::Function", "AWS::Serverless::Function")
+NESTED_STACK_TYPES = ("AWS::CloudFormation::Stack", "AWS::Serverless::Application")
+CUSTOM_RESOURCE_TYPE = "AWS::CloudFormation::CustomResource"
+CUSTOM_RESOURCE_PREFIX = "Custom::"
+# Resource types whose bodies the streaming scan builds, besides custom resources
+SCANNED_RESOURCE_TYPES = LAMBDA_RESOURCE_TYPES + NESTED_STACK_TYPES + (CUSTOM_RESOURCE_TYPE,)
+# Top level sections the streaming scan builds because runtimes and code may refer to them
+RESOLUTION_SECTIONS = ("Parameters", "Mappings", "Conditions", "Globals")
+
+
+class _EventLoader(yaml.composer.Composer, yaml.constructor.BaseConstructor, yaml.resolver.BaseResolver):
+    """Composes and constructs YAML nodes from events buffered by the streaming scan."""
+
+    construct_mapping = _constructMapping
+
+    def __init__(self, fileName=None):
+        yaml.composer.Composer.__init__(self)
+        yaml.constructor.BaseConstructor.__init__(self)
+        yaml.resolver.BaseResolver.__init__(self)
+        self.fileName = fileName
+        self.events = []
+        self.position = 0
+
+    def check_event(self, *choices):
+        if self.position >= len(self.events):
+            return False
+        return not choices or isinstance(self.events[self.position], choices)
+
+    def peek_event(self):
+        return self.events[self.position]
+
+    def get_event(self):
+        self.position += 1
+        return self.events[self.position - 1]
+
+    def load(self, events):
+        self.events = events
+        self.position = 0
+        return self.construct_document(self.compose_node(None, None))
+
+
+_EventLoader.add_multi_constructor("!", _constructIntrinsic)
+
+
+def _collectNode(parser):
+    """Returns the events of the next node of the stream."""
+    events = []
+    depth = 0
+    while True:
+        event = parser.get_event()
+        events.append(event)
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return events
+
+
+def _skipNode(parser):
+    """Drops the events of the next node of the stream without keeping them."""
+    depth = 0
+    while True:
+        event = parser.get_event()
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _collectResource(parser):
+    """
+    Returns the events of the next resource if it is a Lambda function, a nested stack or a custom resource.
+
+    Events are buffered until the resource `Type` is seen, the rest of a
+    resource of another type is skipped without being buffered.
+    """
+    events = [parser.get_event()]
+    if not isinstance(events[0], yaml.MappingStartEvent):
+        if isinstance(events[0], yaml.SequenceStartEvent):
+            _skipRemaining(parser, 1)
+        return None
+
+    depth = 1
+    expecting_key = True
+    type_is_next = False
+    while depth > 0:
+        event = parser.get_event()
+        events.append(event)
+        if depth == 1 and isinstance(event, yaml.ScalarEvent):
+            if type_is_next:
+                if event.value not in SCANNED_RESOURCE_TYPES and not event.value.startswith(CUSTOM_RESOURCE_PREFIX):
+                    _skipRemaining(parser, depth)
+                    return None
+                type_is_next = False
+            elif expecting_key and event.value == "Type":
+                type_is_next = True
+            expecting_key = not expecting_key
+            continue
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+            if depth == 1:
+                expecting_key = not expecting_key
+        elif depth == 1 and isinstance(event, yaml.AliasEvent):
+            expecting_key = not expecting_key
+    return events
+
+
+def _skipRemaining(parser, depth):
+    while depth > 0:
+        event = parser.get_event()
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+
+
+def scanTemplate(stream, fileName=None):
+    """
+    Loads the Lambda relevant parts of a CloudFormation template from its event stream.
+
+    Only Lambda function, nested stack and custom resources (see `SCANNED_RESOURCE_TYPES`)
+    and the sections needed to resolve their runtime and code are built, the events of every other resource and
+    section are dropped as they are parsed. Memory use therefore depends on
+    the largest Lambda resource rather than on the size of the template.
+
+    Args:
+        stream: The template as a string or a file object.
+        fileName (str): The name of the template file, remembered by its `InlineCode`.
+
+    Returns:
+        dict: The template with the Lambda resources and resolution sections,
+        None for an empty document.
+
+    Raises:
+        yaml.YAMLError: If the template is invalid YAML, or a kept node refers to
+        an anchor inside a dropped one.
+    """
+    parser = CfnLoader(stream)
+    builder = _EventLoader(fileName)
+    try:
+        parser.get_event()  # StreamStartEvent
+        if parser.check_event(yaml.StreamEndEvent):
+            return None
+        parser.get_event()  # DocumentStartEvent
+        if not parser.check_event(yaml.MappingStartEvent):
+            return builder.load(_collectNode(parser))
+
+        parser.get_event()
+        template = {}
+        while not parser.check_event(yaml.MappingEndEvent):
+            section = builder.load(_collectNode(parser))
+            if section == "Resources" and parser.check_event(yaml.MappingStartEvent):
+                parser.get_event()
+                resources = {}
+                while not parser.check_event(yaml.MappingEndEvent):
+                    name = builder.load(_collectNode(parser))
+                    events = _collectResource(parser)
+                    if events is not None:
+                        resources[name] = builder.load(events)
+                parser.get_event()
+                template[section] = resources
+            elif section in RESOLUTION_SECTIONS or section == "Resources":
+                template[section] = builder.load(_collectNode(parser))
+            else:
+                _skipNode(parser)
+        return template
+    finally:
+        parser.dispose()
+
+
+def lambdaSubset(template):
+    """
+    Keeps the parts of a parsed template `scanTemplate` would have built.
+
+    Args:
+        template: The parsed template.
+
+    Returns:
+        The Lambda function, nested stack and custom resources of the template and
+        its resolution sections, the template itself when it is not a mapping.
+    """
+    if not isinstance(template, dict):
+        return template
+    subset = {section: template[section] for section in RESOLUTION_SECTIONS if section in template}
+    resources = template.get("Resources")
+    if isinstance(resources, dict):
+        subset["Resources"] = {
+            name: resource for name, resource in resources.items()
+            if isinstance(resource, dict) and isinstance(resource.get("Type"), str)
+            and (resource["Type"] in SCANNED_RESOURCE_TYPES or resource["Type"].startswith(CUSTOM_RESOURCE_PREFIX))
+        }
+    elif "Resources" in template:
+        subset["Resources"] = resources
+    return subset
+
+
+def isJsonTemplate(fileName, file):
+    """
+    Tells whether a template is JSON, by its extension or by its first character.
+
+    Files without a `.json`, `.yaml` or `.yml` extension (like CDK `.template`
+    outputs) are sniffed, their first non-whitespace character being `{`. The
+    file position is left untouched.
+
+    Args:
+        fileName (str): The name of the template file.
+        file: The template opened in text mode.
+
+    Returns:
+        bool: True if the template should be parsed as JSON.
+    """
+    extension = os.path.splitext(fileName)[1].lower()
+    if extension in JSON_EXTENSIONS:
+        return True
+    if extension in YAML_EXTENSIONS:
+        return False
+
+    position = file.tell()
+    try:
+        while True:
+            chunk = file.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped[0] == "{"
+    finally:
+        file.seek(position)
+
+
+def _yamlScalars(value):
+    """
+    Turns the `true`, `false` and `null` of a parsed JSON template into the strings `CfnLoader` reads them as.
+    """
+    if isinstance(value, dict):
+        return {key: _yamlScalars(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_yamlScalars(item) for item in value]
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return "null"
+    return value
+
+
+def loadJsonTemplate(file):
+    """
+    Loads a JSON template the way `CfnLoader` loads YAML ones.
+
+    Numbers, booleans and nulls are kept as strings like every scalar of a
+    YAML template, so the rest of the linter sees the same structure for
+    both formats.
+
+    Args:
+        file: The template opened in text mode.
+
+    Returns:
+        The parsed template.
+    """
+    return _yamlScalars(json.load(file, parse_int=str, parse_float=str))
+
+
+def loadTemplate(fileName, file, streaming=False):
+    """
+    Parses a template with the parser that suits its format.
+
+    Args:
+        fileName (str): The name of the template file, used to detect its format.
+        file: The template opened in text mode.
+        streaming (bool): Only build the Lambda resources of YAML templates, see `scanTemplate`.
+
+    Returns:
+        The parsed template.
+    """
+    if isJsonTemplate(fileName, file):
+        try:
+            return loadJsonTemplate(file)
+        except json.JSONDecodeError:
+            # Sniffed templates starting with "{" may still be YAML flow mappings
+            if os.path.splitext(fileName)[1].lower() in JSON_EXTENSIONS:
+                raise
+            file.seek(0)
+    elif streaming:
+        try:
+            template = scanTemplate(file, fileName)
+            recordIndents(template, file)
+            return template
+        except yaml.composer.ComposerError:
+            # An alias pointing into a dropped part of the template, parse all of it instead
+            file.seek(0)
+    loader = CfnLoader(file)
+    loader.fileName = fileName
+    try:
+        template = loader.get_single_data()
+    finally:
+        loader.dispose()
+    recordIndents(template, file)
+    return template
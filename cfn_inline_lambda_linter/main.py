@@ -1,12 +1,28 @@
 import typer
 import sys
-import io
+from collections import Counter
+from contextlib import ExitStack
+from enum import Enum
 from typing import List
-from .linter import linter
+
+# The linter, flake8, the daemon and the profiler are imported by the commands that use them
 
 LANGUAGES = ["python"]
 app = typer.Typer()
 
+
+class LintMode(str, Enum):
+    fast = "fast"
+    full = "full"
+
+
+class OutputFormat(str, Enum):
+    human = "human"
+    jsonl = "jsonl"
+    sarif = "sarif"
+    junit = "junit"
+
+
 @app.callback()
 def callback():
     """
@@ -17,7 +33,7 @@ def callback():
 def lint(
     files: List[str] = typer.Argument(
         None,
-        help="List of files passed by pre-commit or manually."
+        help="List of files passed by pre-commit or manually. Directories are searched for *.yaml, *.yml, *.json and *.template files."
     ),
     args_to_pass_to_lint: str = typer.Option(
         None,
@@ -25,52 +41,291 @@ def lint(
         "-a",
         help="Additional arguments to pass to the linter as a single string separated by space like: --max-line-length=88 --ignore=E203,W503",
         show_default=True,
+    ),
+    use_subprocess: bool = typer.Option(
+        False,
+        "--subprocess",
+        help="Start a separate flake8 process for every inline Lambda instead of linting in-process.",
+    ),
+    jobs: int = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of templates to lint in parallel. Defaults to the number of CPUs.",
+    ),
+    batch: bool = typer.Option(
+        False,
+        "--batch",
+        help="Lint all inline Lambdas of a template with a single flake8 process.",
+    ),
+    cache_dir: str = typer.Option(
+        None,
+        "--cache-dir",
+        envvar="CILL_CACHE_DIR",
+        help="Directory of the lint result cache. Defaults to ~/.cache/cill.",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Lint every inline Lambda again instead of reusing cached results.",
+    ),
+    template_cache: bool = typer.Option(
+        False,
+        "--template-cache",
+        help="Keep the Lambda functions of parsed templates in the cache directory, so unchanged templates are not parsed again.",
+    ),
+    streaming: bool = typer.Option(
+        False,
+        "--streaming",
+        help="Scan templates as a YAML event stream and only build Lambda resources. Keeps memory flat on huge templates.",
+    ),
+    since: str = typer.Option(
+        None,
+        "--since",
+        help="Only lint inline Lambdas that are new or changed since this git revision.",
+    ),
+    staged: bool = typer.Option(
+        False,
+        "--staged",
+        help="Lint the staged version of the files, only the inline Lambdas changed since HEAD.",
+    ),
+    use_daemon: bool = typer.Option(
+        False,
+        "--daemon",
+        help="Lint through a running `cill serve` daemon, linting locally when none is running.",
+    ),
+    socket_path: str = typer.Option(
+        None,
+        "--socket",
+        help="Socket of the cill daemon. Defaults to $XDG_RUNTIME_DIR/cill-<uid>.sock.",
+    ),
+    timings_path: str = typer.Option(
+        None,
+        "--timings",
+        help="Print a timing summary and write per phase, file and resource timings to this file, as OpenMetrics for .prom files and JSON otherwise.",
+    ),
+    profile_path: str = typer.Option(
+        None,
+        "--profile",
+        help="Dump cProfile stats of the whole run to this file. Lints in a single process.",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.human,
+        "--format",
+        "-f",
+        help="Report format: human readable, JSON Lines, SARIF or JUnit XML.",
+    ),
+    output_path: str = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Write the report to this file instead of stdout.",
+    ),
+    quiet: bool = typer.Option(
+        False,
+        "--quiet",
+        "-q",
+        help="Do not build progress output, only list the errors of files that failed.",
+    ),
+    nested_stacks: bool = typer.Option(
+        True,
+        "--nested-stacks/--no-nested-stacks",
+        help="Also lint the local templates of AWS::CloudFormation::Stack resources, reported under their stack path.",
+    ),
+    exclude: List[str] = typer.Option(
+        None,
+        "--exclude",
+        help="Glob of files and directories to skip, matched against their path and name. Can be repeated or comma separated.",
+    ),
+    mode: LintMode = typer.Option(
+        LintMode.full,
+        "--mode",
+        help="full lints with flake8, fast only parses the inline code and runs the Lambda checks (size, handler, cfnresponse).",
+    ),
+    backend_jobs: List[str] = typer.Option(
+        None,
+        "--backend-jobs",
+        help="Worker processes of a runtime family's backend, like python=4 or nodejs=2. Can be repeated.",
+    ),
+    backend_timeouts: List[str] = typer.Option(
+        None,
+        "--backend-timeout",
+        help="Seconds a backend may take to lint one function, like nodejs=10. Can be repeated.",
+    ),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        "-w",
+        help="Keep running and lint templates again when they change, printing the new and fixed findings.",
+    ),
+    debounce: float = typer.Option(
+        0.2,
+        "--debounce",
+        min=0,
+        help="Seconds without changes that end a burst of saves in watch mode.",
     )
 ):
     """
     Lets start linting
     """
-    overall_success = True  # Track overall success status
-    output_buffer = io.StringIO()  # Buffer for capturing output
+    from .cache import defaultCacheDir
+    from .discovery import discoverTemplates
+    from .reporters import getReporter
+    from .summary import summaryLines
+    from .api import lint_many
+    from .timings import Timings
 
-    # Temporarily redirect stdout and stderr to the buffer
-    sys.stdout = output_buffer
-    sys.stderr = output_buffer
-    
     if args_to_pass_to_lint is not None:
         validate_args(args_to_pass_to_lint)
+    backend_settings = parse_backend_settings(backend_jobs, backend_timeouts)
+    if (use_subprocess or batch) and backend_settings.get("python", {}).get("jobs", 1) > 1:
+        raise typer.BadParameter("--subprocess and --batch start their own flake8 processes, they cannot be combined with more Python jobs.", param_hint="--backend-jobs")
+
+    if watch and (since is not None or staged or use_daemon or output_format != OutputFormat.human):
+        raise typer.BadParameter("Watch mode lints the files on disk in this process with the human report, it cannot be combined with --since, --staged, --daemon or --format.", param_hint="--watch")
+
+    if no_cache and template_cache:
+        raise typer.BadParameter("Parsed templates are kept in the cache directory, --template-cache cannot be combined with --no-cache.", param_hint="--template-cache")
+
+    if no_cache:
+        cache_dir = None
+    elif cache_dir is None:
+        cache_dir = defaultCacheDir()
+
+    overall_success = True  # Track overall success status
+    stats = Counter()
+    human = output_format == OutputFormat.human
+    # Machine readable reports own stdout, everything else goes to stderr
+    info = sys.stdout if human else sys.stderr
+
+    options = dict(
+        args=args_to_pass_to_lint,
+        use_subprocess=use_subprocess,
+        batch=batch,
+        cache_dir=cache_dir,
+        template_cache=template_cache,
+        streaming=streaming,
+        since=since,
+        staged=staged,
+        nested_stacks=nested_stacks,
+        backend_settings=backend_settings,
+        mode=mode.value,
+    )
+    timings = Timings() if timings_path is not None else None
+    profiler = None
+    if profile_path is not None:
+        import cProfile
+
+        # Worker processes are not profiled, lint everything in this one
+        jobs = 1
+        use_daemon = False
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    # Progress text is only shown by the human report
+    progress = human and not quiet
+
+    with ExitStack() as stack:
+        stream = stack.enter_context(open(output_path, "w", encoding="utf-8")) if output_path else sys.stdout
+        reporter = getReporter(output_format.value, stream, quiet)
+        reporter.start()
+        if timings is not None:
+            stack.enter_context(timings.measure("phase", "run"))
+            options["timings"] = True
+
+        outcomes = None
+        if watch:
+            from .watch import WatchSession, createWatcher
+
+            # Watched before the first lint so saves made meanwhile are noticed
+            watcher = createWatcher(files or [], exclude)
+            options.pop("staged")
+            options.pop("since")
+            session = WatchSession(files or [], exclude, quiet=not progress, **options)
+            outcomes = session.start()
+        elif use_daemon:
+            from .daemon import defaultSocketPath, lintWithDaemon
 
-    try:
-        for file in files:
             try:
-                if args_to_pass_to_lint is None:
-                    linter(file)
-                else:
-                    linter(file,args_to_pass_to_lint)
-            except SystemExit as e:
-                if e.code != 0:
-                    overall_success = False
-            except Exception as e:
+                outcomes = lintWithDaemon(discoverTemplates(files or [], exclude), socket_path or defaultSocketPath(), quiet=not progress, **options)
+            except OSError:
+                print("⚠️ No cill daemon is running, linting without it.", file=sys.stderr)
+        if outcomes is None:
+            # Human output stays in the order of the files, reports name the file of every result
+            # Templates found in directories are linted while the rest are still being found
+            outcomes = lint_many(discoverTemplates(files or [], exclude), jobs=jobs, ordered=human, progress=progress, **options)
+
+        # Every file is reported as soon as it is done and not kept afterwards
+        for outcome in outcomes:
+            if not outcome.success:
                 overall_success = False
-                print(f"Unexpected error while linting {file}: {e}", file=sys.stderr)
+            reporter.fileDone(outcome)
+            stats.update(outcome.stats)
+            if timings is not None and outcome.timings:
+                timings.records.extend(outcome.timings)
+        reporter.finish(overall_success)
 
-    finally:
-        # Restore original stdout and stderr
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(profile_path)
 
-    if overall_success:
-        # No errors; suppress output
-        print("✅ All files passed linting!")
-    else:
-        # Errors found; print the buffered output
-        print("❌ Some files failed linting. See details below:\n")
-        print(output_buffer.getvalue())
+    for line in summaryLines(stats, cache_dir is not None, template_cache):
+        print(line, file=info)
+
+    if timings is not None:
+        print("\n⏱ Timings:\n" + timings.summary(), file=info)
+        timings.write(timings_path)
+    if profiler is not None:
+        print(f"📊 Profile written to {profile_path}", file=info)
+
+    if watch:
+        from .watch import watchTemplates
+
+        print("\n👀 Watching for changes, press Ctrl+C to stop.", file=info)
+        try:
+            watchTemplates(session, watcher, debounce)
+        except KeyboardInterrupt:
+            overall_success = session.success
 
     # Exit with the appropriate status code
     sys.exit(0 if overall_success else 1)
 
 
+@app.command()
+def serve(
+    socket_path: str = typer.Option(
+        None,
+        "--socket",
+        help="Socket to listen on. Defaults to $XDG_RUNTIME_DIR/cill-<uid>.sock.",
+    ),
+    jobs: int = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of templates to lint in parallel. Defaults to the number of CPUs.",
+    ),
+    idle_timeout: float = typer.Option(
+        None,
+        "--idle-timeout",
+        help="Seconds without requests after which the daemon shuts down. Defaults to 600.",
+    )
+):
+    """
+    Keep the linter warm and serve `cill lint --daemon` clients
+    """
+    from .daemon import DEFAULT_IDLE_TIMEOUT, LintDaemon, defaultSocketPath
+
+    if idle_timeout is None:
+        idle_timeout = DEFAULT_IDLE_TIMEOUT
+    try:
+        LintDaemon(socket_path or defaultSocketPath(), jobs, idle_timeout).serve()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+
 def validate_args(args: str) -> None:
     """
     Validates the `args_to_pass_to_lint` option to ensure correct formatting.
@@ -82,3 +337,25 @@ def validate_args(args: str) -> None:
         # Ensure no double spaces within the string
         if "  " in args:
             raise typer.BadParameter("Arguments must be separated by a single space only.")
+
+
+def parse_backend_settings(backend_jobs, backend_timeouts):
+    """
+    Turns the `--backend-jobs` and `--backend-timeout` options into the settings of every backend.
+
+    Returns:
+        dict: The `jobs` and `timeout` of backends keyed by runtime family.
+    """
+    settings = {}
+    options = (("--backend-jobs", "jobs", int, backend_jobs), ("--backend-timeout", "timeout", float, backend_timeouts))
+    for option, setting, convert, values in options:
+        for value in values or []:
+            family, _, number = value.partition("=")
+            try:
+                number = convert(number)
+            except ValueError:
+                number = None
+            if not family or number is None or number <= 0:
+                raise typer.BadParameter(f"Expected FAMILY=NUMBER with a positive number, like python=4, got '{value}'.", param_hint=option)
+            settings.setdefault(family, {})[setting] = number
+    return settings
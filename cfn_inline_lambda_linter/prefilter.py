@@ -0,0 +1,37 @@
+"""
+Byte level prefilter deciding whether a file is worth parsing.
+
+The resource types below are spelled out in every template that declares
+them, since `Type` cannot be computed. A file whose raw bytes hold none of
+them has nothing to lint, so it is skipped without being decoded or parsed.
+This module only imports the standard library, so the `cill` entry point can
+use it before loading the linter.
+"""
+import mmap
+
+# The bytes of `loader.LAMBDA_RESOURCE_TYPES` and `loader.NESTED_STACK_TYPES`
+LAMBDA_MARKERS = (b"AWS::Lambda::Function", b"AWS::Serverless::Function")
+NESTED_STACK_MARKERS = (b"AWS::CloudFormation::Stack", b"AWS::Serverless::Application")
+
+
+def mayHoldLambdas(fileName, nested_stacks=True):
+    """
+    Scans the memory mapped bytes of a file for Lambda function resource types.
+
+    Args:
+        fileName (str): The file to scan.
+        nested_stacks (bool): Also keep files with nested stacks, whose child templates may hold Lambdas.
+
+    Returns:
+        bool: False if the file cannot declare a Lambda function, True if it may
+        or if it cannot be read, so the linter reports why.
+    """
+    markers = LAMBDA_MARKERS + NESTED_STACK_MARKERS if nested_stacks else LAMBDA_MARKERS
+    try:
+        with open(fileName, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            return any(content.find(marker) != -1 for marker in markers)
+    except ValueError:
+        # Empty files cannot be mapped
+        return False
+    except OSError:
+        return True
@@ -0,0 +1,364 @@
+import abc
+import json
+import threading
+from contextlib import contextmanager
+from html import escape
+
+from colorama import Style
+
+from .results import ResourceResult
+from .summary import ALL_PASSED
+
+FORMATS = ("human", "jsonl", "sarif", "junit")
+
+
+class _State(threading.local):
+    """What the linter reports to, per thread so templates can be linted in a thread pool."""
+
+    quiet = False
+    stream = None
+    results = None
+
+
+_state = _State()
+
+
+def progress(color, message, *args):
+    """
+    Prints a progress line unless progress output is disabled.
+
+    The message is only formatted with `args` when it is printed, so quiet
+    runs do not pay for building strings nobody reads.
+
+    Args:
+        color (str): The colorama color of the line, "" for none.
+        message (str): The message, a `str.format` template when `args` are given.
+        *args: Values to format the message with.
+    """
+    if _state.quiet:
+        return
+    print(color + (message.format(*args) if args else message) + (Style.RESET_ALL if color else ""), file=_state.stream)
+
+
+@contextmanager
+def quietProgress():
+    """
+    Disables progress output inside the block.
+    """
+    previous, _state.quiet = _state.quiet, True
+    try:
+        yield
+    finally:
+        _state.quiet = previous
+
+
+@contextmanager
+def captureProgress(stream):
+    """
+    Writes the progress output of the current thread inside the block to a stream instead of stdout.
+
+    Args:
+        stream: The file-like object to write to.
+    """
+    previous, _state.stream = _state.stream, stream
+    try:
+        yield stream
+    finally:
+        _state.stream = previous
+
+
+@contextmanager
+def recordResults():
+    """
+    Records the structured results the linter reports inside the block.
+
+    Yields:
+        dict: The `resources` linted with their status and errors, the `problems`
+        that stopped the file from being linted, why it was `skipped`, if it was, and
+        the child templates of its nested `stacks`.
+    """
+    previous, _state.results = _state.results, {"resources": {}, "problems": [], "skipped": None, "stacks": {}}
+    try:
+        yield _state.results
+    finally:
+        _state.results = previous
+
+
+def reportResources(error_dict):
+    """
+    Reports the status and errors of the Lambda resources of a template.
+    """
+    if _state.results is not None:
+        _state.results["resources"].update(error_dict)
+
+
+def reportProblem(message):
+    """
+    Reports a problem that stopped a template from being linted.
+    """
+    if _state.results is not None:
+        _state.results["problems"].append(message)
+
+
+def reportSkipped(reason):
+    """
+    Reports why a file was not linted as a template.
+    """
+    if _state.results is not None:
+        _state.results["skipped"] = reason
+
+
+def reportStacks(stacks):
+    """
+    Reports the child templates of the nested stacks of a template.
+    """
+    if _state.results is not None:
+        _state.results["stacks"].update(stacks)
+
+
+def fileRecord(outcome):
+    """
+    Builds the structured result of a linted file.
+
+    Args:
+        outcome (LintOutcome): The outcome of linting the file.
+
+    Returns:
+        dict: The file, its nested stack path, whether it passed, its problems,
+        why it was skipped and its resources.
+    """
+    results = outcome.results or {"resources": {}, "problems": [], "skipped": None}
+    # Violations were parsed when the functions were linted, they are only turned into dicts here
+    linted = {name: ResourceResult.fromDict(resource) for name, resource in results["resources"].items()}
+    problems = list(results["problems"])
+    if not outcome.success and not problems and not any(resource.failed for resource in linted.values()):
+        problems.append(outcome.output.strip() or "Linting failed")
+
+    resources = []
+    for name, resource in linted.items():
+        record = {"name": name, "status": resource.status}
+        if resource.failed:
+            record["violations"] = [violation.asDict() for violation in resource.violations]
+        elif resource.reason:
+            record["reason"] = resource.reason
+        resources.append(record)
+    return {
+        "file": outcome.fileName,
+        "stack": outcome.stack,
+        "success": outcome.success,
+        "skipped": results["skipped"],
+        "problems": problems,
+        "resources": resources,
+    }
+
+
+class Reporter(abc.ABC):
+    """
+    Writes the results of every file as soon as the file has been linted.
+
+    Nothing is kept once a file has been written, so memory does not grow
+    with the number of files.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def start(self):
+        pass
+
+    @abc.abstractmethod
+    def fileDone(self, outcome):
+        """
+        Writes the results of a file.
+
+        Args:
+            outcome (LintOutcome): The outcome of linting the file.
+        """
+
+    def finish(self, success):
+        pass
+
+    def write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+
+
+class HumanReporter(Reporter):
+    """
+    Prints the progress output of the files that failed, or a compact list of their errors in quiet mode.
+    """
+
+    def __init__(self, stream, quiet=False):
+        super().__init__(stream)
+        self.quiet = quiet
+        self.failed = False
+
+    def fileDone(self, outcome):
+        if outcome.success:
+            return
+        if not self.failed:
+            self.failed = True
+            self.write("❌ Some files failed linting. See details below:\n\n")
+        if not self.quiet:
+            self.write(outcome.output)
+            return
+        record = fileRecord(outcome)
+        label = f"{record['file']} ({record['stack']})" if record["stack"] else record["file"]
+        lines = [f"{label}: {problem}" for problem in record["problems"]]
+        for resource in record["resources"]:
+            for violation in resource.get("violations", []):
+                position = f"{violation['line']}:{violation['col']}: {violation['code']} " if violation["code"] else ""
+                lines.append(f"{label}: {resource['name']}:{position}{violation['message']}")
+        self.write("".join(line + "\n" for line in lines))
+
+    def finish(self, success):
+        if success:
+            self.write(ALL_PASSED + "\n")
+
+
+class JsonLinesReporter(Reporter):
+    """
+    Writes one JSON object per file, see `fileRecord`.
+    """
+
+    def fileDone(self, outcome):
+        self.write(json.dumps(fileRecord(outcome)) + "\n")
+
+
+def _level(code):
+    # Warnings and complexity of flake8 are warnings, the CILL checks of the fast tier are errors
+    return "warning" if code.startswith(("W", "C")) and not code.startswith("CILL") else "error"
+
+
+class SarifReporter(Reporter):
+    """
+    Writes a SARIF 2.1.0 log, streaming every result into the `results` array.
+
+    Positions of flake8 violations are relative to the inline code, so they
+    are given as a logical location in the resource rather than a region of the template.
+    Violations of the fast tier that know their template position also get the region.
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.separator = ""
+
+    def start(self):
+        driver = {"name": "cill", "informationUri": "https://github.com/saad1998/cfn-inline-lambda-linter"}
+        self.write(
+            '{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", "version": "2.1.0", '
+            f'"runs": [{{"tool": {{"driver": {json.dumps(driver)}}}, "results": ['
+        )
+
+    def _result(self, record, rule, level, text, resource=None, properties=None, region=None):
+        location = {"physicalLocation": {"artifactLocation": {"uri": record["file"]}}}
+        if region is not None:
+            location["physicalLocation"]["region"] = region
+        if resource is not None:
+            location["logicalLocations"] = [{"name": resource, "fullyQualifiedName": f"Resources/{resource}", "kind": "resource"}]
+        result = {"ruleId": rule, "level": level, "message": {"text": text}, "locations": [location]}
+        if record["stack"]:
+            properties = dict(properties or {}, stack=record["stack"])
+        if properties:
+            result["properties"] = properties
+        self.write(self.separator + "\n" + json.dumps(result))
+        self.separator = ","
+
+    def fileDone(self, outcome):
+        record = fileRecord(outcome)
+        for problem in record["problems"]:
+            self._result(record, "cill/template-error", "error", problem)
+        for resource in record["resources"]:
+            for violation in resource.get("violations", []):
+                if violation["code"] is None:
+                    self._result(record, "flake8", "error", violation["message"], resource["name"])
+                    continue
+                if "file" in violation:
+                    self._result(
+                        record,
+                        violation["code"],
+                        _level(violation["code"]),
+                        violation["message"],
+                        resource["name"],
+                        region={"startLine": violation["line"], "startColumn": violation["col"]},
+                    )
+                    continue
+                self._result(
+                    record,
+                    violation["code"],
+                    _level(violation["code"]),
+                    f"{violation['message']} (line {violation['line']}, column {violation['col']} of the inline code)",
+                    resource["name"],
+                    {"inlineLine": violation["line"], "inlineColumn": violation["col"]},
+                )
+
+    def finish(self, success):
+        self.write("\n]}]}\n")
+
+
+class JUnitReporter(Reporter):
+    """
+    Writes a JUnit XML report with a test suite per file and a test case per Lambda resource.
+
+    Suites of nested stack templates are named after their stack path.
+    """
+
+    def start(self):
+        self.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="cill">\n')
+
+    def fileDone(self, outcome):
+        record = fileRecord(outcome)
+        file = _quoteAttribute(record["file"])
+        cases = []
+        failures = skipped = 0
+        for problem in record["problems"]:
+            cases.append(f'    <testcase classname={file} name="template">\n      <error message={_quoteAttribute(problem)}/>\n    </testcase>\n')
+        for resource in record["resources"]:
+            case = f'    <testcase classname={file} name={_quoteAttribute(resource["name"])}'
+            if resource["status"] == "FoundErrors":
+                failures += 1
+                text = "\n".join(
+                    f"{violation['line']}:{violation['col']}: {violation['code']} {violation['message']}" if violation["code"] else violation["message"]
+                    for violation in resource["violations"]
+                )
+                cases.append(
+                    f'{case}>\n      <failure message="{len(resource["violations"])} violation(s)">'
+                    f'{escape(text, quote=False)}</failure>\n    </testcase>\n'
+                )
+            elif resource["status"].startswith("Skip"):
+                skipped += 1
+                cases.append(f'{case}>\n      <skipped message={_quoteAttribute(resource.get("reason", ""))}/>\n    </testcase>\n')
+            else:
+                cases.append(f'{case}/>\n')
+        self.write(
+            f'  <testsuite name={_quoteAttribute(record["stack"] or record["file"])} tests="{len(cases)}" failures="{failures}" '
+            f'errors="{len(record["problems"])}" skipped="{skipped}">\n'
+            + "".join(cases) + "  </testsuite>\n"
+        )
+
+    def finish(self, success):
+        self.write("</testsuites>\n")
+
+
+def _quoteAttribute(value):
+    return f'"{escape(value)}"'
+
+
+def getReporter(format, stream, quiet=False):
+    """
+    Returns the reporter writing results in the given format.
+
+    Args:
+        format (str): One of `FORMATS`.
+        stream: Where to write the report.
+        quiet (bool): Only list the errors of failed files instead of their progress output.
+    """
+    if format == "human":
+        return HumanReporter(stream, quiet)
+    if format == "jsonl":
+        return JsonLinesReporter(stream)
+    if format == "sarif":
+        return SarifReporter(stream)
+    if format == "junit":
+        return JUnitReporter(stream)
+    raise ValueError(f"Unknown report format '{format}', expected one of {', '.join(FORMATS)}.")
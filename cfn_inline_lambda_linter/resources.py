@@ -0,0 +1,91 @@
+from .loader import CUSTOM_RESOURCE_PREFIX, CUSTOM_RESOURCE_TYPE, LAMBDA_RESOURCE_TYPES
+
+SERVERLESS_FUNCTION = "AWS::Serverless::Function"
+
+
+class ResourceIndex:
+    """
+    The resources of a template grouped by `Type` in a single pass.
+
+    Every check asks the index for the types it cares about instead of
+    walking all resources again. Resources keep the order of the template.
+    """
+
+    def __init__(self, resources):
+        self.by_type = {}
+        self.position = {}
+        for position, (name, resource) in enumerate(resources.items()):
+            resource_type = resource.get("Type") if isinstance(resource, dict) else None
+            self.by_type.setdefault(resource_type, {})[name] = resource
+            self.position[name] = position
+
+    def ofType(self, *types):
+        """
+        Returns the resources of the given types, keyed by logical ID in template order.
+        """
+        if len(types) == 1:
+            return dict(self.by_type.get(types[0], {}))
+        found = {}
+        for resource_type in types:
+            found.update(self.by_type.get(resource_type, {}))
+        return {name: found[name] for name in sorted(found, key=self.position.__getitem__)}
+
+
+def lambdaFunctions(index, globals_section=None):
+    """
+    Returns the Lambda functions of a template in the shape of `AWS::Lambda::Function` resources.
+
+    `AWS::Serverless::Function` resources inherit the properties of
+    `Globals.Function` they do not set themselves, and their `InlineCode`
+    becomes `Code.ZipFile`. The globals are read once for all functions.
+
+    Args:
+        index (ResourceIndex): The resources of the template.
+        globals_section (dict): The `Globals` section of a SAM template.
+
+    Returns:
+        dict: Every Lambda function keyed by logical ID.
+    """
+    function_globals = {}
+    if isinstance(globals_section, dict) and isinstance(globals_section.get("Function"), dict):
+        function_globals = globals_section["Function"]
+
+    functions = {}
+    for name, resource in index.ofType(*LAMBDA_RESOURCE_TYPES).items():
+        if resource["Type"] == SERVERLESS_FUNCTION:
+            properties = dict(function_globals)
+            properties.update(resource.get("Properties") or {})
+            properties["Code"] = {"ZipFile": properties["InlineCode"]} if "InlineCode" in properties else {}
+            resource = dict(resource, Properties=properties)
+        functions[name] = resource
+    return functions
+
+
+def customResourceProviders(index):
+    """
+    Finds the Lambda functions that custom resources of a template send their requests to.
+
+    A function is a provider when the `ServiceToken` of an
+    `AWS::CloudFormation::CustomResource` or `Custom::*` resource is its `Arn`,
+    through `Fn::GetAtt` or `Fn::Sub`.
+
+    Args:
+        index (ResourceIndex): The resources of the template.
+
+    Returns:
+        set: Logical IDs of the provider functions.
+    """
+    providers = set()
+    for resource_type, resources in index.by_type.items():
+        if resource_type != CUSTOM_RESOURCE_TYPE and not str(resource_type).startswith(CUSTOM_RESOURCE_PREFIX):
+            continue
+        for resource in resources.values():
+            token = (resource.get("Properties") or {}).get("ServiceToken")
+            if not isinstance(token, dict) or len(token) != 1:
+                continue
+            function, argument = next(iter(token.items()))
+            if function == "Fn::GetAtt" and isinstance(argument, list) and argument[1:] == ["Arn"]:
+                providers.add(argument[0])
+            elif function == "Fn::Sub" and isinstance(argument, str) and argument.startswith("${") and argument.endswith(".Arn}"):
+                providers.add(argument[2:-5])
+    return providers
@@ -0,0 +1,179 @@
+import re
+import sys
+
+_VIOLATION = re.compile(r"^(?P<path>.*?):(?P<line>\d+):(?P<col>\d+): (?P<code>[A-Z]+\d+) (?P<message>.*)$")
+
+#: Statuses of the functions a backend linted, the others were skipped or not linted yet
+LINTED = ("FoundErrors", "FoundNoErrors")
+
+
+class Violation:
+    """
+    A single violation of a lint report.
+
+    Codes are interned, so the thousands of F401 of a large run share one string.
+
+    Args:
+        line (int): The line in the inline code, or in the template when `file` is given.
+        col (int): The column.
+        code (str): The code, like `F401`.
+        message (str): The message, or the whole text of lines not in the default flake8 format.
+        file (str): The template the position is in, None for positions in the inline code.
+    """
+
+    __slots__ = ("line", "col", "code", "message", "file")
+
+    def __init__(self, line, col, code, message, file=None):
+        self.line = line
+        self.col = col
+        self.code = sys.intern(code) if code is not None else None
+        self.message = message
+        self.file = file
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parses a line of a lint report.
+
+        Returns:
+            Violation: The violation, None for a blank line. Lines that are not
+            in the default flake8 format keep their text as message.
+        """
+        match = _VIOLATION.match(text)
+        if match:
+            path = match["path"]
+            return cls(int(match["line"]), int(match["col"]), match["code"], match["message"], None if path == "stdin" else path)
+        if text.strip():
+            return cls(None, None, None, text)
+        return None
+
+    def asDict(self):
+        """
+        Returns the `line`, `col`, `code` and `message` of the violation, and the `file` when it has one.
+        """
+        violation = {"line": self.line, "col": self.col, "code": self.code, "message": self.message}
+        if self.file is not None:
+            violation["file"] = self.file
+        return violation
+
+    def __str__(self):
+        if self.code is None:
+            return self.message
+        return f"{self.file or 'stdin'}:{self.line}:{self.col}: {self.code} {self.message}"
+
+    def __eq__(self, other):
+        if not isinstance(other, Violation):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return f"Violation({self})"
+
+
+def parseReport(errors):
+    """
+    Splits a lint report in flake8's format into violations.
+
+    Args:
+        errors (str): The report of an inline function.
+
+    Returns:
+        tuple: The `Violation` of every line that is not blank.
+    """
+    return tuple(violation for violation in map(Violation.parse, errors.splitlines()) if violation is not None)
+
+
+class ResourceResult:
+    """
+    The result of a Lambda function, with the violations of its report parsed once.
+
+    Records are not changed once built, so copies of a function and the
+    tables remembering them share a single record. They still read like the
+    `{"status": ..., "errors": ...}` dicts they replace: `record["errors"]`
+    is the report text of a linted function and the reason of a skipped one.
+
+    Args:
+        status (str): `FoundErrors`, `FoundNoErrors`, `CodeNotFormatted` or a status starting with `Skip`.
+        violations (tuple): The `Violation` of every finding of a linted function.
+        reason (str): Why the function was skipped.
+    """
+
+    __slots__ = ("status", "violations", "reason")
+
+    def __init__(self, status, violations=(), reason=None):
+        self.status = sys.intern(status)
+        self.violations = tuple(violations)
+        self.reason = reason
+
+    @classmethod
+    def fromReport(cls, errors):
+        """
+        Builds the result of a linted function from its report, empty when no errors were found.
+        """
+        violations = parseReport(errors)
+        return cls("FoundErrors" if violations else "FoundNoErrors", violations)
+
+    @classmethod
+    def fromDict(cls, record):
+        """
+        Builds a result from a `{"status": ..., "errors": ...}` dict, returning results as they are.
+        """
+        if isinstance(record, ResourceResult):
+            return record
+        if record["status"] in LINTED:
+            return cls(record["status"], parseReport(record.get("errors", "")))
+        return cls(record["status"], reason=record.get("errors"))
+
+    @property
+    def errors(self):
+        """
+        The report text of a linted function, the reason of a skipped one.
+        """
+        if self.status in LINTED:
+            return "".join(f"{violation}\n" for violation in self.violations)
+        return self.reason
+
+    @property
+    def failed(self):
+        """
+        Whether the function was linted and violations were found.
+        """
+        return self.status == "FoundErrors"
+
+    def asDict(self):
+        """
+        Returns the result as a `{"status": ..., "errors": ...}` dict, without `errors` when there is nothing to tell.
+        """
+        errors = self.errors
+        return {"status": self.status} if errors is None else {"status": self.status, "errors": errors}
+
+    def __getitem__(self, key):
+        if key == "status":
+            return self.status
+        if key == "errors" and self.errors is not None:
+            return self.errors
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return self.asDict() == other
+        if not isinstance(other, ResourceResult):
+            return NotImplemented
+        return (self.status, self.violations, self.reason) == (other.status, other.violations, other.reason)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ResourceResult({self.asDict()!r})"
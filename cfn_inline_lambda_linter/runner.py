@@ -0,0 +1,181 @@
+import io
+import os
+from collections import deque, namedtuple
+from contextlib import ExitStack
+from functools import partial
+
+from .cache import ResultTable, cacheCounters, getResultTable, shareResultTable, sharedResultTable, templateCacheCounters
+from .linter import lintTemplate
+from .prefilter import mayHoldLambdas
+from .reporters import captureProgress, progress, quietProgress, recordResults, reportProblem, reportSkipped
+from .stacks import StackTree
+from .timings import recordTimings
+
+LintOutcome = namedtuple(
+    "LintOutcome", ["fileName", "success", "output", "stats", "timings", "results", "stack"], defaults=[None, None, None]
+)
+
+
+def lintFile(fileName, timings=False, quiet=False, stack=None, nested_stacks=True, **options):
+    """
+    Lints a single template while capturing everything it reports.
+
+    The progress output of the linter is written into a buffer owned by this
+    call, so several files can be linted side by side, in processes or
+    threads, without sharing stdout. Nothing is printed and nothing exits.
+    Files whose bytes name no Lambda function, nor a nested stack to follow,
+    are skipped before they are parsed and counted as `prefiltered`.
+
+    Args:
+        fileName (str): The name of the file to process and lint.
+        timings (bool): Record the time spent on the file, its phases and its resources.
+        quiet (bool): Do not build the progress output, only the structured results.
+        stack (str): The nested stack path the template was reached through.
+        nested_stacks (bool): Whether the child templates of nested stacks are followed, so files with one are parsed.
+        **options: Keyword arguments passed on to `lintTemplate`, like `args`, `cache_dir`
+            or an already parsed `template`.
+
+    Returns:
+        LintOutcome: The file name, whether it passed linting, the captured output,
+        the counters collected while linting it, its timing records and its
+        structured results (see `reporters.recordResults`) and its nested stack path.
+    """
+    # The staged version of the file is read from the git index, not from the disk
+    if options.get("template") is None and not options.get("staged") and not mayHoldLambdas(fileName, nested_stacks):
+        with recordResults() as results:
+            reportSkipped("No Lambda function or nested stack found")
+        return LintOutcome(fileName, True, "", {"prefiltered": 1}, [] if timings else None, results, stack)
+
+    cache_dir = options.get("cache_dir")
+    hits, misses = cacheCounters(cache_dir)
+    template_hits, template_misses = templateCacheCounters(cache_dir)
+
+    output_buffer = io.StringIO()
+    with ExitStack() as exit_stack:
+        # Outside of a run the copies of a function are only shared within the template
+        table = getResultTable() or exit_stack.enter_context(sharedResultTable())
+        saved = table.saved
+        results = exit_stack.enter_context(recordResults())
+        if quiet:
+            exit_stack.enter_context(quietProgress())
+        if timings:
+            recorded = exit_stack.enter_context(recordTimings())
+            recorded.file = fileName
+            exit_stack.enter_context(recorded.measure("file", fileName))
+        exit_stack.enter_context(captureProgress(output_buffer))
+        try:
+            success = lintTemplate(fileName, stack=stack, **options)
+        except Exception as e:
+            success = False
+            progress("", "Unexpected error while linting {}: {}", fileName, e)
+            reportProblem(f"Unexpected error while linting {fileName}: {e}")
+
+    stats = {}
+    if cache_dir is not None:
+        hits_after, misses_after = cacheCounters(cache_dir)
+        stats["cache_hits"] = hits_after - hits
+        stats["cache_misses"] = misses_after - misses
+        if options.get("template_cache"):
+            template_hits_after, template_misses_after = templateCacheCounters(cache_dir)
+            stats["template_cache_hits"] = template_hits_after - template_hits
+            stats["template_cache_misses"] = template_misses_after - template_misses
+    if table.saved > saved:
+        stats["deduplicated"] = table.saved - saved
+    return LintOutcome(fileName, success, output_buffer.getvalue(), stats, recorded.records if timings else None, results, stack)
+
+
+def lintFiles(files, jobs=None, ordered=True, nested_stacks=True, executor=None, **options):
+    """
+    Lints templates in a pool of worker processes, following their nested stacks.
+
+    `files` may be a generator still discovering templates, like
+    `discovery.discoverTemplates`. Only as many templates are taken from it as
+    the pool can work on, so linting starts before discovery is done. The
+    child templates of nested stacks are linted in the same pool once every
+    passed template is queued, once per run however many parents refer to
+    them. The pool is only started once there is more than one template
+    waiting, so a single template without nested stacks is linted in this
+    process.
+
+    Args:
+        files (iterable): The names of the files to lint, or parsed templates as dicts,
+            which are named `<template N>` after their position.
+        jobs (int): Number of worker processes, defaults to the number of CPUs.
+        ordered (bool): Yield the outcomes in the order templates were queued instead of as soon as each is done.
+        nested_stacks (bool): Also lint the local child templates of `AWS::CloudFormation::Stack` resources.
+        executor (concurrent.futures.Executor): Lint in this process or thread pool instead of
+            starting one. It is left running when the generator is done.
+        **options: Keyword arguments passed on to `lintFile`, like `args` or `timings`.
+
+    Yields:
+        LintOutcome: The result of `lintFile` for every template, the ones in `files` first when ordered.
+    """
+    worker = partial(lintFile, nested_stacks=nested_stacks, **options)
+    files = enumerate(files, 1)
+    queue = deque()
+    # Child templates wait until every passed template is queued
+    children = deque()
+    pending = deque()
+    tree = StackTree(()) if nested_stacks else None
+    limit = jobs or os.cpu_count() or 1
+    # Copies of a function are linted once in this process, the workers of a pool keep their own results
+    table = ResultTable()
+
+    def refill():
+        # Look ahead only as far as the pool can use, discovery keeps running meanwhile
+        while len(queue) + len(pending) < limit * 2:
+            position, entry = next(files, (None, None))
+            if position is None:
+                # Templates passed to the run are reported as passed, not under the stack path of a parent
+                queue.extend((fileName, stack, None) for fileName, stack in children if not tree.isPassed(fileName))
+                children.clear()
+                return
+            if isinstance(entry, dict):
+                queue.append((f"<template {position}>", None, entry))
+            elif tree is None or tree.add(entry):
+                queue.append((entry, None, None))
+
+    def follow(outcome):
+        if tree is None:
+            return outcome
+        outcome, to_lint = tree.follow(outcome)
+        children.extend(to_lint)
+        return outcome
+
+    owned = None
+    try:
+        while True:
+            refill()
+            if not (queue or pending):
+                break
+            if executor is None and limit > 1 and len(queue) > 1:
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Nested stacks and discovery can add templates later, so the pool is sized for the most it may need
+                # Every worker keeps the results of the copies of functions it linted until the run is done
+                executor = owned = ProcessPoolExecutor(
+                    max_workers=limit if nested_stacks or len(queue) >= limit else len(queue), initializer=shareResultTable
+                )
+            if executor is None:
+                fileName, stack, template = queue.popleft()
+                with sharedResultTable(table):
+                    outcome = lintFile(fileName, stack=stack, template=template, nested_stacks=nested_stacks, **options)
+                yield follow(outcome)
+                continue
+
+            while queue:
+                fileName, stack, template = queue.popleft()
+                pending.append(executor.submit(worker, fileName, stack=stack, template=template))
+            if ordered:
+                future = pending.popleft()
+            else:
+                from concurrent.futures import FIRST_COMPLETED, wait
+
+                future = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+                pending.remove(future)
+            yield follow(future.result())
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned is not None:
+            owned.shutdown(cancel_futures=True)
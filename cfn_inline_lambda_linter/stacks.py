@@ -0,0 +1,119 @@
+import os
+
+from .loader import NESTED_STACK_TYPES
+
+
+def findNestedStacks(fileName, index):
+    """
+    Finds the nested stacks of a template whose template is a local path.
+
+    That is the `TemplateURL` of `AWS::CloudFormation::Stack` resources and
+    the `Location` of SAM `AWS::Serverless::Application` resources. URLs
+    (`https://`, `s3://`), serverless repository applications and intrinsic
+    functions cannot be followed and are left alone.
+
+    Args:
+        fileName (str): The template the resources belong to, relative paths are resolved against its directory.
+        index (ResourceIndex): The resources of the template.
+
+    Returns:
+        dict: The path of the child template of every nested stack, keyed by logical ID.
+    """
+    stacks = {}
+    for name, resource in index.ofType(*NESTED_STACK_TYPES).items():
+        properties = resource.get("Properties") or {}
+        url = properties.get("TemplateURL", properties.get("Location"))
+        if not isinstance(url, str) or "://" in url:
+            continue
+        stacks[name] = os.path.normpath(os.path.join(os.path.dirname(fileName), url))
+    return stacks
+
+
+class StackTree:
+    """
+    Keeps track of the templates of a run and the nested stacks between them.
+
+    Every template is scheduled once, however many parents refer to it, and
+    a nested stack that leads back to one of its ancestors is reported as a
+    cycle instead of being followed. Templates passed to the run are always
+    reported as passed, nested stacks referring to them do not lint them again.
+    """
+
+    def __init__(self, files):
+        # The name every template was queued with, keyed by its real path
+        self.names = {os.path.realpath(fileName): fileName for fileName in files}
+        self.passed = set(self.names)
+        self.children = {}
+
+    def add(self, fileName):
+        """
+        Registers a template passed to the run after it started.
+
+        A template already claimed as the child of a nested stack becomes a
+        passed one, the caller drops the child it queued, see `isPassed`.
+
+        Returns:
+            bool: False if the template was already passed to the run.
+        """
+        path = os.path.realpath(fileName)
+        if path in self.passed:
+            return False
+        self.passed.add(path)
+        self.names[path] = fileName
+        return True
+
+    def isPassed(self, fileName):
+        """
+        Tells whether a template was passed to the run.
+        """
+        return os.path.realpath(fileName) in self.passed
+
+    def _pathTo(self, start, goal, visited=None):
+        if start == goal:
+            return [start]
+        visited = visited if visited is not None else set()
+        visited.add(start)
+        for child in self.children.get(start, ()):
+            if child not in visited:
+                path = self._pathTo(child, goal, visited)
+                if path:
+                    return [start] + path
+        return None
+
+    def follow(self, outcome):
+        """
+        Records the nested stacks of a linted template.
+
+        Args:
+            outcome (LintOutcome): The outcome of the template.
+
+        Returns:
+            tuple: The outcome, failed with a problem for every cycle, and the
+            `(fileName, stack)` pairs of the child templates to lint next.
+        """
+        stacks = (outcome.results or {}).get("stacks") or {}
+        parent = os.path.realpath(outcome.fileName)
+        self.names.setdefault(parent, outcome.fileName)
+        to_lint = []
+        cycles = []
+        for name, child in stacks.items():
+            target = os.path.realpath(child)
+            # A cycle closes when the child already leads back to the parent
+            path = self._pathTo(target, parent)
+            self.children.setdefault(parent, set()).add(target)
+            if path:
+                cycles.append(
+                    f"Nested stack '{name}' creates a cycle: "
+                    + " → ".join(self.names.get(template, template) for template in [parent] + path)
+                )
+            elif target not in self.names:
+                self.names[target] = child
+                to_lint.append((child, f"{outcome.stack or outcome.fileName}/{name}"))
+
+        if cycles:
+            outcome = outcome._replace(
+                success=False,
+                output=outcome.output + "".join(f"❌ {cycle}\n" for cycle in cycles),
+                results=dict(outcome.results, problems=outcome.results["problems"] + cycles),
+            )
+        return outcome, to_lint
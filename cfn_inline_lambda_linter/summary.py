@@ -0,0 +1,35 @@
+"""
+The lines closing a run of `cill lint`.
+
+Nothing here imports a third party module, so the fast entry point in `cli`
+prints the same summary as `main.lint` without loading the linter.
+"""
+
+#: What the human report ends with when every file passed
+ALL_PASSED = "✅ All files passed linting!"
+
+
+def summaryLines(stats, cache=False, template_cache=False):
+    """
+    Builds the summary of the counters of a run.
+
+    Args:
+        stats (dict): The counters of the run, the `stats` of every `LintOutcome` added up.
+        cache (bool): Whether the lint result cache was used.
+        template_cache (bool): Whether the parsed template cache was used.
+
+    Returns:
+        list: The lines to print.
+    """
+    lines = []
+    if stats.get("prefiltered"):
+        lines.append(f"⏭ {stats['prefiltered']} file(s) without Lambda functions skipped.")
+    if stats.get("deduplicated"):
+        lines.append(f"♻️ {stats['deduplicated']} lint execution(s) saved by linting copies of a function once.")
+    if cache:
+        lines.append(f"💾 Lint cache: {stats.get('cache_hits', 0)} hit(s), {stats.get('cache_misses', 0)} miss(es).")
+        if template_cache:
+            lines.append(
+                f"📦 Template cache: {stats.get('template_cache_hits', 0)} hit(s), {stats.get('template_cache_misses', 0)} miss(es)."
+            )
+    return lines
@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+SCOPES = ("phase", "file", "resource", "flake8-process")
+
+
+class Timings:
+    """
+    Collects wall and CPU time of the linter phases, files and resources.
+
+    Every record is a dict with the `scope` (one of `SCOPES`), the `name` of
+    what was measured, the `file` it belongs to, and `wall`/`cpu` seconds.
+    For flake8 child processes `cpu` is the CPU time of the child.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.file = None
+
+    def add(self, scope, name, wall, cpu, file=None):
+        self.records.append({"scope": scope, "name": name, "file": file or self.file, "wall": wall, "cpu": cpu})
+
+    @contextmanager
+    def measure(self, scope, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(scope, name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def summary(self, top=10):
+        """
+        Formats the records as a table of phase totals and the slowest files and resources.
+
+        Args:
+            top (int): How many of the slowest files and resources to list.
+
+        Returns:
+            str: The summary table.
+        """
+        lines = [f"{'scope':<15}{'name':<40}{'count':>7}{'wall s':>11}{'cpu s':>11}"]
+        for scope in SCOPES:
+            records = [record for record in self.records if record["scope"] == scope]
+            if scope in ("phase", "flake8-process"):
+                totals = {}
+                for record in records:
+                    total = totals.setdefault(record["name"], [0, 0.0, 0.0])
+                    total[0] += 1
+                    total[1] += record["wall"]
+                    total[2] += record["cpu"]
+                rows = [(name, *total) for name, total in totals.items()]
+            else:
+                slowest = sorted(records, key=lambda record: record["wall"], reverse=True)[:top]
+                rows = [
+                    (record["name"] if scope == "file" else f"{record['file']}:{record['name']}", 1, record["wall"], record["cpu"])
+                    for record in slowest
+                ]
+            for name, count, wall, cpu in rows:
+                if len(name) > 39:
+                    name = "…" + name[-38:]
+                lines.append(f"{scope:<15}{name:<40}{count:>7}{wall:>11.4f}{cpu:>11.4f}")
+        return "\n".join(lines)
+
+    def toJson(self):
+        return json.dumps({"records": self.records}, indent=2)
+
+    def toOpenMetrics(self):
+        """
+        Formats the records in the OpenMetrics text format.
+
+        Returns:
+            str: `cill_wall_seconds` and `cill_cpu_seconds` samples labelled by scope, name and file.
+        """
+        lines = []
+        for metric, field in (("cill_wall_seconds", "wall"), ("cill_cpu_seconds", "cpu")):
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"# UNIT {metric} seconds")
+            for record in self.records:
+                labels = ",".join(
+                    f'{label}="{_escapeLabel(record[label])}"'
+                    for label in ("scope", "name", "file")
+                    if record[label] is not None
+                )
+                lines.append(f"{metric}{{{labels}}} {record[field]:.6f}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Writes the records to a file, in OpenMetrics format for `.prom`/`.om` files and as JSON otherwise.
+        """
+        content = self.toOpenMetrics() if path.endswith((".prom", ".om")) else self.toJson()
+        with open(path, "w") as file:
+            file.write(content)
+
+
+def _escapeLabel(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _State(threading.local):
+    """The timings being recorded, per thread so templates can be linted in a thread pool."""
+
+    current = None
+
+
+_state = _State()
+
+
+@contextmanager
+def recordTimings(timings=None):
+    """
+    Records the timings of everything the linter does inside the block.
+
+    Args:
+        timings (Timings): Where to record to, a new Timings by default.
+
+    Yields:
+        Timings: The timings being recorded.
+    """
+    previous = _state.current
+    _state.current = timings if timings is not None else Timings()
+    try:
+        yield _state.current
+    finally:
+        _state.current, recorded = previous, _state.current
+        if previous is not None and previous is not recorded:
+            previous.records.extend(recorded.records)
+
+
+@contextmanager
+def timed(scope, name):
+    """
+    Measures the block if timings are being recorded, does nothing otherwise.
+    """
+    current = _state.current
+    if current is None:
+        yield
+        return
+    with current.measure(scope, name):
+        yield
+
+
+@contextmanager
+def timedChildProcess(name):
+    """
+    Measures a block that runs and waits for child processes, recording their CPU time.
+    """
+    current = _state.current
+    if current is None:
+        yield
+        return
+    wall = time.perf_counter()
+    before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+    try:
+        yield
+    finally:
+        cpu = 0.0
+        if resource:
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+        current.add("flake8-process", name, time.perf_counter() - wall, cpu)
+
+
+def currentTimings():
+    """
+    Returns the timings being recorded, None when timings are not recorded.
+    """
+    return _state.current
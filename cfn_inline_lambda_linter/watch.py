@@ -0,0 +1,367 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections import Counter
+
+from colorama import Fore, Style
+
+from .cache import ResultTable, sharedResultTable
+from .discovery import TEMPLATE_SUFFIXES, discoverTemplates
+from .incremental import unchangedLambdas
+from .linter import readFile
+from .reporters import quietProgress
+from .results import LINTED
+from .runner import lintFile
+
+#: Seconds a burst of saves may take, the templates are linted once it is over
+DEFAULT_DEBOUNCE = 0.2
+#: Seconds between two scans of the polling watcher
+POLL_INTERVAL = 0.5
+
+# inotify(7) event masks
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+def templateStates(paths, exclude=()):
+    """
+    Lists the templates below paths with their modification time and size.
+
+    Returns:
+        dict: The `(mtime_ns, size)` of every template keyed by path.
+    """
+    states = {}
+    for fileName in discoverTemplates(paths, exclude):
+        try:
+            stat = os.stat(fileName)
+        except OSError:
+            continue
+        states[fileName] = (stat.st_mtime_ns, stat.st_size)
+    return states
+
+
+class PollingWatcher:
+    """
+    Notices changes to templates by listing them and comparing their modification time and size.
+
+    Args:
+        paths (list): The files and directories to watch.
+        exclude (list): Globs of files and directories to leave out, see `discoverTemplates`.
+        interval (float): Seconds between two scans.
+    """
+
+    def __init__(self, paths, exclude=(), interval=POLL_INTERVAL):
+        self.paths = paths
+        self.exclude = exclude
+        self.interval = interval
+        self.states = templateStates(paths, exclude)
+
+    def wait(self, timeout=None):
+        """
+        Waits for templates to change.
+
+        Args:
+            timeout (float): Seconds to wait at most, None to wait until something changes.
+
+        Returns:
+            bool: True if a template was added, changed or removed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining > 0:
+                time.sleep(remaining)
+            states = templateStates(self.paths, self.exclude)
+            if states != self.states:
+                self.states = states
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Notices changes to templates through Linux inotify, without scanning anything while nothing changes.
+
+    The directories of the watched files and every directory below watched
+    directories are watched, so files replaced by editors saving through a
+    rename are noticed too.
+
+    Args:
+        paths (list): The files and directories to watch.
+        exclude (list): Globs of files and directories to leave out, see `discoverTemplates`.
+
+    Raises:
+        OSError: If inotify is not available.
+    """
+
+    def __init__(self, paths, exclude=()):
+        library = ctypes.util.find_library("c")
+        self.libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.descriptor = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.descriptor < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for path in paths:
+            if os.path.isdir(path):
+                for directory, names, _ in os.walk(path):
+                    names[:] = [name for name in names if name != ".git"]
+                    self._watch(directory)
+            else:
+                self._watch(os.path.dirname(os.path.abspath(path)))
+
+    def _watch(self, directory):
+        watch = self.libc.inotify_add_watch(self.descriptor, os.fsencode(directory), WATCH_MASK)
+        if watch >= 0:
+            self.directories[watch] = directory
+
+    def _relevant(self, events):
+        relevant = False
+        for watch, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                return True
+            directory = self.directories.get(watch)
+            if directory is None:
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # New directories are watched too, templates may be written into them
+                    self._watch(os.path.join(directory, name))
+                relevant = True
+            elif mask & IN_DELETE_SELF or name.endswith(TEMPLATE_SUFFIXES):
+                relevant = True
+        return relevant
+
+    def _read(self):
+        events = []
+        try:
+            data = os.read(self.descriptor, 64 * 1024)
+        except BlockingIOError:
+            return events
+        offset = 0
+        while offset < len(data):
+            watch, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((watch, mask, name))
+        return events
+
+    def wait(self, timeout=None):
+        """
+        Waits for templates to change.
+
+        Args:
+            timeout (float): Seconds to wait at most, None to wait until something changes.
+
+        Returns:
+            bool: True if a template or a directory below the watched paths changed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.descriptor], [], [], remaining)
+            if not ready:
+                return False
+            if self._relevant(self._read()):
+                return True
+
+    def close(self):
+        os.close(self.descriptor)
+
+
+def createWatcher(paths, exclude=()):
+    """
+    Returns an inotify watcher when the system has inotify, a polling one otherwise.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths, exclude)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(paths, exclude)
+
+
+def findings(resources):
+    """
+    Counts the findings of the linted resources of a template.
+
+    Findings are told apart by resource, code and message, not by position, so
+    editing the lines above a finding does not report it as fixed and new.
+
+    Returns:
+        Counter: The number of times every `(resource, code, message)` was found.
+    """
+    counted = Counter()
+    for name, record in resources.items():
+        for violation in record.violations:
+            counted[(name, violation.code, violation.message)] += 1
+    return counted
+
+
+class WatchSession:
+    """
+    Keeps the parsed templates of a watch and the results of their Lambda functions.
+
+    When a template changes it is parsed again and only the functions whose
+    inline code or runtime changed are linted, the others keep their result.
+    Nested stacks are not followed, every watched template is linted on its own.
+
+    Args:
+        paths (list): The files and directories to watch.
+        exclude (list): Globs of files and directories to leave out, see `discoverTemplates`.
+        **options: Keyword arguments passed on to `lintFile`, like `args` or `cache_dir`.
+    """
+
+    def __init__(self, paths, exclude=(), **options):
+        self.paths = paths
+        self.exclude = exclude
+        self.options = options
+        self.states = {}
+        self.templates = {}
+        self.resources = {}
+        self.outcomes = {}
+        # Copies of a function are linted once for the whole watch
+        self.table = ResultTable()
+
+    def lint(self, fileName):
+        """
+        Lints a template, reusing the results of the functions that did not change since its last lint.
+
+        Returns:
+            tuple: The `LintOutcome` of the template and the number of functions whose result was reused.
+        """
+        previous = self.templates.pop(fileName, None)
+        template = None
+        known = {}
+        try:
+            with quietProgress():
+                cache_dir = self.options.get("cache_dir") if self.options.get("template_cache") else None
+                template = readFile(fileName, self.options.get("streaming", False), cache_dir=cache_dir)
+        except Exception:
+            # The linter reads the file again and reports why it cannot be parsed
+            pass
+        if template is not None and previous is not None:
+            results = self.resources.get(fileName, {})
+            known = {i: results[i] for i in unchangedLambdas(template, previous) if i in results}
+        with sharedResultTable(self.table):
+            outcome = lintFile(fileName, template=template, known=known, **self.options)
+        if template is not None:
+            self.templates[fileName] = template
+        self.resources[fileName] = outcome.results["resources"] if outcome.results else {}
+        self.outcomes[fileName] = outcome
+        return outcome, len(known)
+
+    def start(self):
+        """
+        Lints every watched template.
+
+        Yields:
+            LintOutcome: The outcome of every template.
+        """
+        self.states = templateStates(self.paths, self.exclude)
+        for fileName in self.states:
+            yield self.lint(fileName)[0]
+
+    def update(self):
+        """
+        Lints the templates added or changed since the last lint and forgets the removed ones.
+
+        Returns:
+            list: A `(fileName, outcome, relinted, new, fixed)` tuple for every added, changed or
+            removed template, sorted by file name. The outcome is None for removed templates,
+            `relinted` is the number of functions linted again and `new` and `fixed` count the
+            findings that appeared and disappeared.
+        """
+        states = templateStates(self.paths, self.exclude)
+        changes = []
+        for fileName in self.states.keys() - states.keys():
+            before = findings(self.resources.pop(fileName, {}))
+            self.templates.pop(fileName, None)
+            self.outcomes.pop(fileName, None)
+            changes.append((fileName, None, 0, Counter(), before))
+        for fileName, state in states.items():
+            if self.states.get(fileName) == state:
+                continue
+            before = findings(self.resources.get(fileName, {}))
+            outcome, reused = self.lint(fileName)
+            resources = outcome.results["resources"] if outcome.results else {}
+            linted = sum(1 for record in resources.values() if record.status in LINTED)
+            after = findings(resources)
+            changes.append((fileName, outcome, max(0, linted - reused), after - before, before - after))
+        self.states = states
+        return sorted(changes, key=lambda change: change[0])
+
+    @property
+    def success(self):
+        """
+        Whether every watched template passed linting the last time it was linted.
+        """
+        return all(outcome.success for outcome in self.outcomes.values())
+
+
+def _finding(resource, code, message):
+    return f"{resource}: {code} {message}" if code else f"{resource}: {message}"
+
+
+def printChanges(changes, stream=None):
+    """
+    Prints what changed in the findings of the templates linted again.
+
+    Args:
+        changes (list): The changes returned by `WatchSession.update`.
+        stream: Where to print, stdout by default.
+    """
+    stream = stream or sys.stdout
+    for fileName, outcome, relinted, new, fixed in changes:
+        if outcome is None:
+            print(f"{Fore.YELLOW}🗑 {fileName} was removed, {sum(fixed.values())} finding(s) dropped.{Style.RESET_ALL}", file=stream)
+            continue
+        summary = f"🔁 {fileName}: {relinted} function(s) linted again, {sum(new.values())} new and {sum(fixed.values())} fixed finding(s)."
+        print(f"{Fore.CYAN}{summary}{Style.RESET_ALL}", file=stream)
+        for problem in outcome.results["problems"] if outcome.results else ():
+            print(f"  {Fore.RED}❌ {problem}{Style.RESET_ALL}", file=stream)
+        for finding in sorted(new.elements(), key=str):
+            print(f"  {Fore.RED}+ {_finding(*finding)}{Style.RESET_ALL}", file=stream)
+        for finding in sorted(fixed.elements(), key=str):
+            print(f"  {Fore.GREEN}- {_finding(*finding)}{Style.RESET_ALL}", file=stream)
+
+
+def watchTemplates(session, watcher, debounce=DEFAULT_DEBOUNCE, stream=None):
+    """
+    Lints the templates of a session again every time they change, until interrupted.
+
+    Args:
+        session (WatchSession): The session whose templates were linted once.
+        watcher: The `InotifyWatcher` or `PollingWatcher` of the watched paths.
+        debounce (float): Seconds without changes a burst of saves ends with.
+        stream: Where to print the changes, stdout by default.
+    """
+    try:
+        while True:
+            if not watcher.wait():
+                continue
+            # Editors save in several steps, lint once the burst is over
+            while watcher.wait(debounce):
+                pass
+            printChanges(session.update(), stream)
+    finally:
+        watcher.close()
@@ -0,0 +1,27 @@
+"""
+A flake8 worker of the Python backend's pool, see `backends.WorkerPool`.
+
+Run as `python -m cfn_inline_lambda_linter.worker <flake8 args>`. The flake8
+engine is set up once and lints every source sent on stdin.
+"""
+import json
+import sys
+
+from .engine import Flake8Engine
+
+
+def main(arguments):
+    engine = None
+    for request in sys.stdin:
+        try:
+            if engine is None:
+                engine = Flake8Engine(" ".join(arguments))
+            answer = {"report": engine.lint(json.loads(request)["source"])}
+        except Exception as e:
+            answer = {"error": str(e)}
+        sys.stdout.write(json.dumps(answer) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
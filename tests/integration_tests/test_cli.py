@@ -0,0 +1,176 @@
+import json
+import pstats
+from xml.etree import ElementTree
+
+from typer.testing import CliRunner
+
+from cfn_inline_lambda_linter.main import app
+
+runner = CliRunner()
+
+
+def write_template(tmp_path, name, zip_file):
+    file_path = tmp_path / name
+    file_path.write_text(f"""
+Resources:
+  LambdaFunction:
+    Type: "AWS::Lambda::Function"
+    Properties:
+      Runtime: "python3.12"
+      Code:
+        ZipFile: "{zip_file}"
+""")
+    return str(file_path)
+
+
+def test_cli_all_files_pass(tmp_path):
+    files = [write_template(tmp_path, f"ok_{index}.yaml", "print(1)\\n") for index in range(3)]
+    result = runner.invoke(app, ["lint", "--no-cache", "--jobs", "2"] + files)
+    assert result.exit_code == 0
+    assert "All files passed linting" in result.output
+
+
+def test_cli_counts_prefiltered_files(tmp_path):
+    manifest = tmp_path / "workflow.yml"
+    manifest.write_text("on: push\njobs: {}\n")
+    template = write_template(tmp_path, "template.yaml", "print(1)\\n")
+    result = runner.invoke(app, ["lint", "--no-cache", template, str(manifest)])
+    assert result.exit_code == 0
+    assert "1 file(s) without Lambda functions skipped" in result.output
+
+
+def test_cli_counts_deduplicated_functions(tmp_path):
+    files = [write_template(tmp_path, f"copy_{index}.yaml", "print(1)\\n") for index in range(3)]
+    result = runner.invoke(app, ["lint", "--no-cache", "--jobs", "1"] + files)
+    assert result.exit_code == 0
+    assert "2 lint execution(s) saved" in result.output
+
+
+def test_cli_watch_rejects_git_and_report_options(tmp_path):
+    result = runner.invoke(app, ["lint", "--watch", "--format", "sarif", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "Watch mode" in result.output
+
+
+def test_cli_reports_failures_in_file_order(tmp_path):
+    first = write_template(tmp_path, "first.yaml", "import os\\n")
+    passing = write_template(tmp_path, "passing.yaml", "print(1)\\n")
+    second = write_template(tmp_path, "second.yaml", "import sys\\n")
+    result = runner.invoke(app, ["lint", "--no-cache", "--jobs", "2", first, passing, second])
+    assert result.exit_code == 1
+    assert "F401" in result.output
+    assert result.output.index(first) < result.output.index(second)
+    # Only files that failed are reported
+    assert passing not in result.output
+
+
+def test_cli_quiet_lists_only_errors(tmp_path):
+    failing = write_template(tmp_path, "failing.yaml", "import os\\n")
+    result = runner.invoke(app, ["lint", "--no-cache", "--quiet", failing])
+    assert result.exit_code == 1
+    assert f"{failing}: LambdaFunction:1:1: F401 'os' imported but unused" in result.output
+    assert "Processing file" not in result.output
+
+
+def test_cli_json_lines_report(tmp_path):
+    failing = write_template(tmp_path, "failing.yaml", "import os\\n")
+    passing = write_template(tmp_path, "passing.yaml", "print(1)\\n")
+    result = runner.invoke(app, ["lint", "--no-cache", "--jobs", "2", "--format", "jsonl", failing, passing])
+    assert result.exit_code == 1
+    records = {record["file"]: record for record in map(json.loads, result.stdout.splitlines())}
+    assert records[passing]["success"] is True
+    violation = records[failing]["resources"][0]["violations"][0]
+    assert violation == {"line": 1, "col": 1, "code": "F401", "message": "'os' imported but unused"}
+
+
+def test_cli_sarif_and_junit_reports(tmp_path):
+    failing = write_template(tmp_path, "failing.yaml", "import os\\n")
+    sarif_path = tmp_path / "report.sarif"
+    result = runner.invoke(app, ["lint", "--no-cache", "--format", "sarif", "--output", str(sarif_path), failing])
+    assert result.exit_code == 1
+    sarif = json.loads(sarif_path.read_text())
+    assert [result["ruleId"] for result in sarif["runs"][0]["results"]] == ["F401"]
+
+    result = runner.invoke(app, ["lint", "--no-cache", "--format", "junit", failing])
+    suite = ElementTree.fromstring(result.stdout).find("testsuite")
+    assert suite.get("failures") == "1"
+    assert suite.find("testcase/failure").text == "1:1: F401 'os' imported but unused"
+
+
+def test_cli_fast_mode(tmp_path):
+    unused = write_template(tmp_path, "unused.yaml", "import os\\n")
+    broken = write_template(tmp_path, "broken.yaml", "print(1))\\n")
+    result = runner.invoke(app, ["lint", "--no-cache", "--mode", "fast", unused])
+    assert result.exit_code == 0
+
+    result = runner.invoke(app, ["lint", "--no-cache", "--mode", "fast", "--format", "sarif", broken])
+    assert result.exit_code == 1
+    [finding] = json.loads(result.stdout)["runs"][0]["results"]
+    assert finding["ruleId"] == "E999"
+    assert finding["locations"][0]["physicalLocation"]["region"] == {"startLine": 8, "startColumn": 27}
+
+
+def test_cli_lints_directories(tmp_path):
+    (tmp_path / "stacks").mkdir()
+    (tmp_path / "generated").mkdir()
+    failing = write_template(tmp_path / "stacks", "failing.yaml", "import os\\n")
+    write_template(tmp_path / "stacks", "passing.yml", "print(1)\\n")
+    write_template(tmp_path / "generated", "ignored.yaml", "import sys\\n")
+    result = runner.invoke(app, ["lint", "--no-cache", "--exclude", "generated", str(tmp_path)])
+    assert result.exit_code == 1
+    assert failing in result.output
+    assert "ignored.yaml" not in result.output
+
+
+def test_cli_backend_settings(tmp_path):
+    failing = write_template(tmp_path, "failing.yaml", "import os\\n")
+    result = runner.invoke(app, ["lint", "--no-cache", "--backend-jobs", "python=2", "--backend-timeout", "python=30", failing])
+    assert result.exit_code == 1
+    assert "F401" in result.output
+
+    result = runner.invoke(app, ["lint", "--no-cache", "--backend-jobs", "python", failing])
+    assert result.exit_code == 2
+    assert "FAMILY=NUMBER" in result.output
+
+    result = runner.invoke(app, ["lint", "--no-cache", "--subprocess", "--backend-jobs", "python=2", failing])
+    assert result.exit_code == 2
+    assert "--subprocess and --batch" in result.output
+
+
+def test_cli_reuses_cached_results(tmp_path):
+    files = [write_template(tmp_path, f"ok_{index}.yaml", f"print({index})\\n") for index in range(2)]
+    cache_dir = str(tmp_path / "cache")
+    first = runner.invoke(app, ["lint", "--cache-dir", cache_dir] + files)
+    second = runner.invoke(app, ["lint", "--cache-dir", cache_dir] + files)
+    assert first.exit_code == second.exit_code == 0
+    assert "0 hit(s), 2 miss(es)" in first.output
+    assert "2 hit(s), 0 miss(es)" in second.output
+
+
+def test_cli_reuses_parsed_templates(tmp_path):
+    files = [write_template(tmp_path, f"ok_{index}.yaml", f"print({index})\\n") for index in range(2)]
+    cache_dir = str(tmp_path / "cache")
+    first = runner.invoke(app, ["lint", "--cache-dir", cache_dir, "--template-cache", "--jobs", "1"] + files)
+    second = runner.invoke(app, ["lint", "--cache-dir", cache_dir, "--template-cache", "--jobs", "1"] + files)
+    assert first.exit_code == second.exit_code == 0
+    assert "Template cache: 0 hit(s), 2 miss(es)" in first.output
+    assert "Template cache: 2 hit(s), 0 miss(es)" in second.output
+
+    result = runner.invoke(app, ["lint", "--no-cache", "--template-cache"] + files)
+    assert result.exit_code == 2
+    assert "--no-cache" in result.output
+
+
+def test_cli_writes_timings_and_profile(tmp_path):
+    files = [write_template(tmp_path, f"ok_{index}.yaml", "print(1)\\n") for index in range(2)]
+    timings_path = tmp_path / "timings.json"
+    result = runner.invoke(app, ["lint", "--no-cache", "--timings", str(timings_path)] + files)
+    assert result.exit_code == 0
+    assert "Timings" in result.output
+    scopes = {record["scope"] for record in json.loads(timings_path.read_text())["records"]}
+    assert scopes == {"phase", "file", "resource"}
+
+    profile_path = tmp_path / "run.prof"
+    result = runner.invoke(app, ["lint", "--no-cache", "--profile", str(profile_path)] + files)
+    assert result.exit_code == 0
+    assert pstats.Stats(str(profile_path)).total_calls > 0
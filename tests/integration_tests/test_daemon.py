@@ -0,0 +1,148 @@
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from cfn_inline_lambda_linter.daemon import LintDaemon, lintWithDaemon
+from cfn_inline_lambda_linter.runner import LintOutcome
+
+TEMPLATE = """
+Resources:
+  LambdaFunction:
+    Type: "AWS::Lambda::Function"
+    Properties:
+      Runtime: "python3.12"
+      Code:
+        ZipFile: "{code}"
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    socket_path = str(tmp_path / "cill.sock")
+    lint_daemon = LintDaemon(socket_path, jobs=2, idle_timeout=2)
+    thread = threading.Thread(target=lint_daemon.serve, daemon=True)
+    thread.start()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+    yield lint_daemon
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "The daemon should shut down once idle"
+
+
+def test_daemon_lints_and_remembers_files(tmp_path, daemon):
+    valid = tmp_path / "valid.yaml"
+    valid.write_text(TEMPLATE.format(code="print(1)\\n"))
+    invalid = tmp_path / "invalid.yaml"
+    invalid.write_text(TEMPLATE.format(code="import os\\n"))
+
+    outcomes = list(lintWithDaemon([str(valid), str(invalid)], daemon.socket_path))
+    assert [outcome.fileName for outcome in outcomes] == [str(valid), str(invalid)]
+    assert [outcome.success for outcome in outcomes] == [True, False]
+    assert "F401" in outcomes[1].output
+
+    # Concurrent clients get the same answers, unchanged files come from memory
+    answers = []
+    clients = [
+        threading.Thread(target=lambda: answers.append(list(lintWithDaemon([str(valid), str(invalid)], daemon.socket_path))))
+        for _ in range(3)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    assert answers == [outcomes] * 3
+
+    invalid.write_text(TEMPLATE.format(code="print(2)\\n"))
+    assert list(lintWithDaemon([str(invalid)], daemon.socket_path))[0].success is True
+
+
+def test_lint_with_daemon_without_daemon(tmp_path):
+    with pytest.raises(OSError):
+        lintWithDaemon(["template.yaml"], str(tmp_path / "missing.sock"))
+
+
+def test_daemon_lints_with_the_config_of_the_client_directory(tmp_path, daemon, monkeypatch):
+    template = tmp_path / "template.yaml"
+    template.write_text(TEMPLATE.format(code="x = '" + "a" * 90 + "'\\n"))
+    relaxed = tmp_path / "relaxed"
+    relaxed.mkdir()
+    (relaxed / ".flake8").write_text("[flake8]\nmax-line-length = 150\n")
+    strict = tmp_path / "strict"
+    strict.mkdir()
+
+    def lint(client):
+        monkeypatch.chdir(client)
+        [outcome] = lintWithDaemon([str(template)], daemon.socket_path)
+        return outcome.success
+
+    assert lint(relaxed) is True
+    assert lint(strict) is False
+    assert lint(relaxed) is True
+    (relaxed / ".flake8").write_text("[flake8]\nmax-line-length = 80\n")
+    assert lint(relaxed) is False
+
+
+def test_files_a_failing_daemon_did_not_answer_are_reported_failed(tmp_path):
+    socket_path = str(tmp_path / "cill.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+
+    def answerOnceAndFail():
+        connection, _ = server.accept()
+        with connection, connection.makefile("rw", encoding="utf-8") as stream:
+            request = json.loads(stream.readline())
+            outcome = LintOutcome(request["files"][0], True, "", {}, None, None)
+            stream.write(json.dumps({"result": outcome._asdict()}) + "\n")
+            stream.write(json.dumps({"error": "worker crashed"}) + "\n")
+
+    thread = threading.Thread(target=answerOnceAndFail, daemon=True)
+    thread.start()
+    try:
+        outcomes = list(lintWithDaemon(["first.yaml", "second.yaml", "third.yaml"], socket_path))
+    finally:
+        thread.join(timeout=10)
+        server.close()
+    assert [(outcome.fileName, outcome.success) for outcome in outcomes] == [
+        ("first.yaml", True), ("second.yaml", False), ("third.yaml", False),
+    ]
+    assert outcomes[1].results["problems"] == ["❌ The cill daemon failed: worker crashed"]
+
+
+def test_daemon_forgets_old_and_deleted_files(tmp_path):
+    lint_daemon = LintDaemon(str(tmp_path / "cill.sock"), jobs=1, max_results=2)
+    try:
+        files = [tmp_path / f"{name}.yaml" for name in "abc"]
+        for file_path in files:
+            file_path.write_text("Resources: {}\n")
+        outcomes = list(lint_daemon.lint([str(file_path) for file_path in files], {}))
+        assert [outcome.stats for outcome in outcomes] == [{"prefiltered": 1}] * 3
+        assert [key[0] for key in lint_daemon.results] == [str(files[1]), str(files[2])]
+
+        # Answers from memory do not count the work of the run that linted the file
+        [outcome] = lint_daemon.lint([str(files[1])], {})
+        assert outcome.success and outcome.stats == {}
+
+        files[2].unlink()
+        list(lint_daemon.lint([str(files[2])], {}))
+        assert [key[0] for key in lint_daemon.results] == [str(files[1])]
+    finally:
+        lint_daemon.executor.shutdown()
+
+
+def test_daemon_answers_malformed_requests(daemon):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(daemon.socket_path)
+        client.sendall(b"not json\n")
+        with client.makefile("r", encoding="utf-8") as reader:
+            assert "error" in reader.readline()
+
+
+def test_daemon_does_not_take_over_a_running_one(daemon):
+    with pytest.raises(RuntimeError, match="already listening"):
+        LintDaemon(daemon.socket_path, jobs=1).serve()
+    assert list(lintWithDaemon([], daemon.socket_path)) == []
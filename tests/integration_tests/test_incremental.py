@@ -0,0 +1,85 @@
+import subprocess
+
+import pytest
+
+from cfn_inline_lambda_linter.incremental import gitShow, unchangedLambdas
+from cfn_inline_lambda_linter.runner import lintFile
+
+TEMPLATE = """
+Resources:
+  Unchanged:
+    Type: "AWS::Lambda::Function"
+    Properties:
+      Runtime: "python3.12"
+      Code:
+        ZipFile: "import os\\n"
+  Changed:
+    Type: "AWS::Lambda::Function"
+    Properties:
+      Runtime: "python3.12"
+      Code:
+        ZipFile: "{changed}"
+"""
+
+
+def git(repository, *args):
+    subprocess.run(["git", "-C", str(repository)] + list(args), check=True, capture_output=True)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "test@example.com")
+    git(tmp_path, "config", "user.name", "test")
+    (tmp_path / "template.yaml").write_text(TEMPLATE.format(changed="print(1)\\n"))
+    git(tmp_path, "add", "template.yaml")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    return tmp_path
+
+
+def test_git_show_missing_file(repository):
+    assert gitShow(str(repository / "other.yaml"), "HEAD") is None
+    with pytest.raises(RuntimeError):
+        gitShow(str(repository / "template.yaml"), "no-such-revision")
+
+
+def test_since_only_lints_changed_functions(repository):
+    file_path = repository / "template.yaml"
+    file_path.write_text(TEMPLATE.format(changed="print(2)\\n"))
+
+    outcome = lintFile(str(file_path), since="HEAD")
+    assert outcome.success is True
+    assert "Resource Unchanged was skipped because its inline code did not change" in outcome.output
+
+    # Without --since the unchanged function still fails on its unused import
+    assert lintFile(str(file_path)).success is False
+
+
+def test_staged_lints_the_index(repository):
+    file_path = repository / "template.yaml"
+    file_path.write_text(TEMPLATE.format(changed="import sys\\n"))
+    git(repository, "add", "template.yaml")
+    file_path.write_text(TEMPLATE.format(changed="print(3)\\n"))
+
+    outcome = lintFile(str(file_path), staged=True)
+    assert outcome.success is False
+    assert "F401 'sys' imported but unused" in outcome.output
+    assert "'os' imported" not in outcome.output
+
+
+def test_unchanged_lambdas_of_new_template():
+    assert unchangedLambdas({"Resources": {"Function": {"Type": "AWS::Lambda::Function"}}}, None) == set()
+
+
+def test_handler_and_custom_resources_change_functions():
+    function = {"Type": "AWS::Lambda::Function", "Properties": {
+        "Runtime": "python3.12", "Handler": "index.handler", "Code": {"ZipFile": "def handler(event, context):\n    pass\n"},
+    }}
+    base = {"Resources": {"Function": function}}
+    renamed = {"Resources": {"Function": dict(function, Properties=dict(function["Properties"], Handler="index.main"))}}
+    provider = {"Resources": {"Function": function, "Custom": {
+        "Type": "Custom::Thing", "Properties": {"ServiceToken": {"Fn::GetAtt": ["Function", "Arn"]}},
+    }}}
+    assert unchangedLambdas(base, base) == {"Function"}
+    assert unchangedLambdas(renamed, base) == set()
+    assert unchangedLambdas(provider, base) == set()
@@ -116,3 +116,20 @@ def test_linter_lambda_with_sub_function_ignores_f821(tmp_path, monkeypatch):
     """)
     monkeypatch.setattr("sys.exit", lambda x: x)  # Prevent pytest from exiting
     linter(str(file_path))
+
+def test_linter_takes_args_positionally(tmp_path, monkeypatch):
+    file_path = tmp_path / "long_line.yaml"
+    file_path.write_text("""
+    Resources:
+      LambdaFunction:
+        Type: "AWS::Lambda::Function"
+        Properties:
+          Runtime: "python3.12"
+          Code:
+            ZipFile: "x = '""" + "a" * 90 + """'\\n"
+    """)
+    exits = []
+    monkeypatch.setattr("sys.exit", exits.append)
+    linter(str(file_path), "--max-line-length=120")
+    linter(str(file_path))
+    assert exits == [0, 1]
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+# Cumulative `python -X importtime` microseconds the fast entry point may spend importing
+CLI_IMPORT_BUDGET_US = 20_000
+
+# Modules a run that finds no inline code must never import
+HEAVY_MODULES = {"flake8", "pyflakes", "pycodestyle", "sqlite3", "importlib.metadata",
+                 "concurrent.futures", "multiprocessing", "socketserver", "cProfile"}
+
+
+def run_cill(entry, *arguments):
+    code = f"import sys; sys.argv = ['cill'] + sys.argv[1:]; from {entry}; main()"
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code] + list(arguments),
+        capture_output=True, text=True,
+    )
+
+
+def imported_modules(stderr):
+    modules = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def write_manifest(tmp_path):
+    file_path = tmp_path / "deployment.yaml"
+    file_path.write_text("apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: web\n")
+    return str(file_path)
+
+
+def test_non_template_skips_typer_and_yaml(tmp_path):
+    manifest = write_manifest(tmp_path)
+    fast = run_cill("cfn_inline_lambda_linter.cli import main", "lint", manifest)
+    full = run_cill("cfn_inline_lambda_linter.main import app as main", "lint", manifest)
+
+    assert fast.returncode == full.returncode == 0
+    assert fast.stdout == full.stdout
+    modules = imported_modules(fast.stderr)
+    assert not {"typer", "yaml", "colorama"} & modules.keys()
+    assert modules["cfn_inline_lambda_linter.cli"] < CLI_IMPORT_BUDGET_US
+
+
+def test_full_run_without_inline_code_avoids_heavy_imports(tmp_path):
+    template = tmp_path / "template.yaml"
+    # A Lambda function deployed from S3 passes the prefilter and is parsed
+    template.write_text("Resources:\n  Function:\n    Type: AWS::Lambda::Function\n    Properties:\n      Code:\n        S3Bucket: code\n")
+    result = run_cill("cfn_inline_lambda_linter.main import app as main", "lint", str(template))
+
+    assert result.returncode == 0
+    assert not HEAVY_MODULES & imported_modules(result.stderr).keys()
@@ -1,6 +1,6 @@
 from unittest.mock import patch
 
-@patch("cfn_inline_lambda_linter.linter.subprocess.Popen")
+@patch("cfn_inline_lambda_linter.engine.subprocess.Popen")
 def test_flake8_linting(mock_popen):
     mock_process = mock_popen.return_value
     mock_process.communicate.return_value = (b"", b"")
@@ -17,5 +17,6 @@ def test_flake8_linting(mock_popen):
     }
     dict_to_check = {"LambdaFunction": {"status": "CodeNotFormatted"}}
     from cfn_inline_lambda_linter.linter import extractLambdaCode
-    result = extractLambdaCode(resources, {}, dict_to_check, args=None)
+    result = extractLambdaCode(resources, {}, dict_to_check, args=None, use_subprocess=True)
+    mock_popen.assert_called_once()
     assert result["LambdaFunction"]["status"] == "FoundNoErrors"
@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import cfn_inline_lambda_linter
+from cfn_inline_lambda_linter import lint_many, lint_template
+from cfn_inline_lambda_linter.cache import getResultTable
+
+TEMPLATE = {
+    "Resources": {
+        "Function": {
+            "Type": "AWS::Lambda::Function",
+            "Properties": {"Runtime": "python3.12", "Code": {"ZipFile": "import os\n"}},
+        },
+    },
+}
+
+
+def write_template(tmp_path, name, code):
+    file_path = tmp_path / name
+    file_path.write_text(f"""
+Resources:
+  Function:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Code:
+        ZipFile: "{code}"
+""")
+    return str(file_path)
+
+
+def test_lint_template_neither_prints_nor_exits(tmp_path, capsys):
+    outcome = lint_template(write_template(tmp_path, "template.yaml", "import os\\n"))
+    assert outcome.success is False
+    assert outcome.output == ""
+    assert "F401" in outcome.results["resources"]["Function"]["errors"]
+
+    missing = lint_template(tmp_path / "missing.yaml")
+    assert missing.success is False
+    assert missing.results["problems"]
+    assert capsys.readouterr() == ("", "")
+
+
+def test_lint_template_accepts_parsed_templates():
+    outcome = lint_template(TEMPLATE, progress=True)
+    assert outcome.fileName == "<template>"
+    assert outcome.results["resources"]["Function"]["status"] == "FoundErrors"
+    assert "Processing file: <template>" in outcome.output
+    assert lint_template({"Resources": {}}, file_name="empty.yaml").success is True
+
+
+def test_lint_many_with_an_executor(tmp_path, capsys):
+    files = [write_template(tmp_path, f"template_{index}.yaml", "import os\\n" if index % 2 else f"print({index})\\n") for index in range(8)]
+    cache_dir = str(tmp_path / "cache")
+    with ThreadPoolExecutor(4) as executor:
+        outcomes = list(lint_many(files + [TEMPLATE], executor=executor, cache_dir=cache_dir))
+        # The executor belongs to the caller and keeps running, without results of the call left in its threads
+        assert executor.submit(len, "cill").result() == 4
+        assert set(executor.map(lambda _: getResultTable(), range(8))) == {None}
+    assert [outcome.fileName for outcome in outcomes] == files + ["<template 9>"]
+    assert [outcome.success for outcome in outcomes] == [index % 2 == 0 for index in range(8)] + [False]
+    assert all(outcome.output == "" for outcome in outcomes)
+    assert capsys.readouterr() == ("", "")
+
+
+def test_package_exports_the_api():
+    assert cfn_inline_lambda_linter.lint_template is lint_template
+    assert set(cfn_inline_lambda_linter.__all__) == {"LintOutcome", "lint_many", "lint_template"}
@@ -0,0 +1,52 @@
+import io
+
+import yaml
+
+from cfn_inline_lambda_linter.loader import CfnLoader, loadTemplate
+
+
+def test_short_form_intrinsics_become_long_form():
+    template = yaml.load("""
+Runtime: !Ref LambdaRuntime
+Code: !Sub |
+  bucket = "${BucketName}"
+Arn: !GetAtt Function.Arn
+Name: !Join ["-", [!Ref AWS::StackName, function]]
+Value: !If [IsProd, !FindInMap [Runtimes, !Ref AWS::Region, Python], python3.12]
+Timeout: 30
+""", Loader=CfnLoader)
+    assert template == {
+        "Runtime": {"Ref": "LambdaRuntime"},
+        "Code": {"Fn::Sub": 'bucket = "${BucketName}"\n'},
+        "Arn": {"Fn::GetAtt": ["Function", "Arn"]},
+        "Name": {"Fn::Join": ["-", [{"Ref": "AWS::StackName"}, "function"]]},
+        "Value": {"Fn::If": ["IsProd", {"Fn::FindInMap": ["Runtimes", {"Ref": "AWS::Region"}, "Python"]}, "python3.12"]},
+        "Timeout": "30",
+    }
+
+
+def test_unknown_tag_is_an_error():
+    try:
+        yaml.load("Value: !NotAnIntrinsic x", Loader=CfnLoader)
+    except yaml.YAMLError as e:
+        assert "!NotAnIntrinsic" in str(e)
+    else:
+        raise AssertionError("Expected a YAMLError for an unknown tag")
+
+
+def test_block_positions_come_from_the_parsed_text(tmp_path):
+    template = """Resources:
+  Function:
+    Type: AWS::Lambda::Function
+    Properties:
+      Code:
+        ZipFile: |
+{indent}import os
+"""
+    # The working tree differs from the text parsed, like a staged template
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text(template.format(indent=" " * 8))
+    for streaming in (False, True):
+        parsed = loadTemplate(str(file_path), io.StringIO(template.format(indent=" " * 12)), streaming)
+        code = parsed["Resources"]["Function"]["Properties"]["Code"]["ZipFile"]
+        assert code.templatePosition(1, 1) == (7, 13)
@@ -0,0 +1,56 @@
+from cfn_inline_lambda_linter.discovery import IgnoreRules, discoverTemplates
+from cfn_inline_lambda_linter.runner import lintFiles
+
+TEMPLATE = "Resources:\n  Bucket:\n    Type: AWS::S3::Bucket\n"
+
+
+def make_tree(root, paths):
+    for path in paths:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(TEMPLATE)
+
+
+def test_walk_respects_gitignore_and_exclude(tmp_path):
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("# build output\ncdk.out/\n*.generated.yaml\n!keep.generated.yaml\n/root-only.yml\n")
+    make_tree(tmp_path, [
+        "a.yaml", "b.json", "c.template", "notes.txt", "root-only.yml", "x.generated.yaml", "keep.generated.yaml",
+        "cdk.out/Stack.template.json", "stacks/d.yml", "stacks/root-only.yml", "stacks/local.yaml",
+        "stacks/deep/e.yaml", "vendor/f.yaml", ".git/config.yaml",
+    ])
+    (tmp_path / "stacks" / ".gitignore").write_text("local.yaml\n")
+
+    found = list(discoverTemplates([str(tmp_path)], exclude=["vendor,*.json"]))
+    assert found == [str(tmp_path / path) for path in [
+        "a.yaml", "c.template", "keep.generated.yaml", "stacks/d.yml", "stacks/root-only.yml", "stacks/deep/e.yaml",
+    ]]
+    # Rules of the directories above apply when walking a sub directory, files are passed as they are
+    assert list(discoverTemplates([str(tmp_path / "stacks"), str(tmp_path / "x.generated.yaml")])) == [
+        str(tmp_path / "stacks" / "d.yml"), str(tmp_path / "stacks" / "root-only.yml"),
+        str(tmp_path / "stacks" / "deep" / "e.yaml"), str(tmp_path / "x.generated.yaml"),
+    ]
+
+
+def test_ignore_rules_match_like_git(tmp_path):
+    (tmp_path / ".gitignore").write_text("**/build\nlogs/**/*.yaml\n[ab].yml\n")
+    rules = IgnoreRules().extend(str(tmp_path))
+    assert rules.ignored(str(tmp_path / "x" / "build"), True)
+    assert rules.ignored(str(tmp_path / "logs" / "a" / "b.yaml"))
+    assert rules.ignored(str(tmp_path / "x" / "a.yml"))
+    assert not rules.ignored(str(tmp_path / "c.yml"))
+    assert not rules.ignored(str(tmp_path.parent / "a.yml"))
+
+
+def test_linting_starts_before_discovery_is_done(tmp_path):
+    make_tree(tmp_path, [f"template{index}.yaml" for index in range(5)])
+    pulled = []
+
+    def discover():
+        for index in range(5):
+            pulled.append(index)
+            yield str(tmp_path / f"template{index}.yaml")
+
+    outcomes = lintFiles(discover(), jobs=1)
+    assert next(outcomes).fileName == str(tmp_path / "template0.yaml")
+    assert len(pulled) < 5
+    assert [outcome.fileName for outcome in outcomes] == [str(tmp_path / f"template{index}.yaml") for index in range(1, 5)]
@@ -0,0 +1,83 @@
+import subprocess
+import sys
+
+from cfn_inline_lambda_linter.fastcheck import INLINE_CODE_LIMIT, checkPython
+from cfn_inline_lambda_linter.runner import lintFile
+
+TEMPLATE = """Resources:
+  Broken:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Handler: index.handler
+      Code:
+        ZipFile: |
+          def handler(event, context):
+              return )
+  Provider:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Handler: index.handler
+      Code:
+        ZipFile: |
+          import os
+
+
+          def handler(event, context):
+              return os.environ
+  Setup:
+    Type: Custom::Setup
+    Properties:
+      ServiceToken: !GetAtt Provider.Arn
+  Renamed:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Handler: index.main
+      Code:
+        ZipFile: "import os\\n"
+"""
+
+
+def codes(findings):
+    return [code for _, _, code, _ in findings]
+
+
+def test_syntax_errors_found_when_compiling():
+    assert checkPython("def handler(:\n    pass\n")[0][:3] == (1, 13, "E999")
+    assert codes(checkPython("return 1\n")) == ["E999"]
+
+
+def test_lambda_checks():
+    handler = "import cfnresponse\n\n\ndef handler(event, context):\n    cfnresponse.send(event, context, cfnresponse.SUCCESS, {})\n"
+    assert checkPython(handler, "index.handler", custom_resource=True) == []
+    assert codes(checkPython(handler, "app.handler")) == ["CILL002"]
+    assert codes(checkPython(handler, "index.main")) == ["CILL002"]
+    assert codes(checkPython("x = 1\n" * INLINE_CODE_LIMIT)) == ["CILL001"]
+
+    silent = "def handler(event, context):\n    return None\n"
+    assert checkPython(silent, "index.handler", custom_resource=True) == [
+        (1, 1, "CILL003", "custom resource handler never calls cfnresponse.send, the stack waits for its response until it times out")
+    ]
+    manual = "def handler(event, context):\n    return event['ResponseURL']\n"
+    assert checkPython(manual, "index.handler", custom_resource=True) == []
+
+
+def test_fast_mode_reports_template_positions(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text(TEMPLATE)
+    for streaming in (False, True):
+        resources = lintFile(str(file_path), streaming=streaming, mode="fast").results["resources"]
+        assert resources["Broken"]["errors"] == f"{file_path}:10:22: E999 SyntaxError: unmatched ')'\n"
+        assert resources["Provider"]["errors"] == f"{file_path}:21:11: CILL003 custom resource handler never calls " \
+            "cfnresponse.send, the stack waits for its response until it times out\n"
+        assert resources["Renamed"]["errors"].startswith(f"{file_path}:33:19: CILL002 handler 'main'")
+
+
+def test_fast_mode_does_not_import_flake8(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text(TEMPLATE)
+    code = f"import sys; from cfn_inline_lambda_linter.runner import lintFile; lintFile({str(file_path)!r}, mode='fast'); print('flake8' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.stdout.strip() == "False"
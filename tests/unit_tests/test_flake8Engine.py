@@ -0,0 +1,69 @@
+import pytest
+
+from cfn_inline_lambda_linter.engine import BatchEngine, Flake8Engine, LintEngine, SubprocessEngine, buildFlake8Args, getEngine, splitBatchReport
+
+SOURCES = [
+    "print('Hello, Lambda!')\n",
+    "import os\nx=1\n",
+    "print('hello')\nif True\n    print('missing colon')",
+    "bucket = ${BucketName}\n",
+]
+
+
+def test_build_flake8_args_default():
+    assert buildFlake8Args(None) == ["--ignore=F821"]
+
+
+def test_build_flake8_args_extends_ignore():
+    assert buildFlake8Args("--max-line-length=88 --ignore=E203,W503") == ["--max-line-length=88", "--ignore=E203,W503,F821"]
+    assert buildFlake8Args("--ignore E203 --max-line-length=88") == ["--ignore", "E203,F821", "--max-line-length=88"]
+
+
+def test_build_flake8_args_without_ignore():
+    assert buildFlake8Args("--max-line-length=120") == ["--ignore=F821", "--max-line-length=120"]
+    assert buildFlake8Args("--ignore=F821,E501") == ["--ignore=F821,E501"]
+
+
+def test_in_process_engine_matches_subprocess():
+    for args in [None, "--max-line-length=10", "--select=E --show-source"]:
+        engine = Flake8Engine(args)
+        fallback = SubprocessEngine(args)
+        for source in SOURCES:
+            assert engine.lint(source) == fallback.lint(source)
+
+
+def test_get_engine_is_built_once():
+    assert getEngine("--max-line-length=100") is getEngine("--max-line-length=100")
+    assert isinstance(getEngine(None, use_subprocess=True), SubprocessEngine)
+
+
+def test_batch_engine_splits_report_per_source():
+    sources = {f"Function{index}": source for index, source in enumerate(SOURCES)}
+    engine = Flake8Engine("--show-source")
+    reports = BatchEngine("--show-source").lintMany(sources)
+    assert reports == {name: engine.lint(source) for name, source in sources.items()}
+
+
+def test_split_batch_report():
+    report = "/tmp/a/0_One.py:1:1: F401 'os' imported but unused\n/tmp/a/1_Two.py:2:1: E999 SyntaxError\n"
+    reports = splitBatchReport(report, {"/tmp/a/0_One.py": "One", "/tmp/a/1_Two.py": "Two", "/tmp/a/2_Three.py": "Three"})
+    assert reports == {
+        "One": "stdin:1:1: F401 'os' imported but unused\n",
+        "Two": "stdin:2:1: E999 SyntaxError\n",
+        "Three": "",
+    }
+
+
+def test_subprocess_engines_stop_flake8_after_the_timeout():
+    for engine in (SubprocessEngine(timeout=0.001), BatchEngine(timeout=0.001)):
+        with pytest.raises(RuntimeError, match="did not finish within"):
+            engine.lint(SOURCES[0])
+    assert getEngine(use_subprocess=True, timeout=30).timeout == 30
+
+
+def test_engines_must_implement_lint():
+    class HalfEngine(LintEngine):
+        pass
+
+    with pytest.raises(TypeError):
+        HalfEngine()
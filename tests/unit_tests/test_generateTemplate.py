@@ -0,0 +1,40 @@
+import io
+
+import yaml
+
+from benchmarks.generate import generateTemplate, renderTemplate
+from benchmarks.run import compareWithBaseline, environment, environmentDifferences
+from cfn_inline_lambda_linter.linter import findLambdaResources
+from cfn_inline_lambda_linter.loader import CfnLoader, loadJsonTemplate
+
+
+def test_generate_template_shape():
+    template = generateTemplate(resources=40, lambdas=10, zipfile_lines=12, parameter_runtime_share=1.0, non_python_share=0.0)
+    resources = template["Resources"]
+    assert len(resources) == 50
+    assert len(findLambdaResources(resources)) == 10
+    for resource in resources.values():
+        if resource["Type"] == "AWS::Lambda::Function":
+            assert resource["Properties"]["Runtime"] == {"Ref": "PythonRuntime"}
+            assert len(resource["Properties"]["Code"]["ZipFile"].splitlines()) >= 12
+    assert generateTemplate(resources=40, lambdas=10, seed=3) == generateTemplate(resources=40, lambdas=10, seed=3)
+
+
+def test_rendered_yaml_and_json_parse_the_same():
+    template = generateTemplate(resources=30, lambdas=10)
+    from_yaml = yaml.load(renderTemplate(template, "yaml"), Loader=CfnLoader)
+    from_json = loadJsonTemplate(io.StringIO(renderTemplate(template, "json")))
+    assert from_yaml == from_json
+
+
+def test_compare_with_baseline():
+    baseline = {"small": {"parse": 0.100, "scan": 0.001}}
+    assert compareWithBaseline({"small": {"parse": 0.120, "scan": 0.004}}, baseline, 0.25) == []
+    regressions = compareWithBaseline({"small": {"parse": 0.200, "scan": 0.001, "lint": 9.0}}, baseline, 0.25)
+    assert regressions == ["small/parse: 200.0 ms, baseline 100.0 ms (+100%)"]
+
+
+def test_baselines_of_other_environments_are_not_compared():
+    assert environmentDifferences(dict(environment(), results={})) == []
+    differences = environmentDifferences(dict(environment(), python="2.7.18", results={}))
+    assert differences == [f"python 2.7.18 instead of {environment()['python']}"]
@@ -0,0 +1,100 @@
+import pytest
+
+from cfn_inline_lambda_linter.incremental import unchangedLambdas
+from cfn_inline_lambda_linter.intrinsics import IntrinsicResolver, Unresolvable
+from cfn_inline_lambda_linter.runner import lintFile
+
+PARAMETERS = {
+    "Env": {"Type": "String", "Default": "prod"},
+    "Subnets": {"Type": "CommaDelimitedList", "Default": "a,b"},
+    "Secret": {"Type": "String"},
+}
+MAPPINGS = {"Runtimes": {"prod": {"Python": "python3.12"}, "dev": {"Python": "python3.13"}}}
+CONDITIONS = {"IsProd": {"Fn::Equals": [{"Ref": "Env"}, "prod"]}, "IsDev": {"Fn::Not": [{"Condition": "IsProd"}]}}
+
+TEMPLATE = """
+Parameters:
+  Env:
+    Type: String
+    Default: prod
+Mappings:
+  Runtimes:
+    prod:
+      Python: python3.12
+Resources:
+  Mapped:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: !FindInMap [Runtimes, !Ref Env, Python]
+      Code:
+        ZipFile: !Sub |
+          import os
+          BUCKET = "${Env}-${AWS::Region}"
+  Unknown:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: !GetAtt Other.Runtime
+      Code:
+        ZipFile: |
+          print(1)
+"""
+
+
+def resolver():
+    return IntrinsicResolver(PARAMETERS, MAPPINGS, CONDITIONS)
+
+
+def test_resolves_parameters_mappings_and_conditions():
+    intrinsics = resolver()
+    assert intrinsics.resolve({"Fn::FindInMap": ["Runtimes", {"Ref": "Env"}, "Python"]}) == "python3.12"
+    assert intrinsics.resolve({"Fn::If": ["IsDev", "python3.13", "python3.12"]}) == "python3.12"
+    assert intrinsics.resolve({"Fn::Join": ["", ["python", "3.", "12"]]}) == "python3.12"
+    assert intrinsics.resolve({"Fn::Select": [1, {"Ref": "Subnets"}]}) == "b"
+    assert intrinsics.resolve({"Fn::Split": [",", "x,y"]}) == ["x", "y"]
+    assert intrinsics.resolve({"Fn::Sub": ["${Env}-${Name}-${!Literal}", {"Name": "app"}]}) == "prod-app-${Literal}"
+
+
+def test_unknown_values_raise_or_become_placeholders():
+    intrinsics = resolver()
+    for value in ({"Ref": "Secret"}, {"Ref": "AWS::Region"}, {"Fn::GetAtt": ["Other", "Arn"]}, {"Fn::Sub": "${Other.Arn}"}):
+        with pytest.raises(Unresolvable):
+            intrinsics.resolve(value)
+    assert intrinsics.resolve({"Fn::Sub": "${AWS::Region}/${Other.Arn}"}, placeholders=True) == "${AWS::Region}/${Other.Arn}"
+    with pytest.raises(Unresolvable, match="refers to itself"):
+        IntrinsicResolver(conditions={"Loop": {"Condition": "Loop"}}).condition("Loop")
+    # A condition that cannot be evaluated keeps telling why
+    intrinsics = resolver()
+    intrinsics.conditions = {"HasSecret": {"Fn::Equals": [{"Ref": "Secret"}, "x"]}}
+    for _ in range(2):
+        with pytest.raises(Unresolvable, match="Secret"):
+            intrinsics.condition("HasSecret")
+
+
+def test_expressions_are_resolved_once():
+    intrinsics = resolver()
+    lookup = {"Fn::FindInMap": ["Runtimes", {"Ref": "Env"}, "Python"]}
+    intrinsics.resolve(lookup)
+    intrinsics.mappings = {}
+    assert intrinsics.resolve({"Fn::FindInMap": ["Runtimes", {"Ref": "Env"}, "Python"]}) == "python3.12"
+
+
+def test_template_intrinsics_are_resolved(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text(TEMPLATE)
+    for streaming in (False, True):
+        resources = lintFile(str(file_path), streaming=streaming).results["resources"]
+        assert resources["Mapped"]["status"] == "FoundErrors"
+        assert "F401" in resources["Mapped"]["errors"]
+        assert resources["Unknown"]["status"] == "SkippedUnresolved"
+
+
+def test_changing_a_mapping_changes_functions():
+    template = {
+        "Mappings": MAPPINGS,
+        "Resources": {"Function": {"Type": "AWS::Lambda::Function", "Properties": {
+            "Runtime": {"Fn::FindInMap": ["Runtimes", "prod", "Python"]}, "Code": {"ZipFile": "print(1)"},
+        }}},
+    }
+    upgraded = dict(template, Mappings={"Runtimes": {"prod": {"Python": "python3.13"}}})
+    assert unchangedLambdas(template, template) == {"Function"}
+    assert unchangedLambdas(upgraded, template) == set()
@@ -0,0 +1,90 @@
+import shutil
+import sys
+
+import pytest
+
+from cfn_inline_lambda_linter.backends import (
+    BACKENDS, LintBackend, PythonBackend, WorkerPool, getBackend, registerBackend, runtimeFamily
+)
+from cfn_inline_lambda_linter.linter import extractLambdaCode
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+# Answers the first request and never the second
+SLOW_WORKER = "import sys, time; sys.stdin.readline(); print('{\"report\": \"\"}', flush=True); time.sleep(60)"
+
+
+def test_runtime_family():
+    assert runtimeFamily("python3.12") == "python"
+    assert runtimeFamily("nodejs20.x") == "nodejs"
+    assert runtimeFamily({"Ref": "Runtime"}) is None
+
+
+def test_backends_are_registered_per_family():
+    @registerBackend
+    class EchoBackend(LintBackend):
+        family = "echo"
+        cache_args = []
+
+        def lintMany(self, sources, context=None):
+            return {name: "stdin:1:1: X100 echo\n" for name in sources}
+
+    try:
+        assert getBackend("echo") is getBackend("echo")
+        resources = {"Function": {"Properties": {"Runtime": "echo1", "Code": {"ZipFile": "hello"}}}}
+        result = extractLambdaCode(resources, {}, {"Function": {}})
+        assert result["Function"] == {"status": "FoundErrors", "errors": "stdin:1:1: X100 echo\n"}
+    finally:
+        del BACKENDS[("echo", "full")]
+    assert getBackend("ruby") is None
+
+
+def test_backends_must_implement_lint_many_and_cache_args():
+    class UncachedBackend(LintBackend):
+        def lintMany(self, sources, context=None):
+            return {}
+
+    with pytest.raises(TypeError):
+        UncachedBackend()
+    assert getBackend("python", mode="fast").cache_args is None
+
+
+def test_python_worker_pool_matches_in_process_engine():
+    sources = {f"Function{index}": f"import os\nprint({index})\n" for index in range(5)}
+    pooled = getBackend("python", "--max-line-length=100", backend_settings={"python": {"jobs": 2, "timeout": 30}})
+    assert isinstance(pooled, PythonBackend) and pooled.pool is not None
+    assert pooled.lintMany(sources) == getBackend("python", "--max-line-length=100").lintMany(sources)
+
+
+def test_worker_pool_replaces_workers_that_time_out():
+    pool = WorkerPool([sys.executable, "-c", SLOW_WORKER], "slow", timeout=0.5)
+    try:
+        assert pool.lint("print(1)") == ""
+        with pytest.raises(RuntimeError, match="did not answer within 0.5 seconds"):
+            pool.lint("print(2)")
+        assert pool.lint("print(3)") == ""
+    finally:
+        pool.close()
+
+
+def test_worker_pool_reports_workers_that_exit():
+    pool = WorkerPool([sys.executable, "-c", "import sys; sys.stdin.readline(); sys.exit(3)"], "crashing")
+    try:
+        with pytest.raises(RuntimeError, match="exited with return code 3"):
+            pool.lint("print(1)")
+    finally:
+        pool.close()
+
+
+@requires_node
+def test_node_backend_reports_syntax_errors():
+    resources = {
+        "Valid": {"Properties": {"Runtime": "nodejs20.x", "Code": {"ZipFile": "exports.handler = async () => 1;\n"}}},
+        "Broken": {"Properties": {"Runtime": "nodejs20.x", "Code": {"ZipFile": "const a = 1;\nreturn a +;\n"}}},
+    }
+    result = extractLambdaCode(resources, {}, {"Valid": {}, "Broken": {}})
+    assert result["Valid"]["status"] == "FoundNoErrors"
+    assert result["Broken"] == {
+        "status": "FoundErrors",
+        "errors": "stdin:2:11: E999 SyntaxError: Unexpected token ';'\n",
+    }
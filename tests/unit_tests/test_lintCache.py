@@ -0,0 +1,78 @@
+import pytest
+
+from cfn_inline_lambda_linter.cache import LintCache, ResultTable, flake8Config
+
+
+def test_lint_cache_round_trip(tmp_path):
+    cache = LintCache(str(tmp_path))
+    key = LintCache.key("print(1)\n", "python3.12", ["--ignore=F821"])
+    assert cache.getMany([key]) == {}
+    cache.putMany({key: {"status": "FoundNoErrors", "errors": ""}})
+    assert LintCache(str(tmp_path)).getMany([key]) == {key: {"status": "FoundNoErrors", "errors": ""}}
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_lint_cache_key_depends_on_runtime_and_args():
+    keys = {
+        LintCache.key("print(1)\n", "python3.12", ["--ignore=F821"]),
+        LintCache.key("print(1)\n", "python3.9", ["--ignore=F821"]),
+        LintCache.key("print(1)\n", "python3.12", ["--ignore=F821", "--max-line-length=88"]),
+        LintCache.key("print(2)\n", "python3.12", ["--ignore=F821"]),
+    }
+    assert len(keys) == 4
+
+
+def test_flake8_config_is_found_like_flake8_does(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    project = home / "project"
+    (project / "templates").mkdir(parents=True)
+    monkeypatch.setenv("HOME", str(home))
+    # flake8 stops before the home directory
+    (home / ".flake8").write_text("[flake8]\nmax-line-length = 150\n")
+    assert flake8Config.__wrapped__(str(project / "templates")) == ""
+    (project / "tox.ini").write_text("[flake8]\nmax-line-length = 120\n")
+    assert "120" in flake8Config.__wrapped__(str(project / "templates"))
+
+    # Files named in the args are part of the configuration, whatever is discovered
+    (project / "lint.cfg").write_text("[flake8]\nmax-line-length = 100\n")
+    (project / "extra.cfg").write_text("[flake8]\nselect = E\n")
+    config = flake8Config.__wrapped__(str(project), ("--config", "lint.cfg", "--append-config=extra.cfg"))
+    assert "100" in config and "select = E" in config and "120" not in config
+    assert flake8Config.__wrapped__(str(project), ("--isolated",)) == ""
+
+
+def test_lint_cache_evicts_least_recently_used(tmp_path):
+    cache = LintCache(str(tmp_path), max_bytes=300)
+    errors = "x" * 50
+    for key in ["a", "b", "c", "d"]:
+        cache.putMany({key: {"status": "FoundErrors", "errors": errors}})
+        cache.getMany(["a"])
+    cache.putMany({"e": {"status": "FoundErrors", "errors": errors * 3}})
+    assert set(cache.getMany(["a", "b", "c", "d", "e"])) == {"a", "d", "e"}
+
+
+def test_lint_cache_keeps_a_running_total_of_its_size(tmp_path):
+    cache = LintCache(str(tmp_path), max_bytes=300)
+    for errors in ["x" * 50, "x" * 20, "x" * 80]:
+        cache.putMany({"a": {"status": "FoundErrors", "errors": errors}, "b": {"status": "FoundErrors", "errors": errors}})
+    [(total, stored)] = cache.connection.execute("SELECT total, (SELECT SUM(size) FROM results) FROM usage")
+    assert total == stored == 2 * len("a" + "x" * 80 + "\n")
+
+    # Caches written before the total was kept count their entries once
+    cache.connection.execute("DROP TABLE usage")
+    assert LintCache(str(tmp_path)).connection.execute("SELECT total FROM usage").fetchone() == (total,)
+
+
+def test_result_table_keeps_the_latest_results():
+    table = ResultTable(max_entries=2)
+    keys = [ResultTable.key(f"print({index})\n", "python3.12", ["--ignore=F821"]) for index in range(3)]
+    assert ResultTable.key("print(0)\n", "python3.13", ["--ignore=F821"]) != keys[0]
+    assert ResultTable.key("print(0)\n", "python3.12", []) != keys[0]
+    for key in keys:
+        table.put(key, {"status": "FoundNoErrors", "errors": ""})
+    assert keys[0] not in table
+    record = table.get(keys[2])
+    # Records are shared by every copy of a function, unlike the dicts they replace they have no item assignment
+    with pytest.raises(TypeError):
+        record["status"] = "FoundErrors"
+    assert table.get(keys[2]) == {"status": "FoundNoErrors", "errors": ""}
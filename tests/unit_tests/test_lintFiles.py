@@ -0,0 +1,88 @@
+from cfn_inline_lambda_linter.runner import lintFile, lintFiles
+
+VALID_TEMPLATE = """
+Resources:
+  LambdaFunction:
+    Type: "AWS::Lambda::Function"
+    Properties:
+      Runtime: "python3.12"
+      Code:
+        ZipFile: "print('Hello, Lambda!')\\n"
+"""
+
+INVALID_TEMPLATE = """
+Resources:
+  LambdaFunction:
+    Type: "AWS::Lambda::Function"
+    Properties:
+      Runtime: "python3.12"
+      Code:
+        ZipFile: "if True\\n    print('missing colon')\\n"
+"""
+
+
+def test_lint_file_captures_output(tmp_path, capsys):
+    file_path = tmp_path / "invalid.yaml"
+    file_path.write_text(INVALID_TEMPLATE)
+    outcome = lintFile(str(file_path))
+    assert outcome.fileName == str(file_path)
+    assert outcome.success is False
+    assert "E999" in outcome.output
+    assert capsys.readouterr().out == ""
+    assert outcome.stats == {}
+    assert outcome.timings is None
+
+
+def test_lint_files_keeps_order_in_parallel(tmp_path):
+    files = []
+    for index in range(6):
+        file_path = tmp_path / f"template_{index}.yaml"
+        file_path.write_text(INVALID_TEMPLATE if index % 2 else VALID_TEMPLATE)
+        files.append(str(file_path))
+
+    results = list(lintFiles(files, jobs=3))
+    assert [result[0] for result in results] == files
+    assert [result[1] for result in results] == [index % 2 == 0 for index in range(6)]
+    # How many copies each process shares depends on how the templates spread over them
+    assert [result._replace(stats=None) for result in results] == \
+        [result._replace(stats=None) for result in lintFiles(files, jobs=1)]
+
+
+def test_lint_files_lints_copies_once(tmp_path):
+    files = []
+    for index in range(3):
+        file_path = tmp_path / f"template_{index}.yaml"
+        file_path.write_text(INVALID_TEMPLATE + INVALID_TEMPLATE.split("Resources:")[1].replace("LambdaFunction", "Copy"))
+        files.append(str(file_path))
+
+    results = list(lintFiles(files, jobs=1))
+    assert [result.stats for result in results] == [{"deduplicated": 1}, {"deduplicated": 2}, {"deduplicated": 2}]
+    for result in results:
+        resources = result.results["resources"]
+        assert resources["Copy"] == resources["LambdaFunction"]
+        assert "E999" in resources["Copy"]["errors"]
+    # Runs do not share results
+    assert lintFile(files[0]).stats == {"deduplicated": 1}
+
+
+def test_lint_file_counts_cache_hits(tmp_path):
+    file_path = tmp_path / "valid.yaml"
+    file_path.write_text(VALID_TEMPLATE)
+    cache_dir = str(tmp_path / "cache")
+    assert lintFile(str(file_path), cache_dir=cache_dir).stats == {"cache_hits": 0, "cache_misses": 1}
+    assert lintFile(str(file_path), cache_dir=cache_dir).stats == {"cache_hits": 1, "cache_misses": 0}
+
+
+def test_lint_file_records_timings(tmp_path):
+    file_path = tmp_path / "valid.yaml"
+    file_path.write_text(VALID_TEMPLATE)
+    records = lintFile(str(file_path), timings=True).timings
+    assert [(record["scope"], record["name"]) for record in records] == [
+        ("phase", "parse"),
+        ("phase", "scan"),
+        ("resource", "LambdaFunction"),
+        ("phase", "lint"),
+        ("phase", "report"),
+        ("file", str(file_path)),
+    ]
+    assert all(record["file"] == str(file_path) and record["wall"] >= 0 for record in records)
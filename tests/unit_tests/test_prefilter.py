@@ -0,0 +1,57 @@
+from cfn_inline_lambda_linter.loader import LAMBDA_RESOURCE_TYPES, NESTED_STACK_TYPES
+from cfn_inline_lambda_linter.prefilter import LAMBDA_MARKERS, NESTED_STACK_MARKERS, mayHoldLambdas
+from cfn_inline_lambda_linter.runner import lintFile, lintFiles
+
+NESTED_STACK_TEMPLATE = """
+Resources:
+  Child:
+    Type: AWS::CloudFormation::Stack
+    Properties:
+      TemplateURL: child.yaml
+"""
+
+
+def test_markers_match_the_resource_types():
+    assert LAMBDA_MARKERS == tuple(type_name.encode() for type_name in LAMBDA_RESOURCE_TYPES)
+    assert NESTED_STACK_MARKERS == tuple(type_name.encode() for type_name in NESTED_STACK_TYPES)
+
+
+def test_may_hold_lambdas(tmp_path):
+    manifest = tmp_path / "deployment.yaml"
+    manifest.write_text("apiVersion: apps/v1\nkind: Deployment\n")
+    function = tmp_path / "function.yaml"
+    function.write_text("Resources:\n  Function:\n    Type: AWS::Serverless::Function\n")
+    parent = tmp_path / "parent.yaml"
+    parent.write_text(NESTED_STACK_TEMPLATE)
+    empty = tmp_path / "empty.yaml"
+    empty.write_text("")
+
+    assert not mayHoldLambdas(str(manifest))
+    assert mayHoldLambdas(str(function))
+    assert mayHoldLambdas(str(parent))
+    assert not mayHoldLambdas(str(parent), nested_stacks=False)
+    assert not mayHoldLambdas(str(empty))
+    # Unreadable files are left to the linter to report
+    assert mayHoldLambdas(str(tmp_path / "missing.yaml"))
+    assert mayHoldLambdas(str(tmp_path))
+
+
+def test_prefiltered_files_are_not_parsed(tmp_path):
+    manifest = tmp_path / "deployment.yaml"
+    # Not even valid YAML, it is never parsed
+    manifest.write_text("kind: [Deployment\n")
+    outcome = lintFile(str(manifest))
+    assert outcome.success is True
+    assert outcome.output == ""
+    assert outcome.stats == {"prefiltered": 1}
+    assert outcome.results["skipped"] == "No Lambda function or nested stack found"
+
+
+def test_nested_stacks_are_followed_through_the_prefilter(tmp_path):
+    (tmp_path / "child.yaml").write_text("Resources:\n  Bucket:\n    Type: AWS::S3::Bucket\n")
+    parent = tmp_path / "parent.yaml"
+    parent.write_text(NESTED_STACK_TEMPLATE)
+
+    outcomes = list(lintFiles([str(parent)], jobs=1))
+    assert [outcome.stats.get("prefiltered") for outcome in outcomes] == [None, 1]
+    assert [outcome.stats.get("prefiltered") for outcome in lintFiles([str(parent)], jobs=1, nested_stacks=False)] == [1]
@@ -21,3 +21,91 @@ def test_read_file_valid(tmp_path):
 def test_read_file_not_found():
     with pytest.raises(FileNotFoundError):
         readFile("non_existent.yaml")
+
+
+def test_read_file_with_intrinsics(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text("""
+    Resources:
+      LambdaFunction:
+        Type: "AWS::Lambda::Function"
+        Properties:
+          Runtime: !Ref LambdaRuntime
+          Role: !GetAtt LambdaRole.Arn
+          Code:
+            ZipFile: !Sub "print('${AWS::Region}')"
+    """)
+    properties = readFile(str(file_path))["Resources"]["LambdaFunction"]["Properties"]
+    assert properties["Runtime"] == {"Ref": "LambdaRuntime"}
+    assert properties["Role"] == {"Fn::GetAtt": ["LambdaRole", "Arn"]}
+    assert properties["Code"]["ZipFile"] == {"Fn::Sub": "print('${AWS::Region}')"}
+
+
+def test_read_file_streaming(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text("""
+    Resources:
+      Bucket:
+        Type: "AWS::S3::Bucket"
+      LambdaFunction:
+        Type: "AWS::Lambda::Function"
+        Properties:
+          Runtime: "python3.12"
+          Code:
+            ZipFile: "print('Hello, world!')"
+    """)
+    result = readFile(str(file_path), streaming=True)
+    assert list(result) == ["Resources"]
+    assert list(result["Resources"]) == ["LambdaFunction"]
+
+
+def test_read_file_streaming_alias_falls_back(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text("""
+    Outputs:
+      Name: &runtime "python3.12"
+    Resources:
+      LambdaFunction:
+        Type: "AWS::Lambda::Function"
+        Properties:
+          Runtime: *runtime
+    """)
+    result = readFile(str(file_path), streaming=True)
+    assert result["Resources"]["LambdaFunction"]["Properties"]["Runtime"] == "python3.12"
+    assert "Outputs" in result
+
+
+def test_read_file_json(tmp_path):
+    template = """{
+  "Parameters": {"LambdaRuntime": {"Type": "String", "Default": "python3.12"}},
+  "Resources": {
+    "LambdaFunction": {
+      "Type": "AWS::Lambda::Function",
+      "Properties": {
+        "Runtime": {"Ref": "LambdaRuntime"},
+        "Timeout": 30,
+        "Environment": {"Variables": {"DEBUG": true, "VERBOSE": false, "LEVEL": null}},
+        "Layers": [true, null],
+        "Code": {"ZipFile": "print('Hello, world!')"}
+      }
+    }
+  }
+}"""
+    yaml_result = yaml.load(template, Loader=yaml.BaseLoader)
+    for name in ["template.json", "template.template", "cdk.out"]:
+        file_path = tmp_path / name
+        file_path.write_text(template)
+        assert readFile(str(file_path)) == yaml_result
+
+
+def test_read_file_sniffed_yaml_flow_mapping(tmp_path):
+    file_path = tmp_path / "template.template"
+    file_path.write_text("{Resources: {Function: {Type: 'AWS::Lambda::Function'}}}\n")
+    assert readFile(str(file_path)) == {"Resources": {"Function": {"Type": "AWS::Lambda::Function"}}}
+
+
+def test_read_file_invalid_json(tmp_path):
+    file_path = tmp_path / "template.json"
+    file_path.write_text('{"Resources": ')
+    with pytest.raises(ValueError):
+        readFile(str(file_path))
@@ -0,0 +1,47 @@
+import pytest
+
+from cfn_inline_lambda_linter.linter import outputPrinting
+from cfn_inline_lambda_linter.reporters import Reporter, progress, quietProgress, recordResults
+from cfn_inline_lambda_linter.results import parseReport
+from cfn_inline_lambda_linter.runner import lintFile
+
+
+class Unformattable:
+    def __format__(self, spec):
+        raise AssertionError("quiet progress must not format its message")
+
+
+def test_quiet_progress_does_not_format(capsys):
+    with quietProgress():
+        progress("", "{}", Unformattable())
+    assert capsys.readouterr().out == ""
+
+
+def test_output_printing_reports_resources():
+    error_dict = {"Function": {"status": "FoundErrors", "errors": "stdin:1:1: F401 'os' imported but unused\n"}}
+    with recordResults() as results:
+        outputPrinting(error_dict)
+    assert results["resources"] == error_dict
+
+
+def test_parse_report_keeps_unknown_lines():
+    violations = parseReport("stdin:3:5: E225 missing whitespace around operator\n    x=1\n")
+    assert [violation.asDict() for violation in violations] == [
+        {"line": 3, "col": 5, "code": "E225", "message": "missing whitespace around operator"},
+        {"line": None, "col": None, "code": None, "message": "    x=1"},
+    ]
+
+
+def test_reporters_must_implement_file_done():
+    class SilentReporter(Reporter):
+        pass
+
+    with pytest.raises(TypeError):
+        SilentReporter(None)
+
+
+def test_lint_file_records_problems_quietly(tmp_path):
+    outcome = lintFile(str(tmp_path / "missing.yaml"), quiet=True)
+    assert not outcome.success
+    assert outcome.output == ""
+    assert "Error while reading or parsing file" in outcome.results["problems"][0]
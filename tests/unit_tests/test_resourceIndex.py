@@ -0,0 +1,84 @@
+from cfn_inline_lambda_linter.incremental import unchangedLambdas
+from cfn_inline_lambda_linter.resources import ResourceIndex, lambdaFunctions
+from cfn_inline_lambda_linter.runner import lintFile
+
+SAM_TEMPLATE = """
+Transform: AWS::Serverless-2016-10-31
+Globals:
+  Function:
+    Runtime: python3.12
+    Timeout: 30
+Resources:
+  Inline:
+    Type: AWS::Serverless::Function
+    Properties:
+      Handler: index.handler
+      InlineCode: |
+        import os
+  Packaged:
+    Type: AWS::Serverless::Function
+    Properties:
+      CodeUri: src/
+  Ruby:
+    Type: AWS::Serverless::Function
+    Properties:
+      Runtime: ruby3.3
+      InlineCode: puts 1
+  Classic:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Code:
+        ZipFile: |
+          print(1)
+"""
+
+
+def test_resource_index_keeps_template_order():
+    index = ResourceIndex({
+        "A": {"Type": "AWS::Serverless::Function"},
+        "B": {"Type": "AWS::S3::Bucket"},
+        "C": {"Type": "AWS::Lambda::Function"},
+        "D": "not a resource",
+    })
+    assert list(index.ofType("AWS::Lambda::Function", "AWS::Serverless::Function")) == ["A", "C"]
+    assert list(index.ofType("AWS::S3::Bucket")) == ["B"]
+    assert index.ofType("AWS::SQS::Queue") == {}
+
+
+def test_lambda_functions_inherit_sam_globals():
+    resources = {
+        "Inherits": {"Type": "AWS::Serverless::Function", "Properties": {"InlineCode": "print(1)"}},
+        "Overrides": {"Type": "AWS::Serverless::Function", "Properties": {"Runtime": "python3.9"}},
+    }
+    functions = lambdaFunctions(ResourceIndex(resources), {"Function": {"Runtime": "python3.12"}})
+    assert functions["Inherits"]["Properties"]["Runtime"] == "python3.12"
+    assert functions["Inherits"]["Properties"]["Code"] == {"ZipFile": "print(1)"}
+    assert functions["Overrides"]["Properties"]["Runtime"] == "python3.9"
+    assert functions["Overrides"]["Properties"]["Code"] == {}
+    # The template itself is left untouched
+    assert "Code" not in resources["Inherits"]["Properties"]
+
+
+def test_sam_template_is_linted(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text(SAM_TEMPLATE)
+    for streaming in (False, True):
+        outcome = lintFile(str(file_path), streaming=streaming)
+        resources = outcome.results["resources"]
+        assert not outcome.success
+        assert resources["Inline"]["status"] == "FoundErrors"
+        assert "F401" in resources["Inline"]["errors"]
+        assert resources["Packaged"]["status"] == "SkippingLambda"
+        assert resources["Ruby"]["status"] == "SkippingLambda"
+        assert resources["Classic"]["status"] == "FoundNoErrors"
+
+
+def test_changing_sam_globals_changes_functions():
+    template = {
+        "Globals": {"Function": {"Runtime": "python3.12"}},
+        "Resources": {"Function": {"Type": "AWS::Serverless::Function", "Properties": {"InlineCode": "print(1)"}}},
+    }
+    upgraded = dict(template, Globals={"Function": {"Runtime": "python3.13"}})
+    assert unchangedLambdas(template, template) == {"Function"}
+    assert unchangedLambdas(upgraded, template) == set()
@@ -0,0 +1,46 @@
+import pickle
+
+from cfn_inline_lambda_linter.daemon import _decodeOutcome, _encodeOutcome
+from cfn_inline_lambda_linter.results import ResourceResult, Violation
+from cfn_inline_lambda_linter.runner import LintOutcome
+
+REPORT = (
+    "stdin:1:1: F401 'os' imported but unused\n"
+    "template.yaml:12:5: CILL001 handler 'main' is not defined\n"
+    "    ^\n"
+)
+
+
+def test_report_is_parsed_once_into_violations():
+    result = ResourceResult.fromReport(REPORT)
+    assert result.status == "FoundErrors" and result.failed
+    assert result.violations[0] == Violation(1, 1, "F401", "'os' imported but unused")
+    assert result.violations[1].file == "template.yaml"
+    assert result.violations[2].code is None and result.violations[2].message == "    ^"
+    # The report text is rebuilt from the violations
+    assert result["errors"] == REPORT
+    assert ResourceResult.fromReport("").status == "FoundNoErrors"
+
+
+def test_codes_are_interned():
+    first, second = (ResourceResult.fromReport("stdin:1:1: " + "F401" + f" '{name}' imported but unused\n") for name in "ab")
+    assert first.violations[0].code is second.violations[0].code
+    assert not hasattr(first.violations[0], "__dict__")
+
+
+def test_records_read_like_the_dicts_they_replace():
+    skipped = ResourceResult("SkippingLambda", reason="Lambda function doesnot have inline code")
+    assert skipped["status"] == "SkippingLambda"
+    assert skipped.get("errors") == "Lambda function doesnot have inline code"
+    assert skipped == {"status": "SkippingLambda", "errors": "Lambda function doesnot have inline code"}
+    assert ResourceResult("CodeNotFormatted").get("errors") is None
+    assert ResourceResult.fromDict({"status": "FoundErrors", "errors": REPORT}) == ResourceResult.fromReport(REPORT)
+
+
+def test_records_survive_process_pools_and_the_daemon():
+    result = ResourceResult.fromReport(REPORT)
+    assert pickle.loads(pickle.dumps(result)) == result
+    outcome = LintOutcome("template.yaml", False, "", {}, None, {"resources": {"Function": result}, "problems": [], "skipped": None, "stacks": {}})
+    decoded = _decodeOutcome(_encodeOutcome(outcome))
+    assert decoded.results["resources"]["Function"] == result
+    assert decoded.results["resources"]["Function"].violations[1].file == "template.yaml"
@@ -0,0 +1,56 @@
+import yaml
+
+from cfn_inline_lambda_linter.loader import CfnLoader, scanTemplate
+
+TEMPLATE = """
+AWSTemplateFormatVersion: "2010-09-09"
+Parameters:
+  LambdaRuntime:
+    Type: String
+    Default: python3.12
+Resources:
+  Bucket:
+    Type: AWS::S3::Bucket
+    Properties:
+      Tags: [{Key: Name, Value: !Ref AWS::StackName}]
+  Function:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: !Ref LambdaRuntime
+      Code:
+        ZipFile: !Sub |
+          print("${AWS::Region}")
+  TypeLast:
+    Properties:
+      Runtime: python3.9
+      Code: {ZipFile: "print(1)"}
+    Type: AWS::Lambda::Function
+  Topic:
+    Properties: {TopicName: topic}
+    Type: AWS::SNS::Topic
+Outputs:
+  Arn: !GetAtt Function.Arn
+"""
+
+
+def test_scan_template_keeps_only_lambda_resources():
+    full = yaml.load(TEMPLATE, Loader=CfnLoader)
+    scanned = scanTemplate(TEMPLATE)
+    assert scanned == {
+        "Parameters": full["Parameters"],
+        "Resources": {"Function": full["Resources"]["Function"], "TypeLast": full["Resources"]["TypeLast"]},
+    }
+
+
+def test_scan_template_without_resources():
+    assert scanTemplate("name: app\nversion: 1.0.0\n") == {}
+    assert scanTemplate("") is None
+
+
+def test_scan_template_alias_into_dropped_node():
+    try:
+        scanTemplate("Outputs: &out {A: 1}\nResources:\n  F:\n    Type: AWS::Lambda::Function\n    Properties: *out\n")
+    except yaml.composer.ComposerError:
+        pass
+    else:
+        raise AssertionError("Expected a ComposerError for an alias into a dropped node")
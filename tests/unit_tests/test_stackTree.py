@@ -0,0 +1,84 @@
+from cfn_inline_lambda_linter.linter import readFile
+from cfn_inline_lambda_linter.resources import ResourceIndex
+from cfn_inline_lambda_linter.runner import LintOutcome, lintFiles
+from cfn_inline_lambda_linter.stacks import StackTree, findNestedStacks
+
+LAMBDA = """
+  Function:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Code:
+        ZipFile: "{code}"
+"""
+
+
+def write_stack(path, children=(), code=None):
+    resources = "".join(
+        f"\n  {name}:\n    Type: AWS::CloudFormation::Stack\n    Properties:\n      TemplateURL: {url}\n"
+        for name, url in children
+    )
+    if code is not None:
+        resources += LAMBDA.format(code=code)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("Resources:" + (resources or " {}\n"))
+    return str(path)
+
+
+def outcome(fileName, stacks, stack=None):
+    return LintOutcome(fileName, True, "", {}, results={"problems": [], "stacks": stacks}, stack=stack)
+
+
+def test_find_nested_stacks_follows_local_paths_only(tmp_path):
+    root = write_stack(tmp_path / "root.yaml", [("Local", "stacks/child.yaml"), ("Remote", "https://example.com/child.yaml")])
+    with open(root, "a") as file:
+        file.write("  App:\n    Type: AWS::Serverless::Application\n    Properties:\n      Location: app.yaml\n")
+    for streaming in (False, True):
+        template = readFile(root, streaming)
+        assert findNestedStacks(root, ResourceIndex(template["Resources"])) == {
+            "Local": str(tmp_path / "stacks" / "child.yaml"),
+            "App": str(tmp_path / "app.yaml"),
+        }
+
+
+def test_stack_tree_schedules_shared_children_once():
+    tree = StackTree(["root.yaml"])
+    _, children = tree.follow(outcome("root.yaml", {"A": "a.yaml", "B": "b.yaml"}))
+    assert children == [("a.yaml", "root.yaml/A"), ("b.yaml", "root.yaml/B")]
+    _, children = tree.follow(outcome("a.yaml", {"Shared": "shared.yaml"}, "root.yaml/A"))
+    assert children == [("shared.yaml", "root.yaml/A/Shared")]
+    result, children = tree.follow(outcome("b.yaml", {"Shared": "shared.yaml"}, "root.yaml/B"))
+    assert children == [] and result.success
+
+
+def test_stack_tree_reports_cycles_through_visited_templates():
+    tree = StackTree(["a.yaml", "b.yaml"])
+    tree.follow(outcome("a.yaml", {"B": "b.yaml"}))
+    result, children = tree.follow(outcome("b.yaml", {"A": "a.yaml"}))
+    assert children == []
+    assert not result.success
+    assert result.results["problems"] == ["Nested stack 'A' creates a cycle: b.yaml → a.yaml → b.yaml"]
+
+
+def test_lint_files_lints_child_templates_in_parallel(tmp_path):
+    root = write_stack(tmp_path / "root.yaml", [(f"Child{index}", f"child{index}.yaml") for index in range(3)])
+    for index in range(3):
+        write_stack(tmp_path / f"child{index}.yaml", [("Shared", "shared.yaml")], code=f"print({index})\\n")
+    write_stack(tmp_path / "shared.yaml", code="import os\\n")
+
+    outcomes = list(lintFiles([root], jobs=2))
+    assert [outcome.stack for outcome in outcomes] == [
+        None, f"{root}/Child0", f"{root}/Child1", f"{root}/Child2", f"{root}/Child0/Shared",
+    ]
+    assert [outcome.success for outcome in outcomes] == [True, True, True, True, False]
+    assert len(list(lintFiles([root], jobs=2, nested_stacks=False))) == 1
+
+
+def test_passed_templates_stay_passed_whatever_the_order(tmp_path):
+    root = write_stack(tmp_path / "root.yaml", [("Child", "child.yaml")])
+    child = write_stack(tmp_path / "child.yaml", code="print(1)\\n")
+    others = [write_stack(tmp_path / f"other{index}.yaml", code=f"print({index})\\n") for index in range(3)]
+    # The root is linted, and claims the child, before the child is passed too
+    for files in ([root] + others + [child], [child] + others + [root]):
+        outcomes = list(lintFiles(iter(files), jobs=1))
+        assert [(outcome.fileName, outcome.stack) for outcome in outcomes] == [(fileName, None) for fileName in files]
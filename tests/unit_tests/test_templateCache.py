@@ -0,0 +1,89 @@
+import os
+import pickle
+
+from cfn_inline_lambda_linter.cache import TemplateCache, _decodeTemplate, _encodeTemplate, getTemplateCache
+from cfn_inline_lambda_linter.linter import readFile
+from cfn_inline_lambda_linter.loader import InlineCode
+
+TEMPLATE = """Parameters:
+  Runtime:
+    Type: String
+    Default: python3.12
+Resources:
+  Bucket:
+    Type: AWS::S3::Bucket
+  Function:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: !Ref Runtime
+      Handler: index.handler
+      Code:
+        ZipFile: |
+          import os
+          def handler(event, context):
+              return {VALUE}
+"""
+
+
+def test_unchanged_templates_are_read_from_the_cache(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text(TEMPLATE.replace("{VALUE}", "1"))
+    cache_dir = str(tmp_path / "cache")
+    first = readFile(str(file_path), cache_dir=cache_dir)
+    second = readFile(str(file_path), cache_dir=cache_dir)
+    cache = getTemplateCache(cache_dir)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second == first
+    # Only what the linter reads is kept
+    assert list(second["Resources"]) == ["Function"]
+    assert second["Parameters"]["Runtime"]["Default"] == "python3.12"
+    code = second["Resources"]["Function"]["Properties"]["Code"]["ZipFile"]
+    assert isinstance(code, InlineCode)
+    assert (code.fileName, code.line, code.column, code.block) == (str(file_path), 15, 1, True)
+
+
+def test_templates_changed_in_place_are_parsed_again(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text(TEMPLATE.replace("{VALUE}", "1"))
+    stat = os.stat(file_path)
+    cache = TemplateCache(str(tmp_path / "cache"))
+    content = file_path.read_bytes()
+    cache.put(str(file_path), content, {"Resources": {}})
+    assert cache.get(str(file_path), content) == {"Resources": {}}
+
+    # Same size and modification time, only the content hash tells the change
+    file_path.write_text(TEMPLATE.replace("{VALUE}", "2"))
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.get(str(file_path), file_path.read_bytes()) is None
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert cache.get(str(file_path), file_path.read_bytes()) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_template_cache_evicts_least_recently_used(tmp_path):
+    cache = TemplateCache(str(tmp_path / "cache"), max_bytes=3000)
+    for name in "abc":
+        (tmp_path / name).write_bytes(name.encode())
+        cache.put(str(tmp_path / name), name.encode(), {"Resources": {"Function": "x" * 1000}})
+        cache.get(str(tmp_path / "a"), b"a")
+    assert cache.get(str(tmp_path / "a"), b"a") is not None
+    assert cache.get(str(tmp_path / "b"), b"b") is None
+    assert cache.get(str(tmp_path / "c"), b"c") is not None
+
+
+def test_templates_are_stored_as_data(tmp_path):
+    code = InlineCode("print(1)\n")
+    code.fileName, code.line, code.column, code.block = "template.yaml", 3, 1, True
+    template = {"Resources": {"\0InlineCode": ["a", {}], "Code": [code, "true"]}}
+    decoded = _decodeTemplate(_encodeTemplate(template))
+    assert decoded == template
+    assert vars(decoded["Resources"]["Code"][0]) == vars(code)
+
+    # A cache someone else wrote is never unpickled, whatever it holds
+    file_path = tmp_path / "template.yaml"
+    file_path.write_text("Resources: {}\n")
+    cache = TemplateCache(str(tmp_path / "cache"))
+    content = file_path.read_bytes()
+    cache.put(str(file_path), content, {"Resources": {}})
+    cache.connection.execute("UPDATE templates SET data = ?", (pickle.dumps(os.system),))
+    assert cache.get(str(file_path), content) is None
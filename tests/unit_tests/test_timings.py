@@ -0,0 +1,38 @@
+from cfn_inline_lambda_linter.engine import SubprocessEngine
+from cfn_inline_lambda_linter.timings import Timings, currentTimings, recordTimings, timed
+
+
+def test_timed_does_nothing_without_recording():
+    assert currentTimings() is None
+    with timed("phase", "parse"):
+        pass
+    assert currentTimings() is None
+
+
+def test_record_timings_collects_nested_blocks():
+    with recordTimings() as outer:
+        with timed("phase", "parse"):
+            pass
+        with recordTimings() as inner:
+            with timed("resource", "Function"):
+                pass
+    assert [record["name"] for record in inner.records] == ["Function"]
+    assert [record["name"] for record in outer.records] == ["parse", "Function"]
+
+
+def test_child_process_time_is_recorded():
+    with recordTimings() as timings:
+        SubprocessEngine().lintMany({"Function": "print(1)\n"})
+    scopes = [record["scope"] for record in timings.records]
+    assert scopes == ["flake8-process", "resource"]
+    assert timings.records[0]["cpu"] > 0
+
+
+def test_timings_exports():
+    timings = Timings()
+    timings.add("phase", "parse", 0.5, 0.25, file="template.yaml")
+    timings.add("resource", 'Fun"ction', 0.1, 0.1, file="template.yaml")
+    assert 'cill_wall_seconds{scope="phase",name="parse",file="template.yaml"} 0.500000' in timings.toOpenMetrics()
+    assert 'name="Fun\\"ction"' in timings.toOpenMetrics()
+    assert timings.toOpenMetrics().endswith("# EOF\n")
+    assert "template.yaml:Fun\"ction" in timings.summary()
@@ -0,0 +1,138 @@
+import io
+import os
+
+import pytest
+
+from cfn_inline_lambda_linter.watch import InotifyWatcher, PollingWatcher, WatchSession, printChanges, watchTemplates
+
+TEMPLATE = """
+Resources:
+  First:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Code:
+        ZipFile: |
+          import os
+          print(1)
+  Second:
+    Type: AWS::Lambda::Function
+    Properties:
+      Runtime: python3.12
+      Code:
+        ZipFile: |
+          print(2)
+"""
+
+
+def write(file_path, content):
+    file_path.write_text(content)
+    # Several writes within the resolution of the file system clock still count as changes
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_session_only_lints_changed_functions(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    write(file_path, TEMPLATE)
+    session = WatchSession([str(tmp_path)])
+    assert [outcome.success for outcome in session.start()] == [False]
+
+    write(file_path, TEMPLATE.replace("print(2)", "import sys"))
+    [(fileName, outcome, relinted, new, fixed)] = session.update()
+    assert fileName == str(file_path)
+    assert relinted == 1
+    assert list(new) == [("Second", "F401", "'sys' imported but unused")]
+    assert not fixed
+    assert "Reusing the results of 1 unchanged Lambda function(s)" in outcome.output
+
+    # Moving a finding to another line is neither new nor fixed
+    write(file_path, TEMPLATE.replace("print(2)", "import sys").replace("import os\n", "# Moved down\n          import os\n"))
+    [(_, _, relinted, new, fixed)] = session.update()
+    assert (relinted, new, fixed) == (1, {}, {})
+
+    write(file_path, TEMPLATE.replace("import os", "print(0)"))
+    changes = session.update()
+    assert set(changes[0][4]) == {("First", "F401", "'os' imported but unused"), ("Second", "F401", "'sys' imported but unused")}
+    assert session.success
+    stream = io.StringIO()
+    printChanges(changes, stream)
+    assert "2 fixed finding(s)" in stream.getvalue()
+
+    assert session.update() == []
+    file_path.unlink()
+    [(_, outcome, _, _, _)] = session.update()
+    assert outcome is None
+
+
+def test_session_lints_functions_whose_handler_changed_again(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    template = TEMPLATE.replace("      Code:", "      Handler: index.handler\n      Code:", 1).replace("print(1)", "def handler(event, context):\n              os.getcwd()")
+    write(file_path, template)
+    session = WatchSession([str(tmp_path)], mode="fast")
+    assert [outcome.success for outcome in session.start()] == [True]
+
+    write(file_path, template.replace("index.handler", "index.main"))
+    [(_, outcome, relinted, new, _)] = session.update()
+    assert relinted == 1
+    assert [(name, code) for name, code, _ in new] == [("First", "CILL002")]
+    assert not outcome.success
+
+
+def test_polling_watcher_notices_changes(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    write(file_path, TEMPLATE)
+    watcher = PollingWatcher([str(tmp_path)], interval=0.01)
+    assert not watcher.wait(0.05)
+    write(file_path, TEMPLATE.replace("print(2)", "print(3)"))
+    assert watcher.wait(0.05)
+    (tmp_path / "notes.txt").write_text("not a template")
+    assert not watcher.wait(0.05)
+
+
+def test_inotify_watcher_notices_changes(tmp_path):
+    try:
+        watcher = InotifyWatcher([str(tmp_path)])
+    except (OSError, AttributeError, TypeError):
+        pytest.skip("inotify is not available")
+    try:
+        assert not watcher.wait(0.05)
+        (tmp_path / "notes.txt").write_text("not a template")
+        assert not watcher.wait(0.05)
+        (tmp_path / "stacks").mkdir()
+        assert watcher.wait(0.05)
+        (tmp_path / "stacks" / "template.yaml").write_text(TEMPLATE)
+        assert watcher.wait(0.05)
+    finally:
+        watcher.close()
+
+
+class ScriptedWatcher:
+    """Answers `wait` from a script and stops the watch once it is played."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.closed = False
+
+    def wait(self, timeout=None):
+        if not self.answers:
+            raise KeyboardInterrupt
+        return self.answers.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+def test_bursts_of_saves_are_linted_once(tmp_path):
+    file_path = tmp_path / "template.yaml"
+    write(file_path, TEMPLATE)
+    session = WatchSession([str(tmp_path)])
+    list(session.start())
+    updates = []
+    session.update = lambda: updates.append(True) or []
+
+    watcher = ScriptedWatcher([True, True, True, False, False, True, False])
+    with pytest.raises(KeyboardInterrupt):
+        watchTemplates(session, watcher, stream=io.StringIO())
+    assert len(updates) == 2
+    assert watcher.closed